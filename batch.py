@@ -0,0 +1,220 @@
+import argparse
+import csv
+import glob
+import multiprocessing
+import os
+import time
+
+import matplotlib
+
+from curve_store import CurveData
+import data_io
+from fitting import FIT_TYPES, BAND_METHODS, POLY_MAX_ORDER, fit_curve
+from scene import Scene, CURVE_COLORS, CURVE_MARKERS, curve_bands
+from export_jobs import write_outputs
+
+# 批量模式支持的输出格式
+BATCH_FORMATS = ('png', 'pdf', 'svg', 'jpg', 'eps')
+REPORT_FIELDS = ['file', 'status', 'points', 'read_s', 'fit_s', 'render_s', 'total_s', 'outputs', 'error']
+
+
+def build_parser():
+    """命令行参数；未出现 --batch 时仍启动图形界面"""
+    parser = argparse.ArgumentParser(description="多曲线图表工具，使用 --batch 在命令行批量出图")
+    parser.add_argument('--batch', nargs='+', metavar='PATTERN',
+                        help="要处理的CSV或列式文件，支持通配符")
+    parser.add_argument('--x-column', help="X列名，默认为第一列")
+    parser.add_argument('--y-columns', help="逗号分隔的Y列名，默认为其余所有列")
+    parser.add_argument('--fit', choices=['none'] + FIT_TYPES, default='linear', help="拟合类型")
+    parser.add_argument('--order', type=poly_order, default=2, help="多项式阶数，auto 表示按交叉验证选择")
+    parser.add_argument('--bands', choices=['none'] + list(BAND_METHODS), default='none',
+                        help="在拟合线周围绘制95%%置信带和预测带的方法")
+    parser.add_argument('--title', help="图表标题，默认为文件名；可用 {name} 表示文件名")
+    parser.add_argument('--xlabel', default="X轴", help="X轴标签")
+    parser.add_argument('--ylabel', default="Y轴", help="Y轴标签")
+    parser.add_argument('--font-size', type=int, default=12, help="字体大小")
+    parser.add_argument('--format', default='png', help="逗号分隔的输出格式，如 png,pdf")
+    parser.add_argument('--dpi', type=int, default=300, help="输出分辨率")
+    parser.add_argument('--width', type=float, default=12, help="图片宽度(英寸)")
+    parser.add_argument('--height', type=float, default=9, help="图片高度(英寸)")
+    parser.add_argument('--no-rasterize', action='store_true', help="矢量格式中不栅格化密集散点")
+    parser.add_argument('--output-dir', help="输出目录，默认与输入文件相同")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="并行进程数")
+    parser.add_argument('--report', help="汇总报告CSV路径，默认写入输出目录下的 batch_report.csv")
+    return parser
+
+
+def poly_order(text):
+    """--order 的取值：1~10 的整数，或 auto 表示按交叉验证选择阶数"""
+    if text == 'auto':
+        return None
+    try:
+        order = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"无效的多项式阶数: {text}")
+    if not 1 <= order <= POLY_MAX_ORDER:
+        raise argparse.ArgumentTypeError(f"多项式阶数应在 1~{POLY_MAX_ORDER} 之间: {text}")
+    return order
+
+
+def expand_inputs(patterns):
+    """展开通配符，去重并按路径排序"""
+    files = set()
+    for pattern in patterns:
+        matches = glob.glob(pattern)
+        if not matches and os.path.isfile(pattern):
+            matches = [pattern]
+        files.update(os.path.abspath(path) for path in matches if os.path.isfile(path))
+    return sorted(files)
+
+
+def parse_formats(text):
+    formats = [fmt.strip().lower() for fmt in text.split(',') if fmt.strip()]
+    invalid = [fmt for fmt in formats if fmt not in BATCH_FORMATS]
+    if invalid or not formats:
+        raise ValueError(f"不支持的输出格式: {', '.join(invalid) or text}")
+    return list(dict.fromkeys(formats))
+
+
+def render_file(task):
+    """工作进程入口：读取、拟合并渲染一个文件，返回报告中的一行"""
+    file_path, options = task
+    row = {'file': file_path, 'status': 'ok', 'points': 0,
+           'read_s': 0.0, 'fit_s': 0.0, 'render_s': 0.0, 'total_s': 0.0,
+           'outputs': '', 'error': ''}
+    start = time.perf_counter()
+    try:
+        columns = data_io.read_columns(file_path)
+        if len(columns) < 2:
+            raise ValueError("文件至少需要两列数据")
+        x_column = options['x_column'] or columns[0]
+        y_columns = options['y_columns'] or [c for c in columns if c != x_column]
+        missing = [c for c in [x_column] + y_columns if c not in columns]
+        if missing:
+            raise ValueError(f"找不到列: {', '.join(missing)}")
+        arrays = data_io.load_columns(file_path, [x_column] + y_columns)
+        curves = {}
+        for index, column in enumerate(y_columns):
+            curves[column] = {
+                'data': CurveData(arrays[x_column], arrays[column]),
+                'color': CURVE_COLORS[index % len(CURVE_COLORS)],
+                'marker': CURVE_MARKERS[index % len(CURVE_MARKERS)],
+                'visible': True,
+                'render_mode': 'scatter',
+                'fit_params': None
+            }
+            row['points'] += len(curves[column]['data'])
+        row['read_s'] = time.perf_counter() - start
+
+        # 单条曲线拟合失败只记录错误，其余曲线照常出图
+        fit_errors = []
+        if options['fit'] != 'none':
+            fit_start = time.perf_counter()
+            for name, curve in curves.items():
+                data = curve['data']
+                try:
+                    curve['fit_params'] = fit_curve(data.x, data.y, options['fit'], options['order'])
+                except Exception as e:
+                    fit_errors.append(f"{name}: {e}")
+            band_method = None if options['bands'] == 'none' else options['bands']
+            if band_method is not None:
+                # 渲染时只按需计算解析置信带，自助法在此预先计算
+                for curve in curves.values():
+                    curve_bands(curve, band_method)
+            row['fit_s'] = time.perf_counter() - fit_start
+
+        render_start = time.perf_counter()
+        base_name = os.path.splitext(os.path.basename(file_path))[0]
+        output_dir = options['output_dir'] or os.path.dirname(file_path)
+        outputs = [(os.path.join(output_dir, f"{base_name}.{fmt}"), fmt, options['dpi'])
+                   for fmt in options['formats']]
+        title = (options['title'] or "{name}").replace("{name}", base_name)
+        scene = Scene(curves, title, options['xlabel'], options['ylabel'],
+                      font_size=options['font_size'], empty_title="无数据",
+                      band_method=None if options['bands'] == 'none' else options['bands'])
+        write_outputs(scene, options['size'], outputs, rasterize=options['rasterize'])
+        row['render_s'] = time.perf_counter() - render_start
+        row['outputs'] = ';'.join(path for path, _, _ in outputs)
+        if fit_errors:
+            row['status'] = 'fit_failed'
+            row['error'] = '; '.join(fit_errors)
+    except Exception as e:
+        row['status'] = 'failed'
+        row['error'] = str(e)
+    row['total_s'] = time.perf_counter() - start
+    return row
+
+
+def _init_worker(rc):
+    # spawn 出的工作进程需要与主进程一致的字体设置
+    matplotlib.use('Agg')
+    matplotlib.rcParams.update(rc)
+
+
+def write_report(report_path, rows):
+    """写出汇总报告，utf-8-sig 编码便于在 Excel 中直接打开"""
+    with open(report_path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({**row, **{key: f"{row[key]:.3f}"
+                                       for key in ('read_s', 'fit_s', 'render_s', 'total_s')}})
+
+
+def run_batch(args):
+    """批量模式入口，全部成功返回 0，否则返回 1"""
+    try:
+        formats = parse_formats(args.format)
+    except ValueError as e:
+        print(f"错误: {e}")
+        return 1
+    files = expand_inputs(args.batch)
+    if not files:
+        print("错误: 没有匹配的输入文件")
+        return 1
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    options = {
+        'x_column': args.x_column,
+        'y_columns': [c.strip() for c in args.y_columns.split(',') if c.strip()] if args.y_columns else None,
+        'fit': args.fit,
+        'order': args.order,
+        'bands': args.bands,
+        'title': args.title,
+        'xlabel': args.xlabel,
+        'ylabel': args.ylabel,
+        'font_size': args.font_size,
+        'formats': formats,
+        'dpi': args.dpi,
+        'size': (args.width, args.height),
+        'rasterize': not args.no_rasterize,
+        'output_dir': os.path.abspath(args.output_dir) if args.output_dir else None,
+    }
+    rc = {key: matplotlib.rcParams[key] for key in ('font.sans-serif', 'axes.unicode_minus')}
+    workers = max(1, min(args.workers, len(files)))
+    print(f"批量处理 {len(files)} 个文件，{workers} 个进程")
+
+    start = time.perf_counter()
+    rows = []
+    tasks = [(file_path, options) for file_path in files]
+    # 与界面导出一致使用 spawn，各平台行为相同
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(workers, initializer=_init_worker, initargs=(rc,)) as pool:
+        for row in pool.imap_unordered(render_file, tasks):
+            rows.append(row)
+            detail = f"  {row['error']}" if row['error'] else ""
+            print(f"[{len(rows)}/{len(files)}] {row['status']:<10} {row['total_s']:7.2f}s  "
+                  f"{os.path.basename(row['file'])}{detail}")
+    elapsed = time.perf_counter() - start
+
+    rows.sort(key=lambda row: row['file'])
+    report_path = args.report or os.path.join(options['output_dir'] or os.getcwd(), 'batch_report.csv')
+    write_report(report_path, rows)
+
+    succeeded = sum(row['status'] == 'ok' for row in rows)
+    fit_failed = sum(row['status'] == 'fit_failed' for row in rows)
+    failed = len(rows) - succeeded - fit_failed
+    print(f"完成: 成功 {succeeded}，拟合失败 {fit_failed}，失败 {failed}，总耗时 {elapsed:.2f}s")
+    print(f"汇总报告: {report_path}")
+    return 0 if succeeded == len(rows) else 1
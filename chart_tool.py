@@ -1,17 +1,44 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 import matplotlib.font_manager as fm
 import numpy as np
-from scipy import stats
 import pandas as pd
 import os
+import sys
+import queue
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from curve_store import CurveData, MappedCurveData
+import data_io
+from fitting import (FIT_TYPES, FIT_NAMES, NONLINEAR_TYPES, POLY_MAX_ORDER, make_fit_func, fit_curve,
+                     format_fit_result, fit_summary, fit_task, curve_regression, track_regression,
+                     curve_polynomial_sweep, polynomial_params, bootstrap_task, bootstrap_bands,
+                     BOOTSTRAP_RESAMPLES)
+from scene import (Scene, SceneRenderer, CURVE_COLORS, CURVE_MARKERS, release_curve_lod, curve_geometry,
+                   curve_bands, bands_pending, set_curve_bands)
+from export_jobs import ExportJob
+from data_table import VirtualTable
+import batch
 
 # 设置中文字体
 plt.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'DejaVu Sans']
 plt.rcParams['axes.unicode_minus'] = False
 
+# 多项式阶数选择此项时按交叉验证误差自动选阶
+POLY_ORDER_AUTO = "自动"
+# 置信带选项: 显示名称 -> (计算方法, 是否在进程池中计算)
+BAND_OPTIONS = {
+    "不显示": (None, False),
+    "解析": ('analytic', False),
+    "自助法": ('bootstrap', False),
+    "自助法（进程池）": ('bootstrap', True),
+}
+
+
 class ChartTool:
     def __init__(self, root):
         self.root = root
@@ -21,10 +48,34 @@ class ChartTool:
         # self.root.attributes('-zoomed', True)  # Linux下全屏的备选方案
         
         # 多曲线数据存储
-        self.curves = {}  # 存储多条曲线: {曲线名称: {'x': [], 'y': [], 'color': 'color_name', 'visible': True, 'marker': 'marker_style'}}
+        self.curves = {}  # 存储多条曲线: {曲线名称: {'data': CurveData, 'color': 'color_name', 'visible': True, 'marker': 'marker_style'}}
         self.current_curve = None  # 当前选中的曲线
-        self.colors = ['blue', 'red', 'green', 'orange', 'purple', 'brown', 'pink', 'gray', 'olive', 'cyan']
-        self.markers = ['o', 's', '^', 'D', 'v', 'p', '*', 'x', '+', 'h']  # 圆形、方形、三角形、菱形等
+        self.colors = list(CURVE_COLORS)
+        self.markers = list(CURVE_MARKERS)
+        # 曲线显示方式 - 密度图把点按屏幕分辨率统计为二维直方图，适合数十万点以上的曲线
+        self.render_modes = {"散点": "scatter", "密度图": "density", "密度图(对数)": "log_density"}
+        
+        # 脏标记 - update_chart 只刷新被标记的部分
+        self.dirty_curves = set()
+        self.settings_dirty = True
+        self.lod_refresh_pending = False
+        
+        # 重绘调度 - 所有刷新请求合并为每轮事件循环最多一帧
+        self.min_frame_interval = 30  # 两帧之间的最小间隔(毫秒)
+        self.redraw_pending = False
+        self.redraw_deferred = False  # 暂停期间是否有被推迟的刷新请求
+        self.render_suspended = 0
+        self.last_frame_time = 0.0
+        
+        # 批量拟合使用的进程池，第一次使用时创建
+        self.fit_executor = None
+        # 进程池中计算的自助法置信带 {曲线名称: 任务信息}
+        self.band_jobs = {}
+        self.band_poll_pending = False
+        
+        # 十字光标覆盖层 - 静态背景缓存后只重绘光标图元
+        self.crosshair_background = None
+        self.hover_points = None  # 每次完整重绘后按需重建的 [(曲线名称, 数据坐标, 屏幕坐标)]
         
         # 添加一条默认曲线
         self.add_new_curve("曲线1")
@@ -68,11 +119,11 @@ class ChartTool:
         marker_index = curve_index % len(self.markers)
         
         self.curves[name] = {
-            'x': [],
-            'y': [],
+            'data': CurveData(),
             'color': self.colors[color_index],
             'marker': self.markers[marker_index],
             'visible': True,
+            'render_mode': 'scatter',
             'fit_params': None  # 用于存储拟合参数
         }
         self.current_curve = name
@@ -147,6 +198,21 @@ class ChartTool:
         ttk.Checkbutton(visibility_frame, text="显示当前曲线", variable=self.visible_var, 
                       command=self.toggle_curve_visibility).pack(side=tk.LEFT)
         
+        self.render_mode_var = tk.StringVar(value="散点")
+        render_mode_combo = ttk.Combobox(visibility_frame, textvariable=self.render_mode_var,
+                                        values=list(self.render_modes.keys()), width=10,
+                                        state="readonly", font=self.default_font)
+        render_mode_combo.pack(side=tk.RIGHT)
+        render_mode_combo.bind('<<ComboboxSelected>>', lambda e: self.on_render_mode_change())
+        ttk.Label(visibility_frame, text="显示方式:", font=self.default_font).pack(side=tk.RIGHT, padx=(0, 5))
+        
+        # 项目保存与打开
+        project_buttons = ttk.Frame(curve_frame)
+        project_buttons.pack(fill=tk.X, pady=(10, 0))
+        
+        ttk.Button(project_buttons, text="打开项目", command=self.open_project).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 3))
+        ttk.Button(project_buttons, text="保存项目", command=self.save_project).pack(side=tk.RIGHT, fill=tk.X, expand=True, padx=(3, 0))
+        
         # 单点数据输入
         input_frame = ttk.LabelFrame(left_frame, text="单点数据输入", padding=15)
         input_frame.pack(fill=tk.X, pady=(0, 15))
@@ -167,7 +233,7 @@ class ChartTool:
         batch_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 15))
         
         ttk.Label(batch_frame, text="格式: x1,y1;x2,y2;x3,y3...", font=self.default_font).pack(anchor=tk.W)
-        ttk.Label(batch_frame, text="或每行一个数据点 (x y)", font=self.default_font).pack(anchor=tk.W)
+        ttk.Label(batch_frame, text="或每行一个数据点 (x y / x,y / 制表符分隔)", font=self.default_font).pack(anchor=tk.W)
         
         self.batch_text = tk.Text(batch_frame, height=10, width=30, font=self.default_font)
         self.batch_text.pack(fill=tk.BOTH, expand=True, pady=(8, 0))
@@ -182,19 +248,9 @@ class ChartTool:
         list_frame = ttk.LabelFrame(left_frame, text="当前数据", padding=15)
         list_frame.pack(fill=tk.BOTH, expand=True)
         
-        # 创建树形视图显示数据
-        columns = ('序号', 'X', 'Y')
-        self.data_tree = ttk.Treeview(list_frame, columns=columns, show='headings', height=12)
-        
-        for col in columns:
-            self.data_tree.heading(col, text=col)
-            self.data_tree.column(col, width=80)
-        
-        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.data_tree.yview)
-        self.data_tree.configure(yscrollcommand=scrollbar.set)
-        
-        self.data_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        # 虚拟表格只创建可见行，滚动时按需格式化，支持点击列标题排序和按列筛选
+        self.data_table = VirtualTable(list_frame, height=12, font=self.default_font)
+        self.data_table.pack(fill=tk.BOTH, expand=True)
         
         # 控制按钮
         control_frame = ttk.Frame(left_frame)
@@ -242,7 +298,7 @@ class ChartTool:
         self.show_legend_var = tk.BooleanVar(value=True)
         show_legend_chk = ttk.Checkbutton(legend_frame, text="显示图例", 
                                        variable=self.show_legend_var, 
-                                       command=self.update_chart)
+                                       command=self.on_legend_change)
         show_legend_chk.pack(side=tk.LEFT, padx=(0, 15))
         
         # 图例位置选择
@@ -284,7 +340,7 @@ class ChartTool:
         ttk.Label(fit_type_frame, text="拟合类型:", font=self.default_font).pack(side=tk.LEFT)
         self.fit_type_var = tk.StringVar(value="linear")
         fit_type_combo = ttk.Combobox(fit_type_frame, textvariable=self.fit_type_var,
-                                     values=["linear", "polynomial", "exponential", "logarithmic", "power"],
+                                     values=FIT_TYPES,
                                      width=12, font=self.default_font)
         fit_type_combo.pack(side=tk.LEFT, padx=(5, 0), fill=tk.X, expand=True)
         
@@ -293,7 +349,8 @@ class ChartTool:
         self.poly_order_frame = ttk.Frame(analysis_frame)
         ttk.Label(self.poly_order_frame, text="多项式阶数:", font=self.default_font).pack(side=tk.LEFT)
         poly_order_combo = ttk.Combobox(self.poly_order_frame, textvariable=self.poly_order_var,
-                                       values=["2", "3", "4", "5", "6"], width=5, font=self.default_font)
+                                       values=[POLY_ORDER_AUTO] + [str(order) for order in range(1, POLY_MAX_ORDER + 1)],
+                                       width=10, font=self.default_font)
         poly_order_combo.pack(side=tk.LEFT, padx=(5, 0))
         # 初始状态隐藏
         
@@ -313,7 +370,7 @@ class ChartTool:
             if self.fit_type_var.get() == "polynomial":
                 self.poly_order_frame.pack(fill=tk.X, pady=(5, 0))
                 self.fit_params_frame.pack_forget()
-            elif self.fit_type_var.get() in ["exponential", "logarithmic", "power"]:
+            elif self.fit_type_var.get() in NONLINEAR_TYPES:
                 self.poly_order_frame.pack_forget()
                 self.fit_params_frame.pack(fill=tk.X, pady=(5, 0))
             else:  # linear
@@ -322,9 +379,31 @@ class ChartTool:
         
         fit_type_combo.bind('<<ComboboxSelected>>', on_fit_type_change)
         
+        # 实时拟合 - 数据追加或删除时用累积统计量即时更新线性拟合，无需重新计算整条曲线
+        self.live_fit_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(analysis_frame, text="实时线性拟合（数据变化时自动更新）", variable=self.live_fit_var,
+                        command=self.on_live_fit_toggle).pack(anchor=tk.W, pady=(5, 0))
+        
+        # 置信带 - 拟合线周围绘制95%置信带和预测带
+        band_frame = ttk.Frame(analysis_frame)
+        band_frame.pack(fill=tk.X, pady=(5, 0))
+        ttk.Label(band_frame, text="置信带:", font=self.default_font).pack(side=tk.LEFT)
+        self.band_option_var = tk.StringVar(value="不显示")
+        band_combo = ttk.Combobox(band_frame, textvariable=self.band_option_var, values=list(BAND_OPTIONS),
+                                  state='readonly', width=16, font=self.default_font)
+        band_combo.pack(side=tk.LEFT, padx=(5, 0), fill=tk.X, expand=True)
+        band_combo.bind('<<ComboboxSelected>>', lambda event: self.on_band_option_change())
+        
         ttk.Button(analysis_frame, text="执行曲线拟合", command=self.perform_fitting, 
                   style="Accent.TButton").pack(fill=tk.X, pady=(8, 8))
         
+        # 批量拟合 - 在进程池中用同一拟合类型拟合所有曲线，结果汇总到一个表格
+        fit_all_frame = ttk.Frame(analysis_frame)
+        fit_all_frame.pack(fill=tk.X, pady=(0, 8))
+        self.fit_visible_only_var = tk.BooleanVar(value=True)
+        ttk.Button(fit_all_frame, text="拟合全部曲线", command=self.fit_all_curves).pack(side=tk.LEFT, fill=tk.X, expand=True)
+        ttk.Checkbutton(fit_all_frame, text="仅可见曲线", variable=self.fit_visible_only_var).pack(side=tk.RIGHT, padx=(5, 0))
+        
         # 保存按钮组 - 增强导出功能
         save_frame = ttk.Frame(analysis_frame)
         save_frame.pack(fill=tk.X, pady=(8, 0))
@@ -338,7 +417,8 @@ class ChartTool:
         
         ttk.Button(quick_export_frame, text="PNG高清", command=lambda: self.quick_export('png')).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 2))
         ttk.Button(quick_export_frame, text="PDF矢量", command=lambda: self.quick_export('pdf')).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(2, 2))
-        ttk.Button(quick_export_frame, text="SVG矢量", command=lambda: self.quick_export('svg')).pack(side=tk.RIGHT, fill=tk.X, expand=True, padx=(2, 0))
+        ttk.Button(quick_export_frame, text="SVG矢量", command=lambda: self.quick_export('svg')).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(2, 2))
+        ttk.Button(quick_export_frame, text="全部格式", command=lambda: self.quick_export('all')).pack(side=tk.RIGHT, fill=tk.X, expand=True, padx=(2, 0))
         
         # 右侧图表区域
         right_frame = ttk.Frame(main_frame)
@@ -349,9 +429,20 @@ class ChartTool:
         
         # 创建matplotlib图形 - 增大默认尺寸
         self.fig, self.ax = plt.subplots(figsize=(12, 9))
+        self.renderer = SceneRenderer(self.ax)
         self.canvas = FigureCanvasTkAgg(self.fig, right_frame)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
         
+        # 缩放/平移工具栏，视口变化时重新选择降采样层级
+        self.toolbar = NavigationToolbar2Tk(self.canvas, right_frame, pack_toolbar=False)
+        self.toolbar.pack(fill=tk.X)
+        self.ax.callbacks.connect('xlim_changed', self.on_view_changed)
+        self.ax.callbacks.connect('ylim_changed', self.on_view_changed)
+        self.canvas.mpl_connect('resize_event', self.on_view_changed)
+        
+        # 十字光标与悬停读数
+        self.setup_crosshair()
+        
         # 结果显示区域
         result_frame = ttk.LabelFrame(right_frame, text="拟合结果", padding=15)
         result_frame.pack(fill=tk.X, pady=(15, 0))
@@ -372,11 +463,12 @@ class ChartTool:
             y = float(self.y_entry.get())
             
             # 添加到当前选中的曲线
-            self.curves[self.current_curve]['x'].append(x)
-            self.curves[self.current_curve]['y'].append(y)
+            self.curves[self.current_curve]['data'].append(x, y)
+            self.on_curve_data_changed(self.current_curve, added=([x], [y]))
+            self.mark_curve_dirty(self.current_curve)
             
             self.update_data_list()
-            self.update_chart()
+            self.request_redraw()
             
             # 清空输入框
             self.x_entry.delete(0, tk.END)
@@ -393,55 +485,51 @@ class ChartTool:
         text = self.batch_text.get("1.0", tk.END).strip()
         if not text:
             return
-            
-        try:
-            # 尝试不同的解析格式
+        
+        bad_lines = self.add_text_data(text)
+        if bad_lines is None:
+            return
+        
+        # 解析成功的数据已添加，只在输入框中保留无法解析的行以便修改
+        self.batch_text.delete("1.0", tk.END)
+        if len(bad_lines):
             lines = text.split('\n')
-            new_x_data = []
-            new_y_data = []
-            
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-                    
-                # 尝试分号分隔的格式
-                if ';' in line:
-                    pairs = line.split(';')
-                    for pair in pairs:
-                        if ',' in pair:
-                            x, y = pair.split(',')
-                            new_x_data.append(float(x.strip()))
-                            new_y_data.append(float(y.strip()))
-                # 尝试空格或逗号分隔的格式
-                elif ',' in line:
-                    x, y = line.split(',', 1)
-                    new_x_data.append(float(x.strip()))
-                    new_y_data.append(float(y.strip()))
-                elif ' ' in line:
-                    parts = line.split()
-                    if len(parts) >= 2:
-                        new_x_data.append(float(parts[0]))
-                        new_y_data.append(float(parts[1]))
-            
-            if new_x_data and new_y_data:
-                # 添加到当前选中的曲线
-                self.curves[self.current_curve]['x'].extend(new_x_data)
-                self.curves[self.current_curve]['y'].extend(new_y_data)
-                
-                # 如果有拟合参数，清除它们 (因为数据已更改)
-                if 'fit_params' in self.curves[self.current_curve]:
-                    self.curves[self.current_curve]['fit_params'] = None
-                    
-                self.update_data_list()
-                self.update_chart()
-                self.batch_text.delete("1.0", tk.END)
-                messagebox.showinfo("成功", f"成功添加 {len(new_x_data)} 个数据点到曲线 '{self.current_curve}'!")
-            else:
-                messagebox.showerror("错误", "未能解析到有效数据!")
-                
+            self.batch_text.insert("1.0", '\n'.join(lines[i] for i in bad_lines))
+    
+    def add_text_data(self, text):
+        """解析批量文本并添加到当前曲线
+
+        返回无法解析的行号数组（从0开始），解析失败时返回 None。
+        """
+        try:
+            new_x_data, new_y_data, error_mask = data_io.parse_xy_text(text)
         except Exception as e:
             messagebox.showerror("错误", f"数据解析失败: {str(e)}")
+            return None
+        
+        bad_lines = np.flatnonzero(error_mask)
+        bad_info = ""
+        if len(bad_lines):
+            shown = ", ".join(str(i + 1) for i in bad_lines[:10])
+            more = " 等" if len(bad_lines) > 10 else ""
+            bad_info = f"\n有 {len(bad_lines)} 行无法解析 (第 {shown}{more} 行)，已跳过。"
+        
+        if len(new_x_data):
+            # 添加到当前选中的曲线
+            self.curves[self.current_curve]['data'].extend(new_x_data, new_y_data)
+            
+            # 如果有拟合参数，清除它们 (因为数据已更改)
+            if 'fit_params' in self.curves[self.current_curve]:
+                self.curves[self.current_curve]['fit_params'] = None
+            self.on_curve_data_changed(self.current_curve, added=(new_x_data, new_y_data))
+            self.mark_curve_dirty(self.current_curve)
+                
+            self.update_data_list()
+            self.request_redraw()
+            messagebox.showinfo("成功", f"成功添加 {len(new_x_data)} 个数据点到曲线 '{self.current_curve}'!{bad_info}")
+        else:
+            messagebox.showerror("错误", f"未能解析到有效数据!{bad_info}")
+        return bad_lines
     
     def import_from_file(self):
         if not self.current_curve:
@@ -450,53 +538,59 @@ class ChartTool:
             
         file_path = filedialog.askopenfilename(
             title="选择数据文件",
-            filetypes=[("CSV文件", "*.csv"), ("文本文件", "*.txt"), ("所有文件", "*.*")]
+            filetypes=[("CSV文件", "*.csv"), ("文本文件", "*.txt"),
+                       ("Parquet文件", "*.parquet"), ("Arrow/Feather文件", "*.feather *.arrow"),
+                       ("HDF5文件", "*.h5 *.hdf5"),
+                       ("映射数据文件", f"*{data_io.MAPPED_SUFFIX}"), ("所有文件", "*.*")]
         )
         
         if file_path:
             try:
-                # 尝试读取CSV文件
-                if file_path.endswith('.csv'):
-                    df = pd.read_csv(file_path)
+                # 直接打开已有的映射文件
+                if file_path.endswith(data_io.MAPPED_SUFFIX):
+                    data = data_io.open_mapped(file_path)
+                    name = os.path.splitext(os.path.basename(file_path))[0]
+                    name = self.attach_mapped_curve(name, data)
+                    self.refresh_after_import()
+                    messagebox.showinfo("成功", f"已映射 {len(data)} 个数据点到曲线 '{name}'!")
+                    return
+                
+                # 本程序导出的列式文件：直接恢复其中的所有曲线
+                is_columnar = data_io.columnar_format(file_path) is not None
+                if is_columnar and data_io.read_curve_file_meta(file_path) is not None:
+                    self.import_curve_file(file_path)
+                    return
+                
+                # 尝试读取CSV或列式文件 - 先只读表头，数据在后台分块读取
+                if file_path.endswith('.csv') or is_columnar:
+                    columns = data_io.read_columns(file_path)
+                    if len(columns) < 2:
+                        messagebox.showerror("错误", "文件至少需要两列数值数据!")
+                        return
+                    
+                    # 大文件以内存映射方式导入，避免整体读入内存
+                    mapped = (os.path.getsize(file_path) >= data_io.MAPPED_IMPORT_THRESHOLD
+                              and messagebox.askyesno("大文件导入", "文件较大，是否以内存映射方式导入?\n"
+                                                      "(首次导入会在源文件旁生成缓存，之后可直接打开)"))
                     
                     # 检查是否有多列数据 (可能是多条曲线)
-                    if len(df.columns) >= 2:
-                        if len(df.columns) > 2:
-                            # 显示多列导入选项对话框
-                            self.show_multicolumn_import_dialog(df, file_path)
-                            return
-                            
-                        new_x_data = df.iloc[:, 0].tolist()
-                        new_y_data = df.iloc[:, 1].tolist()
+                    if len(columns) > 2:
+                        # 显示多列导入选项对话框
+                        self.show_multicolumn_import_dialog(file_path, columns, mapped)
                     else:
-                        messagebox.showerror("错误", "CSV文件至少需要两列数据!")
-                        return
+                        self.start_chunked_import(file_path, columns[0],
+                                                  [(columns[1], self.current_curve)], mapped)
                 else:
                     # 读取文本文件
                     with open(file_path, 'r', encoding='utf-8') as f:
                         content = f.read()
                     
-                    self.batch_text.delete("1.0", tk.END)
-                    self.batch_text.insert("1.0", content)
-                    self.parse_batch_data()
-                    return
-                
-                # 添加到当前选中的曲线
-                self.curves[self.current_curve]['x'].extend(new_x_data)
-                self.curves[self.current_curve]['y'].extend(new_y_data)
-                
-                # 如果有拟合参数，清除它们 (因为数据已更改)
-                if 'fit_params' in self.curves[self.current_curve]:
-                    self.curves[self.current_curve]['fit_params'] = None
-                    
-                self.update_data_list()
-                self.update_chart()
-                messagebox.showinfo("成功", f"成功导入 {len(new_x_data)} 个数据点到曲线 '{self.current_curve}'!")
+                    self.add_text_data(content)
                 
             except Exception as e:
                 messagebox.showerror("错误", f"文件导入失败: {str(e)}")
     
-    def show_multicolumn_import_dialog(self, df, file_path):
+    def show_multicolumn_import_dialog(self, file_path, columns, mapped=False):
         """处理多列数据导入"""
         dialog = tk.Toplevel(self.root)
         dialog.title(f"多列数据导入 - {os.path.basename(file_path)}")
@@ -519,9 +613,9 @@ class ChartTool:
         ttk.Label(option1_frame, text="选择Y轴数据列:", 
                 font=self.default_font).grid(row=0, column=0, sticky=tk.W, pady=5)
                 
-        y_column_var = tk.StringVar(value=df.columns[1])
+        y_column_var = tk.StringVar(value=columns[1])
         y_combo = ttk.Combobox(option1_frame, textvariable=y_column_var, 
-                              values=df.columns.tolist()[1:], width=20, font=self.default_font)
+                              values=columns[1:], width=20, font=self.default_font)
         y_combo.grid(row=0, column=1, padx=10, pady=5)
         
         # 曲线名称
@@ -535,7 +629,7 @@ class ChartTool:
         
         ttk.Button(option1_frame, text="导入单列", 
                  command=lambda: self.import_single_column(
-                     df, df.columns[0], y_column_var.get(), curve_name_var.get(), dialog)
+                     file_path, columns[0], y_column_var.get(), curve_name_var.get(), dialog, mapped)
                 ).grid(row=2, column=0, columnspan=2, pady=10)
         
         # 选项2: 导入所有Y列数据作为单独的曲线
@@ -546,13 +640,13 @@ class ChartTool:
                 font=self.default_font).pack(anchor=tk.W, pady=5)
         
         ttk.Button(option2_frame, text="导入所有列为多条曲线", 
-                 command=lambda: self.import_multiple_columns(df, dialog)
+                 command=lambda: self.import_multiple_columns(file_path, columns, dialog, mapped)
                 ).pack(pady=10)
         
         # 取消按钮
         ttk.Button(dialog, text="取消", command=dialog.destroy).pack(pady=15)
     
-    def import_single_column(self, df, x_column, y_column, curve_name, dialog):
+    def import_single_column(self, file_path, x_column, y_column, curve_name, dialog, mapped=False):
         """导入单列数据作为一条曲线"""
         # 检查曲线名称
         if curve_name != self.current_curve and curve_name in self.curves:
@@ -560,80 +654,329 @@ class ChartTool:
                                      parent=dialog):
                 return
         
+        dialog.destroy()
+        self.start_chunked_import(file_path, x_column, [(y_column, curve_name)], mapped)
+    
+    def import_multiple_columns(self, file_path, columns, dialog, mapped=False):
+        """导入多列数据作为多条曲线"""
+        targets = []
+        for i, col in enumerate(columns[1:], 1):
+            # 为每列创建一个曲线，如果曲线已存在，添加后缀
+            curve_name = f"{col}"
+            if curve_name in self.curves:
+                curve_name = f"{col}_{i}"
+            targets.append((col, curve_name))
+        
+        dialog.destroy()
+        self.start_chunked_import(file_path, columns[0], targets, mapped, new_curves=True)
+    
+    def start_chunked_import(self, file_path, x_column, targets, mapped=False, new_curves=False):
+        """在后台线程中分块导入CSV
+
+        targets 为 [(Y列名, 目标曲线名), ...]，不存在的曲线会被创建；new_curves 为 True
+        时总是新建曲线。读取线程产生的数据块由 root.after 轮询取出并追加到曲线，
+        进度窗口显示已读取的行数与字节数，并可取消（保留或丢弃已导入的部分）。
+        """
+        jobs = []
         try:
-            # 如果是新曲线，创建它
-            if curve_name != self.current_curve and curve_name not in self.curves:
-                self.add_new_curve(curve_name)
-                self.curve_combo['values'] = list(self.curves.keys())
-                self.curve_var.set(curve_name)
-                self.current_curve = curve_name
-            elif curve_name != self.current_curve:
-                self.current_curve = curve_name
-                self.curve_var.set(curve_name)
-            
-            # 获取数据
-            x_data = df[x_column].tolist()
-            y_data = df[y_column].tolist()
-            
-            # 添加数据到曲线
-            self.curves[curve_name]['x'].extend(x_data)
-            self.curves[curve_name]['y'].extend(y_data)
-            
-            # 如果有拟合参数，清除它们
-            if 'fit_params' in self.curves[curve_name]:
-                self.curves[curve_name]['fit_params'] = None
+            for y_column, curve_name in targets:
+                created = False
+                if (new_curves or curve_name not in self.curves
+                        or (mapped and len(self.curves[curve_name]['data']))):
+                    curve_name = self.add_new_curve(curve_name)
+                    created = True
+                curve = self.curves[curve_name]
+                job = {'column': y_column, 'curve': curve_name, 'created': created,
+                       'start': len(curve['data']), 'cache': None, 'stamp': None}
+                
+                if mapped:
+                    cache_path = data_io.mapped_cache_path(file_path, x_column, y_column)
+                    if data_io.is_cache_fresh(file_path, cache_path):
+                        # 已有有效缓存，直接打开
+                        curve['data'] = data_io.open_mapped(cache_path)
+                        curve['fit_params'] = None
+                        continue
+                    part_path = cache_path + '.part'
+                    owner = self.mapped_curve_owner(part_path)
+                    if owner is not None:
+                        raise ValueError(f"临时文件 {part_path} 正被曲线 '{owner}' 使用")
+                    curve['data'] = MappedCurveData(part_path)
+                    curve['data'].clear()
+                    job['cache'] = cache_path
+                    job['stamp'] = data_io.source_stamp(file_path)
+                
+                # 数据将要改变，清除拟合参数
+                curve['fit_params'] = None
+                jobs.append(job)
+        except Exception as e:
+            self.rollback_import(jobs)
+            self.refresh_after_import()
+            messagebox.showerror("错误", f"文件导入失败: {str(e)}")
+            return
+        
+        self.current_curve = (jobs[0]['curve'] if jobs else
+                              next((name for _, name in targets if name in self.curves), self.current_curve))
+        if not jobs:
+            self.refresh_after_import()
+            messagebox.showinfo("成功", "已从缓存打开映射数据!")
+            return
+        
+        reader = data_io.open_chunked_reader(file_path, [x_column] + [job['column'] for job in jobs])
+        
+        # 进度窗口
+        progress_window = tk.Toplevel(self.root)
+        progress_window.title(f"正在导入 - {os.path.basename(file_path)}")
+        progress_window.geometry("420x150")
+        progress_window.resizable(False, False)
+        progress_window.transient(self.root)
+        progress_window.grab_set()  # 导入期间不允许修改曲线
+        
+        status_var = tk.StringVar(value="正在读取...")
+        ttk.Label(progress_window, textvariable=status_var, font=self.default_font).pack(pady=(15, 8), padx=15, anchor=tk.W)
+        progress_bar = ttk.Progressbar(progress_window, mode='determinate', maximum=max(reader.total_bytes, 1))
+        progress_bar.pack(fill=tk.X, padx=15)
+        
+        def cancel():
+            reader.cancel()
+            status_var.set("正在取消...")
+            cancel_btn.state(['disabled'])
+        
+        cancel_btn = ttk.Button(progress_window, text="取消", command=cancel)
+        cancel_btn.pack(pady=15)
+        progress_window.protocol("WM_DELETE_WINDOW", cancel)
+        
+        def finish(kind, payload):
+            message = None
+            try:
+                total = sum(len(self.curves[job['curve']]['data']) - job['start'] for job in jobs)
+                if kind == 'done':
+                    for job in jobs:
+                        if job['cache']:
+                            data_io.commit_mapped_cache(self.curves[job['curve']]['data'],
+                                                        job['cache'], job['stamp'])
+                    message = f"成功导入 {len(jobs)} 条曲线，共 {total} 个数据点!"
+                elif kind == 'cancelled':
+                    keep = messagebox.askyesno("导入已取消", f"已导入 {total} 个数据点。是否保留已导入的部分数据?",
+                                               parent=progress_window)
+                    if keep:
+                        # 部分数据移到独立的文件，不占用缓存路径和 .part 文件
+                        for job in jobs:
+                            if job['cache']:
+                                data_io.keep_partial_mapped(self.curves[job['curve']]['data'], job['cache'])
+                        message = f"导入已取消，保留了 {total} 个数据点。"
+                    else:
+                        self.rollback_import(jobs)
+                        message = "导入已取消，已丢弃部分数据。"
+                else:
+                    self.rollback_import(jobs)
+            except Exception as e:
+                message = None
+                payload = e
+                self.rollback_import(jobs)
+            finally:
+                # 无论结果如何都要关闭进度窗口，否则主窗口一直处于模态状态
+                progress_window.destroy()
+                self.refresh_after_import()
+                self.resume_rendering()
             
-            self.update_data_list()
-            self.update_chart()
+            if message is None:
+                messagebox.showerror("错误", f"文件导入失败: {str(payload)}")
+            else:
+                messagebox.showinfo("导入", message)
+        
+        def poll():
+            try:
+                while True:
+                    kind, payload = reader.chunks.get_nowait()
+                    if kind != 'chunk':
+                        finish(kind, payload)
+                        return
+                    x_data = payload[x_column]
+                    for job in jobs:
+                        self.curves[job['curve']]['data'].extend(x_data, payload[job['column']])
+                        self.on_curve_data_changed(job['curve'], added=(x_data, payload[job['column']]))
+            except queue.Empty:
+                pass
             
-            dialog.destroy()
-            messagebox.showinfo("成功", f"成功导入 {len(x_data)} 个数据点到曲线 '{curve_name}'!")
+            progress_bar['value'] = reader.bytes_read
+            if not reader.cancelled:
+                status_var.set(f"已读取 {reader.rows_read:,} 行，"
+                               f"{reader.bytes_read / 1048576:.1f} / {reader.total_bytes / 1048576:.1f} MB")
+            self.root.after(50, poll)
+        
+        # 导入期间曲线数据不断增长，暂停重绘直到导入结束
+        self.suspend_rendering()
+        reader.start()
+        self.root.after(50, poll)
+    
+    def import_curve_file(self, file_path):
+        """导入本程序导出的 Parquet / Arrow / HDF5 曲线文件中的全部曲线"""
+        imported = []
+        for meta, x_data, y_data in data_io.read_curves(file_path):
+            name = meta['name']
+            if name in self.curves and not len(self.curves[name]['data']):
+                self.current_curve = name
+            else:
+                name = self.add_new_curve(name)
+            curve = self.curves[name]
+            curve['data'] = CurveData.from_arrays(x_data, y_data)
+            curve['color'] = meta.get('color', curve['color'])
+            curve['marker'] = meta.get('marker', curve['marker'])
+            curve['visible'] = meta.get('visible', True)
+            curve['render_mode'] = meta.get('render_mode', 'scatter')
+            curve['fit_params'] = meta.get('fit_params')
+            curve['fit_func'] = make_fit_func(curve['fit_params'])
+            imported.append(name)
+        
+        if imported:
+            self.current_curve = imported[0]
+        self.refresh_after_import()
+        messagebox.showinfo("成功", f"成功导入 {len(imported)} 条曲线!")
+    
+    def rollback_import(self, jobs):
+        """丢弃导入的数据：新建的曲线被删除，已有曲线恢复到导入前的长度"""
+        for job in reversed(jobs):
+            name = job['curve']
+            if name not in self.curves:
+                continue
+            data = self.curves[name]['data']
+            if job['cache']:
+                data.clear()
+                os.remove(data.path)
+                self.curves[name]['data'] = CurveData()
+            if job['created']:
+                del self.curves[name]
+            else:
+                self.curves[name]['data'].truncate(job['start'])
+        
+        if not self.curves:
+            self.add_new_curve("曲线1")
+        if self.current_curve not in self.curves:
+            self.current_curve = next(iter(self.curves))
+    
+    def mapped_curve_owner(self, path):
+        """返回映射 path 的曲线名，没有曲线映射该文件时返回 None"""
+        path = os.path.abspath(path)
+        for name, curve in self.curves.items():
+            if curve['data'].is_mapped and curve['data'].path == path:
+                return name
+        return None
+    
+    def attach_mapped_curve(self, name, data):
+        """把映射数据挂到曲线上：目标曲线为空时直接替换，否则新建曲线"""
+        if name in self.curves and not len(self.curves[name]['data']):
+            self.current_curve = name
+        else:
+            name = self.add_new_curve(name)
+        self.curves[name]['data'] = data
+        self.curves[name]['fit_params'] = None
+        return name
+    
+    def refresh_after_import(self):
+        """导入后同步曲线下拉框、可见性和视图"""
+        self.curve_combo['values'] = list(self.curves.keys())
+        self.curve_var.set(self.current_curve)
+        self.visible_var.set(self.curves[self.current_curve]['visible'])
+        self.sync_render_mode_var()
+        self.mark_all_dirty()
+        self.update_data_list()
+        self.request_redraw()
+    
+    def get_chart_settings(self):
+        """返回需要随项目保存的图表设置"""
+        return {
+            'title': self.chart_title,
+            'x_label': self.x_label,
+            'y_label': self.y_label,
+            'font_size': self.font_size_var.get(),
+            'show_legend': self.show_legend_var.get(),
+            'legend_pos': self.legend_pos_var.get(),
+        }
+    
+    def apply_chart_settings(self, settings):
+        """把保存的图表设置应用到界面"""
+        self.chart_title = settings.get('title', self.chart_title)
+        self.x_label = settings.get('x_label', self.x_label)
+        self.y_label = settings.get('y_label', self.y_label)
+        for entry, value in ((self.title_entry, self.chart_title),
+                             (self.xlabel_entry, self.x_label),
+                             (self.ylabel_entry, self.y_label)):
+            entry.delete(0, tk.END)
+            entry.insert(0, value)
+        self.font_size_var.set(settings.get('font_size', self.font_size_var.get()))
+        self.show_legend_var.set(settings.get('show_legend', self.show_legend_var.get()))
+        self.legend_pos_var.set(settings.get('legend_pos', self.legend_pos_var.get()))
+    
+    def save_project(self):
+        """把所有曲线和图表设置保存为项目文件"""
+        file_path = filedialog.asksaveasfilename(
+            title="保存项目",
+            defaultextension=data_io.PROJECT_SUFFIX,
+            filetypes=[("图表项目文件", f"*{data_io.PROJECT_SUFFIX}"), ("所有文件", "*.*")]
+        )
+        if not file_path:
+            return
+        
+        try:
+            # 来自同一项目文件的曲线先复制到内存，避免覆盖仍在映射中的文件
+            target = os.path.abspath(file_path)
+            for curve in self.curves.values():
+                backing_file = curve['data'].backing_file
+                if backing_file and os.path.abspath(backing_file) == target and not curve['data'].is_mapped:
+                    curve['data'] = curve['data'].copy()
             
+            data_io.save_project(file_path, self.curves, self.get_chart_settings(), self.current_curve)
+            messagebox.showinfo("成功", f"项目已保存到:\n{file_path}")
         except Exception as e:
-            messagebox.showerror("错误", f"导入失败: {str(e)}", parent=dialog)
+            messagebox.showerror("错误", f"保存项目失败: {str(e)}")
     
-    def import_multiple_columns(self, df, dialog):
-        """导入多列数据作为多条曲线"""
+    def open_project(self):
+        """打开项目文件，替换当前所有曲线和图表设置"""
+        file_path = filedialog.askopenfilename(
+            title="打开项目",
+            filetypes=[("图表项目文件", f"*{data_io.PROJECT_SUFFIX}"), ("所有文件", "*.*")]
+        )
+        if not file_path:
+            return
+        
+        if any(len(curve['data']) for curve in self.curves.values()):
+            if not messagebox.askyesno("确认", "打开项目将替换当前的所有曲线，是否继续?"):
+                return
+        
         try:
-            x_column = df.columns[0]
-            x_data = df[x_column].tolist()
-            
-            imported_count = 0
-            
-            for i, col in enumerate(df.columns[1:], 1):
-                # 为每列创建一个曲线
-                curve_name = f"{col}"
-                
-                # 如果曲线已存在，添加后缀
-                if curve_name in self.curves:
-                    curve_name = f"{col}_{i}"
-                
-                # 创建新曲线并添加数据
-                self.add_new_curve(curve_name)
-                self.curves[curve_name]['x'] = x_data.copy()
-                self.curves[curve_name]['y'] = df[col].tolist()
-                
-                imported_count += 1
-            
-            # 更新曲线选择下拉菜单
-            self.curve_combo['values'] = list(self.curves.keys())
-            
-            # 如果导入了新曲线，选择第一个导入的曲线
-            if imported_count > 0:
-                new_curve = f"{df.columns[1]}"
-                if new_curve not in self.curves:
-                    new_curve = f"{df.columns[1]}_1"
-                self.current_curve = new_curve
-                self.curve_var.set(new_curve)
-            
-            self.update_data_list()
-            self.update_chart()
-            
-            dialog.destroy()
-            messagebox.showinfo("成功", f"成功导入 {imported_count} 条曲线数据!")
-            
+            header, loaded = data_io.load_project(file_path)
         except Exception as e:
-            messagebox.showerror("错误", f"多曲线导入失败: {str(e)}", parent=dialog)
+            messagebox.showerror("错误", f"打开项目失败: {str(e)}")
+            return
+        
+        self.curves = {}
+        missing = []
+        for meta, data in loaded:
+            fit_params = meta.get('fit_params')
+            self.curves[meta['name']] = {
+                'data': data,
+                'color': meta.get('color', self.colors[len(self.curves) % len(self.colors)]),
+                'marker': meta.get('marker', 'o'),
+                'visible': meta.get('visible', True),
+                'render_mode': meta.get('render_mode', 'scatter'),
+                'fit_params': fit_params,
+                'fit_func': make_fit_func(fit_params),  # 由保存的参数重建拟合函数
+            }
+            if meta.get('missing'):
+                missing.append(meta['mapped_path'])
+        
+        if not self.curves:
+            self.add_new_curve("曲线1")
+        current = header.get('current_curve')
+        self.current_curve = current if current in self.curves else next(iter(self.curves))
+        
+        self.apply_chart_settings(header.get('settings', {}))
+        # 打开项目后视图回到新数据的范围
+        self.renderer.reset_limits()
+        self.refresh_after_import()
+        
+        if missing:
+            messagebox.showwarning("警告", "以下映射数据文件不存在，对应曲线为空:\n" + "\n".join(missing))
     
     def on_curve_selected(self, event=None):
         """当用户从下拉菜单选择曲线时"""
@@ -642,6 +985,7 @@ class ChartTool:
             self.current_curve = selected
             # 更新可见性复选框状态
             self.visible_var.set(self.curves[selected]['visible'])
+            self.sync_render_mode_var()
             # 更新数据列表
             self.update_data_list()
     
@@ -704,7 +1048,7 @@ class ChartTool:
             self.curve_var.set(self.current_curve)
             
             self.update_data_list()
-            self.update_chart()
+            self.request_redraw()
     
     def rename_curve(self):
         """重命名当前曲线"""
@@ -743,11 +1087,15 @@ class ChartTool:
             # 重命名曲线 - 复制数据到新名称并删除旧记录
             self.curves[new_name] = self.curves[self.current_curve]
             del self.curves[self.current_curve]
+            # 进行中的置信带任务随曲线改名，完成后按新名称取回结果
+            if self.current_curve in self.band_jobs:
+                self.band_jobs[new_name] = self.band_jobs.pop(self.current_curve)
             self.current_curve = new_name
             
             # 更新下拉菜单
             self.curve_combo['values'] = list(self.curves.keys())
             self.curve_var.set(new_name)
+            self.request_redraw()
             
             dialog.destroy()
             
@@ -756,147 +1104,276 @@ class ChartTool:
         # 绑定回车键
         dialog.bind('<Return>', lambda event: confirm())
     
+    def sync_render_mode_var(self):
+        """使显示方式下拉框与当前曲线一致"""
+        mode = self.curves[self.current_curve].get('render_mode', 'scatter')
+        self.render_mode_var.set(next(label for label, value in self.render_modes.items() if value == mode))
+    
+    def on_render_mode_change(self):
+        """切换当前曲线的显示方式（散点 / 密度图）"""
+        if not self.current_curve:
+            return
+        self.curves[self.current_curve]['render_mode'] = self.render_modes[self.render_mode_var.get()]
+        self.mark_curve_dirty(self.current_curve)
+        self.request_redraw()
+    
     def toggle_curve_visibility(self):
         """切换当前曲线的可见性"""
         if not self.current_curve:
             return
             
         self.curves[self.current_curve]['visible'] = self.visible_var.get()
-        self.update_chart()
+        self.mark_curve_dirty(self.current_curve)
+        self.request_redraw()
     
     def update_data_list(self):
-        # 清空现有数据
-        for item in self.data_tree.get_children():
-            self.data_tree.delete(item)
-        
-        if not self.current_curve:
-            return
-            
-        # 添加当前曲线的数据
-        x_data = self.curves[self.current_curve]['x']
-        y_data = self.curves[self.current_curve]['y']
-        
-        for i, (x, y) in enumerate(zip(x_data, y_data), 1):
-            self.data_tree.insert('', 'end', values=(i, f"{x:.4f}", f"{y:.4f}"))
+        """让数据表格显示当前曲线；表格只重绘可见行"""
+        self.data_table.set_data(self.curves[self.current_curve]['data'] if self.current_curve else None)
     
     def delete_selected(self):
         if not self.current_curve:
             return
             
-        selected_items = self.data_tree.selection()
-        if not selected_items:
+        selection = self.data_table.selected_mask()
+        if not selection.any():
             messagebox.showwarning("警告", "请先选择要删除的数据点!")
             return
         
-        # 获取选中项的索引
-        indices_to_delete = []
-        for item in selected_items:
-            index = int(self.data_tree.item(item)['values'][0]) - 1
-            indices_to_delete.append(index)
-        
-        # 按降序排序，从后往前删除
-        indices_to_delete.sort(reverse=True)
-        
-        x_data = self.curves[self.current_curve]['x']
-        y_data = self.curves[self.current_curve]['y']
-        
-        for index in indices_to_delete:
-            if 0 <= index < len(x_data):
-                del x_data[index]
-                del y_data[index]
+        self.release_curve_views(self.current_curve)
+        curve = self.curves[self.current_curve]
+        removed = (curve['data'].x[selection], curve['data'].y[selection])
+        curve['data'].remove(selection)
+        # 拟合结果基于删除前的数据，已经失效
+        curve['fit_params'] = None
+        curve.pop('fit_func', None)
+        self.result_text.delete("1.0", tk.END)
+        self.on_curve_data_changed(self.current_curve, removed=removed)
+        self.mark_curve_dirty(self.current_curve)
         
         self.update_data_list()
-        self.update_chart()
+        self.request_redraw()
     
     def clear_data(self):
         if not self.current_curve:
             return
             
         if messagebox.askyesno("确认", f"确定要清除曲线 '{self.current_curve}' 的所有数据吗?"):
-            self.curves[self.current_curve]['x'] = []
-            self.curves[self.current_curve]['y'] = []
+            self.release_curve_views(self.current_curve)
+            self.curves[self.current_curve]['data'].clear()
             self.curves[self.current_curve]['fit_params'] = None
-            self.update_data_list()
-            self.update_chart()
             self.result_text.delete("1.0", tk.END)
+            self.on_curve_data_changed(self.current_curve)
+            self.mark_curve_dirty(self.current_curve)
+            self.update_data_list()
+            self.request_redraw()
     
     def update_chart_labels(self):
         """更新图表标题和坐标轴标签"""
         self.chart_title = self.title_entry.get()
         self.x_label = self.xlabel_entry.get()
         self.y_label = self.ylabel_entry.get()
+        self.mark_settings_dirty()
+        self.request_redraw()
+    
+    def request_redraw(self):
+        """请求重绘：标记脏数据后调用，同一轮事件循环内的多次请求只绘制一帧"""
+        if self.render_suspended:
+            self.redraw_deferred = True
+            return
+        if self.redraw_pending:
+            return
+        self.redraw_pending = True
+        elapsed = (time.perf_counter() - self.last_frame_time) * 1000
+        delay = int(self.min_frame_interval - elapsed)
+        if delay > 0:
+            # 距上一帧太近，等到最小间隔后再在空闲时绘制
+            self.root.after(delay, lambda: self.root.after_idle(self.render_frame))
+        else:
+            self.root.after_idle(self.render_frame)
+    
+    def render_frame(self):
+        """执行一次被合并的重绘"""
+        self.redraw_pending = False
+        if self.render_suspended:
+            self.redraw_deferred = True
+            return
+        self.last_frame_time = time.perf_counter()
         self.update_chart()
     
+    def suspend_rendering(self):
+        """暂停重绘（可嵌套），用于批量操作期间"""
+        self.render_suspended += 1
+    
+    def resume_rendering(self):
+        """恢复重绘，暂停期间有刷新请求时补绘一帧"""
+        self.render_suspended = max(0, self.render_suspended - 1)
+        if not self.render_suspended and self.redraw_deferred:
+            self.redraw_deferred = False
+            self.request_redraw()
+    
+    def on_curve_data_changed(self, name, added=None, removed=None):
+        """曲线数据每次追加或删除后调用：增量更新回归统计，开启实时拟合时刷新拟合结果"""
+        track_regression(self.curves[name], added, removed)
+        if self.live_fit_var.get():
+            self.apply_live_fit(name)
+        # 数据改变后缓存的置信带随绘图缓存失效
+        self.update_bands([name])
+    
+    def on_live_fit_toggle(self):
+        """开启实时拟合时立即拟合当前曲线"""
+        if self.live_fit_var.get() and self.current_curve:
+            self.apply_live_fit(self.current_curve)
+            self.request_redraw()
+    
+    def apply_live_fit(self, name):
+        """用累积统计量更新曲线的线性拟合，不遍历数据"""
+        curve = self.curves[name]
+        params = curve_regression(curve).result()
+        curve['fit_params'] = params
+        curve['fit_func'] = make_fit_func(params)
+        self.mark_curve_dirty(name)
+        if name == self.current_curve:
+            self.result_text.delete("1.0", tk.END)
+            if params is not None:
+                self.result_text.insert("1.0", format_fit_result(name, params, curve_regression(curve).n))
+    
+    def mark_curve_dirty(self, name):
+        """标记曲线的数据、样式、可见性或拟合已改变，下次刷新时只重建该曲线的图元"""
+        self.dirty_curves.add(name)
+    
+    def mark_settings_dirty(self):
+        """标记标题、坐标轴标签、字体大小或图例设置已改变"""
+        self.settings_dirty = True
+    
+    def mark_all_dirty(self):
+        """批量操作后标记所有曲线和设置都需要刷新"""
+        self.dirty_curves.update(self.curves.keys())
+        self.settings_dirty = True
+    
+    def build_scene(self, empty_title="请添加数据点"):
+        """由当前曲线和图表设置生成场景描述，屏幕和导出共用"""
+        legend_pos = self.legend_pos_var.get()
+        return Scene(self.curves, self.chart_title, self.x_label, self.y_label,
+                     font_size=int(self.font_size_var.get()),
+                     show_legend=self.show_legend_var.get(),
+                     legend_loc=self.legend_positions.get(legend_pos, legend_pos),
+                     empty_title=empty_title,
+                     band_method=BAND_OPTIONS[self.band_option_var.get()][0])
+    
     def update_chart(self):
-        self.ax.clear()
-        
-        # 获取字体大小
-        font_size = int(self.font_size_var.get())
-        
-        # 检查是否有可见的曲线
-        has_visible_data = False
-        
-        # 设置标题和标签
-        self.ax.set_xlabel(self.x_label, fontsize=font_size)
-        self.ax.set_ylabel(self.y_label, fontsize=font_size)
-        self.ax.set_title(self.chart_title, fontsize=font_size+2, fontweight='bold')
-        self.ax.grid(True, alpha=0.3)
-        
-        # 绘制每条可见的曲线
-        for name, curve in self.curves.items():
-            if curve['visible'] and curve['x'] and curve['y']:
-                has_visible_data = True
-                
-                # 绘制数据点 - 使用特定颜色和形状
-                marker = curve.get('marker', 'o')  # 如果没有marker属性则默认使用圆形
-                self.ax.scatter(curve['x'], curve['y'], color=curve['color'], 
-                             marker=marker, alpha=0.7, s=50, label=f'{name}')
-                
-                # 如果有拟合参数，绘制拟合线
-                if curve['fit_params'] is not None:
-                    fit_params = curve['fit_params']
-                    fit_type = fit_params.get('type', 'linear')
-                    
-                    x_array = np.array(curve['x'])
-                    x_fit = np.linspace(min(x_array), max(x_array), 200)  # 增加点数使曲线更平滑
-                    
-                    # 使用存储的拟合函数(如果有)或者根据拟合类型计算y值
-                    if 'fit_func' in curve and callable(curve['fit_func']):
-                        y_fit = curve['fit_func'](x_fit)
-                        # 使用与数据点相同的颜色
-                        fit_color = curve['color']
-                        # 绘制拟合曲线（不添加到图例）
-                        self.ax.plot(x_fit, y_fit, color=fit_color, linestyle='-', linewidth=2)
-                    else:
-                        # 向后兼容旧的线性拟合参数
-                        if 'slope' in fit_params and 'intercept' in fit_params:
-                            slope = fit_params['slope']
-                            intercept = fit_params['intercept']
-                            y_fit = slope * x_fit + intercept
-                            # 使用与数据点相同的颜色
-                            fit_color = curve['color']
-                            # 绘制拟合曲线（不添加到图例）
-                            self.ax.plot(x_fit, y_fit, color=fit_color, linestyle='-', linewidth=2)
-        
-        if not has_visible_data:
-            self.ax.set_title("请添加数据点", fontsize=font_size+2, fontweight='bold')
-        
-        # 设置刻度标签字体大小
-        self.ax.tick_params(axis='both', which='major', labelsize=font_size-1)
-        
-        # 根据用户选择添加图例
-        if has_visible_data and self.show_legend_var.get():
-            # 获取选择的图例位置
-            legend_pos = self.legend_pos_var.get()
-            # 尝试直接使用位置值，如果失败则从映射中获取
-            legend_loc = legend_pos
-            if legend_pos in self.legend_positions:
-                legend_loc = self.legend_positions[legend_pos]
-            
-            self.ax.legend(fontsize=font_size-1, loc=legend_loc, framealpha=0.9)
-        
+        """增量刷新图表：只同步被标记的曲线，设置改变时更新文字和图例"""
+        limits_reset = self.renderer.render(self.build_scene(), self.dirty_curves, self.settings_dirty)
+        self.dirty_curves.clear()
+        self.settings_dirty = False
+        if limits_reset:
+            # 数据范围变化后以新范围作为工具栏的"主页"视图
+            self.toolbar.update()
         self.canvas.draw()
     
+    def release_curve_views(self, name):
+        """内存映射的曲线数据被改写前，释放绘图缓存中对其数组的引用"""
+        release_curve_lod(self.curves[name])
+        self.renderer.invalidate_view(name)
+    
+    def on_view_changed(self, *args):
+        """缩放、平移或窗口大小变化后，空闲时刷新降采样点和密度图"""
+        if not self.lod_refresh_pending:
+            self.lod_refresh_pending = True
+            self.root.after_idle(self.refresh_lod_view)
+    
+    def refresh_lod_view(self):
+        self.lod_refresh_pending = False
+        if self.renderer.update_view():
+            self.request_redraw()
+    
+    def setup_crosshair(self):
+        """创建十字光标图元并绑定鼠标事件"""
+        self.crosshair_vline = self.ax.axvline(0, color='gray', linewidth=0.8, linestyle='--',
+                                               animated=True, visible=False)
+        self.crosshair_hline = self.ax.axhline(0, color='gray', linewidth=0.8, linestyle='--',
+                                               animated=True, visible=False)
+        self.crosshair_marker, = self.ax.plot([], [], marker='o', markersize=10, markerfacecolor='none',
+                                              markeredgecolor='black', markeredgewidth=1.5,
+                                              linestyle='none', animated=True, visible=False)
+        self.crosshair_text = self.ax.text(0.01, 0.99, '', transform=self.ax.transAxes, va='top', ha='left',
+                                           bbox=dict(boxstyle='round', facecolor='white', alpha=0.85),
+                                           animated=True, visible=False)
+        self.canvas.mpl_connect('draw_event', self.on_canvas_draw)
+        self.canvas.mpl_connect('motion_notify_event', self.on_mouse_move)
+        self.canvas.mpl_connect('axes_leave_event', self.on_mouse_leave)
+    
+    def crosshair_artists(self):
+        return (self.crosshair_vline, self.crosshair_hline, self.crosshair_marker, self.crosshair_text)
+    
+    def on_canvas_draw(self, event):
+        """完整重绘后缓存不含光标的背景，并使最近点查找缓存失效"""
+        self.crosshair_background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self.hover_points = None
+        self.draw_crosshair()
+    
+    def draw_crosshair(self):
+        """在缓存的背景上只重绘光标图元"""
+        if self.crosshair_background is None:
+            return
+        self.canvas.restore_region(self.crosshair_background)
+        for artist in self.crosshair_artists():
+            if artist.get_visible():
+                self.ax.draw_artist(artist)
+        self.canvas.blit(self.fig.bbox)
+    
+    def get_hover_points(self):
+        """当前显示的数据点及其屏幕坐标，降采样曲线只包含实际绘制的点"""
+        if self.hover_points is None:
+            self.hover_points = []
+            for name, record in self.renderer.records.items():
+                scatter = record['scatter']
+                if not scatter.get_visible():
+                    continue
+                offsets = np.asarray(scatter.get_offsets(), dtype=np.float64)
+                if len(offsets):
+                    self.hover_points.append((name, offsets, self.ax.transData.transform(offsets)))
+        return self.hover_points
+    
+    def find_nearest_point(self, event, radius=20):
+        """查找屏幕上距离鼠标 radius 像素内最近的数据点，返回 (曲线名称, x, y) 或 None"""
+        best = None
+        best_distance = radius * radius
+        for name, offsets, pixels in self.get_hover_points():
+            distance = (pixels[:, 0] - event.x) ** 2 + (pixels[:, 1] - event.y) ** 2
+            index = int(np.nanargmin(distance)) if np.isfinite(distance).any() else -1
+            if index >= 0 and distance[index] <= best_distance:
+                best_distance = distance[index]
+                best = (name, offsets[index, 0], offsets[index, 1])
+        return best
+    
+    def on_mouse_move(self, event):
+        """鼠标移动时更新十字光标和读数"""
+        if event.inaxes is not self.ax or event.xdata is None:
+            self.on_mouse_leave(event)
+            return
+        self.crosshair_vline.set_xdata([event.xdata, event.xdata])
+        self.crosshair_hline.set_ydata([event.ydata, event.ydata])
+        readout = f"x = {event.xdata:.6g}, y = {event.ydata:.6g}"
+        nearest = self.find_nearest_point(event)
+        if nearest is not None:
+            name, x, y = nearest
+            self.crosshair_marker.set_data([x], [y])
+            readout += f"\n最近点 {name}: ({x:.6g}, {y:.6g})"
+        self.crosshair_marker.set_visible(nearest is not None)
+        self.crosshair_text.set_text(readout)
+        self.crosshair_text.set_fontsize(int(self.font_size_var.get()) - 1)
+        for artist in (self.crosshair_vline, self.crosshair_hline, self.crosshair_text):
+            artist.set_visible(True)
+        self.draw_crosshair()
+    
+    def on_mouse_leave(self, event):
+        """鼠标离开绘图区时隐藏光标"""
+        if not any(artist.get_visible() for artist in self.crosshair_artists()):
+            return
+        for artist in self.crosshair_artists():
+            artist.set_visible(False)
+        self.draw_crosshair()
+    
     def perform_fitting(self):
         """执行各种曲线拟合"""
         if not self.current_curve:
@@ -904,245 +1381,318 @@ class ChartTool:
             return
             
         curve = self.curves[self.current_curve]
-        if len(curve['x']) < 2:
+        if len(curve['data']) < 2:
             messagebox.showerror("错误", "所选曲线至少需要2个数据点才能进行拟合!")
             return
             
         # 获取拟合类型
         fit_type = self.fit_type_var.get()
+        order = self.get_poly_order()
+        
+        # 非线性模型可选的初始参数 "a, b"，留空时以对数线性化的结果为初值
+        initial = None
+        initial_text = self.fit_params_entry.get().strip().replace('，', ',')
+        if fit_type in NONLINEAR_TYPES and initial_text:
+            try:
+                initial = [float(value) for value in initial_text.split(',')]
+            except ValueError:
+                initial = []
+            if len(initial) != 2:
+                messagebox.showerror("错误", "初始参数格式应为: a, b")
+                return
         
         try:
-            # 转换为numpy数组
-            x_array = np.array(curve['x'])
-            y_array = np.array(curve['y'])
-            
-            # 根据拟合类型执行不同的拟合
-            if fit_type == "linear":
-                # 线性拟合
-                slope, intercept, r_value, p_value, std_err = stats.linregress(x_array, y_array)
-                
-                # 生成拟合参数和方程
-                params = {
-                    'type': 'linear',
-                    'slope': slope,
-                    'intercept': intercept,
-                    'r_value': r_value,
-                    'p_value': p_value,
-                    'std_err': std_err,
-                    'equation': f"y = {slope:.6f}x + {intercept:.6f}"
-                }
-                
-                # 用于生成拟合曲线的函数
-                def fit_func(x):
-                    return slope * x + intercept
-                
-                result_text = f"""曲线: {self.current_curve} (线性拟合)
-拟合方程: {params['equation']}
-相关系数 R: {r_value:.6f}
-决定系数 R²: {r_value**2:.6f}
-P值: {p_value:.6e}
-标准误差: {std_err:.6f}
-数据点数量: {len(curve['x'])}"""
-                
-            elif fit_type == "polynomial":
-                # 多项式拟合
-                try:
-                    order = int(self.poly_order_var.get())
-                except:
-                    order = 2
-                
-                if order < 1:
-                    order = 1
-                elif order > 10:
-                    order = 10
-                
-                # 执行多项式拟合
-                coeffs = np.polyfit(x_array, y_array, order)
-                p = np.poly1d(coeffs)
-                
-                # 计算R²
-                y_fit = p(x_array)
-                r_squared = 1 - np.sum((y_array - y_fit) ** 2) / np.sum((y_array - np.mean(y_array)) ** 2)
-                
-                # 生成多项式方程字符串表示
-                equation = "y = "
-                for i, coef in enumerate(coeffs):
-                    power = order - i
-                    if power > 1:
-                        equation += f"{coef:.6f}x^{power} + "
-                    elif power == 1:
-                        equation += f"{coef:.6f}x + "
-                    else:
-                        equation += f"{coef:.6f}"
-                
-                # 生成拟合参数
-                params = {
-                    'type': 'polynomial',
-                    'order': order,
-                    'coeffs': coeffs.tolist(),  # 将numpy数组转换为列表以便存储
-                    'r_squared': r_squared,
-                    'equation': equation
-                }
-                
-                # 用于生成拟合曲线的函数
-                def fit_func(x):
-                    return p(x)
-                
-                result_text = f"""曲线: {self.current_curve} (多项式拟合，阶数: {order})
-拟合方程: {equation}
-决定系数 R²: {r_squared:.6f}
-数据点数量: {len(curve['x'])}"""
-                
-            elif fit_type == "exponential":
-                # 指数拟合 y = a * exp(b * x)
-                # 对数变换: ln(y) = ln(a) + b * x
-                
-                # 检查y值是否为正数
-                if np.any(y_array <= 0):
-                    messagebox.showerror("错误", "指数拟合要求所有Y值必须为正数!")
-                    return
-                
-                # 执行对数线性回归
-                log_y = np.log(y_array)
-                slope, intercept, r_value, p_value, std_err = stats.linregress(x_array, log_y)
-                
-                # 转换回原始参数
-                a = np.exp(intercept)
-                b = slope
-                
-                # 生成拟合参数
-                params = {
-                    'type': 'exponential',
-                    'a': a,
-                    'b': b,
-                    'r_value': r_value,
-                    'equation': f"y = {a:.6f} * exp({b:.6f} * x)"
-                }
-                
-                # 用于生成拟合曲线的函数
-                def fit_func(x):
-                    return a * np.exp(b * x)
-                
-                result_text = f"""曲线: {self.current_curve} (指数拟合)
-拟合方程: {params['equation']}
-相关系数 R: {r_value:.6f} (对数变换后)
-决定系数 R²: {r_value**2:.6f} (对数变换后)
-数据点数量: {len(curve['x'])}"""
-                
-            elif fit_type == "logarithmic":
-                # 对数拟合 y = a + b * ln(x)
-                
-                # 检查x值是否为正数
-                if np.any(x_array <= 0):
-                    messagebox.showerror("错误", "对数拟合要求所有X值必须为正数!")
-                    return
-                
-                # 计算对数x
-                log_x = np.log(x_array)
-                
-                # 执行线性回归
-                slope, intercept, r_value, p_value, std_err = stats.linregress(log_x, y_array)
-                
-                # 生成拟合参数
-                params = {
-                    'type': 'logarithmic',
-                    'a': intercept,
-                    'b': slope,
-                    'r_value': r_value,
-                    'equation': f"y = {intercept:.6f} + {slope:.6f} * ln(x)"
-                }
-                
-                # 用于生成拟合曲线的函数
-                def fit_func(x):
-                    # 避免对数计算中的负数或零
-                    x_safe = np.maximum(x, 1e-10)
-                    return intercept + slope * np.log(x_safe)
-                
-                result_text = f"""曲线: {self.current_curve} (对数拟合)
-拟合方程: {params['equation']}
-相关系数 R: {r_value:.6f}
-决定系数 R²: {r_value**2:.6f}
-数据点数量: {len(curve['x'])}"""
-                
-            elif fit_type == "power":
-                # 幂函数拟合 y = a * x^b
-                # 双对数变换: log(y) = log(a) + b * log(x)
-                
-                # 检查x和y值是否为正数
-                if np.any(x_array <= 0) or np.any(y_array <= 0):
-                    messagebox.showerror("错误", "幂函数拟合要求所有X值和Y值必须为正数!")
-                    return
-                
-                # 计算对数x和对数y
-                log_x = np.log(x_array)
-                log_y = np.log(y_array)
-                
-                # 执行线性回归
-                slope, intercept, r_value, p_value, std_err = stats.linregress(log_x, log_y)
-                
-                # 转换回原始参数
-                a = np.exp(intercept)
-                b = slope
-                
-                # 生成拟合参数
-                params = {
-                    'type': 'power',
-                    'a': a,
-                    'b': b,
-                    'r_value': r_value,
-                    'equation': f"y = {a:.6f} * x^{b:.6f}"
-                }
-                
-                # 用于生成拟合曲线的函数
-                def fit_func(x):
-                    # 避免计算中的负数或零
-                    x_safe = np.maximum(x, 1e-10)
-                    return a * np.power(x_safe, b)
-                
-                result_text = f"""曲线: {self.current_curve} (幂函数拟合)
-拟合方程: {params['equation']}
-相关系数 R: {r_value:.6f} (双对数变换后)
-决定系数 R²: {r_value**2:.6f} (双对数变换后)
-数据点数量: {len(curve['x'])}"""
-                
+            if fit_type == 'polynomial':
+                # 各阶结果来自同一次分解，缓存到数据改变为止，切换阶数不重新计算
+                params = polynomial_params(curve_polynomial_sweep(curve), order)
             else:
-                messagebox.showerror("错误", f"不支持的拟合类型: {fit_type}")
-                return
-            
-            # 保存拟合参数和函数到曲线数据
-            curve['fit_params'] = params
-            curve['fit_func'] = fit_func
-            
-            # 更新图表
-            self.update_chart()
-            
-            # 显示拟合结果
-            self.result_text.delete("1.0", tk.END)
-            self.result_text.insert("1.0", result_text)
-            
+                # 直接使用曲线数组视图
+                params = fit_curve(curve['data'].x, curve['data'].y, fit_type, order, initial)
+        except ValueError as e:
+            messagebox.showerror("错误", str(e))
+            return
         except Exception as e:
             messagebox.showerror("错误", f"曲线拟合失败: {str(e)}")
-            
-            # 显示拟合结果
-            result_text = f"""拟合方程: y = {slope:.6f}x + {intercept:.6f}
-相关系数 R: {r_value:.6f}
-决定系数 R²: {r_value**2:.6f}
-P值: {p_value:.6e}
-标准误差: {std_err:.6f}
-数据点数量: {len(self.x_data)}"""
-            
-            self.result_text.delete("1.0", tk.END)
-            self.result_text.insert("1.0", result_text)
-            
+            return
+        
+        # 保存拟合参数和函数到曲线数据
+        curve['fit_params'] = params
+        curve['fit_func'] = make_fit_func(params)
+        self.mark_curve_dirty(self.current_curve)
+        self.update_bands([self.current_curve])
+        
+        # 更新图表
+        self.request_redraw()
+        
+        # 显示拟合结果
+        self.result_text.delete("1.0", tk.END)
+        self.result_text.insert("1.0", format_fit_result(self.current_curve, params, len(curve['data'])))
+    
+    def get_poly_order(self):
+        """多项式阶数，选择"自动"时返回 None，由交叉验证决定"""
+        value = self.poly_order_var.get()
+        if value == POLY_ORDER_AUTO:
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            return 2
+    
+    def get_fit_executor(self):
+        """批量拟合的进程池，与导出一致使用 spawn"""
+        if self.fit_executor is None:
+            self.fit_executor = ProcessPoolExecutor(mp_context=multiprocessing.get_context('spawn'))
+        return self.fit_executor
+    
+    def on_band_option_change(self):
+        """切换置信带方法后重建所有曲线的图元"""
+        self.update_bands()
+        self.mark_all_dirty()
+        self.request_redraw()
+    
+    def update_bands(self, names=None):
+        """为有拟合结果的曲线计算自助法置信带并写入缓存
+
+        解析置信带计算很快，由绘图时按需计算；自助法较慢，只在拟合或数据改变后于此计算，
+        选择进程池时重采样分块提交到批量拟合的进程池，每条曲线同时最多一个任务。
+        内存中的曲线先写到一个临时映射文件，各块任务只传递文件路径，数据不随每个任务复制。
+        """
+        method, use_pool = BAND_OPTIONS[self.band_option_var.get()]
+        if method != 'bootstrap':
+            return
+        targets = [name for name in (self.curves if names is None else names)
+                   if name in self.curves and name not in self.band_jobs
+                   and bands_pending(self.curves[name], method)]
+        if not targets:
+            return
+        if not use_pool:
+            self.root.config(cursor='watch')
+            self.root.update_idletasks()
+            try:
+                for name in targets:
+                    curve_bands(self.curves[name], method)
+                    self.mark_curve_dirty(name)
+            finally:
+                self.root.config(cursor='')
+            self.request_redraw()
+            return
+        
+        parts = min(os.cpu_count() or 1, BOOTSTRAP_RESAMPLES)
+        counts = [len(chunk) for chunk in np.array_split(np.arange(BOOTSTRAP_RESAMPLES), parts)]
+        try:
+            executor = self.get_fit_executor()
+            for name in targets:
+                curve = self.curves[name]
+                data, params = curve['data'], curve['fit_params']
+                _, fit_line = curve_geometry(curve)
+                if fit_line is None:
+                    continue
+                shared = data if data.is_mapped else data_io.mapped_snapshot(data)
+                job = {'futures': [], 'data': data, 'version': data.version, 'fit_params': params,
+                       'x': fit_line[0], 'snapshot': None if shared is data else shared.path}
+                self.band_jobs[name] = job
+                job['futures'] = [executor.submit(bootstrap_task, shared, params, fit_line[0], count, seed)
+                                  for seed, count in enumerate(counts)]
+        except Exception as e:
+            messagebox.showerror("错误", f"置信带计算失败: {str(e)}")
+        if self.band_jobs and not self.band_poll_pending:
+            self.band_poll_pending = True
+            self.root.after(100, self.poll_band_jobs)
+    
+    def poll_band_jobs(self):
+        """取回进程池中完成的置信带，计算期间数据或拟合已改变的结果丢弃后重新计算"""
+        self.band_poll_pending = False
+        finished = [name for name, job in self.band_jobs.items() if all(f.done() for f in job['futures'])]
+        for name in finished:
+            job = self.band_jobs.pop(name)
+            if job['snapshot']:
+                try:
+                    os.remove(job['snapshot'])
+                except OSError:
+                    pass
+            curve = self.curves.get(name)
+            if curve is None:
+                continue
+            if (curve['data'] is not job['data'] or job['data'].version != job['version']
+                    or curve.get('fit_params') is not job['fit_params']):
+                self.update_bands([name])
+                continue
+            try:
+                bands = bootstrap_bands(job['fit_params'], job['x'], [f.result() for f in job['futures']])
+            except Exception:
+                bands = None
+            set_curve_bands(curve, 'bootstrap', bands)
+            self.mark_curve_dirty(name)
+            self.request_redraw()
+        # update_bands 可能已为新任务启动了轮询
+        if self.band_jobs and not self.band_poll_pending:
+            self.band_poll_pending = True
+            self.root.after(100, self.poll_band_jobs)
+    
+    def fit_all_curves(self):
+        """在进程池中拟合全部（或全部可见）曲线，完成后显示汇总表格"""
+        fit_type = self.fit_type_var.get()
+        order = self.get_poly_order()
+        visible_only = self.fit_visible_only_var.get()
+        targets = [name for name, curve in self.curves.items()
+                   if len(curve['data']) >= 2 and (curve['visible'] or not visible_only)]
+        if not targets:
+            messagebox.showerror("错误", "没有至少包含2个数据点的曲线可以拟合!")
+            return
+        
+        try:
+            executor = self.get_fit_executor()
+            # 记录提交时的数据对象和版本，拟合期间数据被修改的曲线不应用过期的结果
+            futures = {executor.submit(fit_task, name, self.curves[name]['data'], fit_type, order):
+                       (name, self.curves[name]['data'], self.curves[name]['data'].version)
+                       for name in targets}
         except Exception as e:
-            messagebox.showerror("错误", f"线性拟合失败: {str(e)}")
+            messagebox.showerror("错误", f"曲线拟合失败: {str(e)}")
+            return
+        
+        progress_window = tk.Toplevel(self.root)
+        progress_window.title("正在拟合曲线")
+        progress_window.geometry("420x150")
+        progress_window.resizable(False, False)
+        progress_window.transient(self.root)
+        
+        status_var = tk.StringVar(value=f"正在拟合 {len(targets)} 条曲线...")
+        ttk.Label(progress_window, textvariable=status_var, font=self.default_font).pack(pady=(15, 8), padx=15, anchor=tk.W)
+        progress_bar = ttk.Progressbar(progress_window, mode='determinate', maximum=len(targets))
+        progress_bar.pack(fill=tk.X, padx=15)
+        
+        def cancel():
+            for future in futures:
+                future.cancel()
+            progress_window.destroy()
+        
+        ttk.Button(progress_window, text="取消", command=cancel).pack(pady=15)
+        progress_window.protocol("WM_DELETE_WINDOW", cancel)
+        
+        rows = []
+        pending = set(futures)
+        started = time.perf_counter()
+        
+        def poll():
+            if not progress_window.winfo_exists():
+                return
+            for future in [future for future in pending if future.done()]:
+                pending.discard(future)
+                name, data, version = futures[future]
+                try:
+                    _, params, error, elapsed, count = future.result()
+                except Exception as e:
+                    params, error, elapsed, count = None, str(e), 0.0, len(data)
+                curve = self.curves.get(name)
+                if params is not None and (curve is None or curve['data'] is not data or data.version != version):
+                    params, error = None, "拟合期间数据已改变，结果未应用"
+                if params is not None:
+                    curve['fit_params'] = params
+                    curve['fit_func'] = make_fit_func(params)
+                    self.mark_curve_dirty(name)
+                    self.update_bands([name])
+                    self.request_redraw()
+                    if name == self.current_curve:
+                        self.result_text.delete("1.0", tk.END)
+                        self.result_text.insert("1.0", format_fit_result(name, params, count))
+                r_squared, p_value = fit_summary(params) if params is not None else (None, None)
+                rows.append({'name': name, 'type': params['type'] if params else fit_type, 'equation': params['equation'] if params else "",
+                             'r_squared': r_squared, 'p_value': p_value, 'count': count,
+                             'time_ms': elapsed * 1000, 'error': error or ""})
+            progress_bar['value'] = len(rows)
+            status_var.set(f"已完成 {len(rows)} / {len(targets)} 条曲线")
+            if pending:
+                self.root.after(50, poll)
+            else:
+                progress_window.destroy()
+                self.show_fit_results(rows, time.perf_counter() - started)
+        
+        self.root.after(50, poll)
+    
+    def show_fit_results(self, rows, total_time):
+        """显示批量拟合的汇总表格，点击列标题排序，可导出为CSV或Excel"""
+        window = tk.Toplevel(self.root)
+        window.title(f"批量拟合结果 - {len(rows)} 条曲线，用时 {total_time:.2f} 秒")
+        window.geometry("1000x500")
+        window.transient(self.root)
+        
+        columns = [('name', "曲线", 120), ('type', "拟合类型", 90), ('equation', "拟合方程", 300),
+                   ('r_squared', "R²", 90), ('p_value', "P值", 90), ('count', "点数", 80),
+                   ('time_ms', "耗时(毫秒)", 90), ('error', "错误", 200)]
+        
+        table_frame = ttk.Frame(window, padding=10)
+        table_frame.pack(fill=tk.BOTH, expand=True)
+        tree = ttk.Treeview(table_frame, columns=[key for key, _, _ in columns], show='headings')
+        scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        def cell(key, value):
+            if value is None:
+                return ""
+            if key == 'type':
+                return FIT_NAMES.get(value, value)
+            if key in ('r_squared',):
+                return f"{value:.6f}"
+            if key == 'p_value':
+                return f"{value:.3e}"
+            if key == 'time_ms':
+                return f"{value:.1f}"
+            return value
+        
+        sort_state = {'key': None, 'descending': False}
+        
+        def fill():
+            tree.delete(*tree.get_children())
+            for row in rows:
+                tree.insert('', 'end', values=[cell(key, row[key]) for key, _, _ in columns])
+        
+        def sort_by(key):
+            descending = sort_state['key'] == key and not sort_state['descending']
+            sort_state.update(key=key, descending=descending)
+            # 空值总是排在最后
+            present = [row for row in rows if row[key] is not None and row[key] != ""]
+            missing = [row for row in rows if row[key] is None or row[key] == ""]
+            present.sort(key=lambda row: row[key], reverse=descending)
+            rows[:] = present + missing
+            for column, title, _ in columns:
+                arrow = (" ▼" if descending else " ▲") if column == key else ""
+                tree.heading(column, text=title + arrow)
+            fill()
+        
+        for key, title, width in columns:
+            tree.heading(key, text=title, command=lambda k=key: sort_by(k))
+            tree.column(key, width=width, anchor=tk.W if key in ('name', 'equation', 'error') else tk.CENTER)
+        fill()
+        
+        def export_results():
+            file_path = filedialog.asksaveasfilename(
+                title="导出拟合结果", parent=window, defaultextension=".csv",
+                filetypes=[("CSV文件", "*.csv"), ("Excel文件", "*.xlsx")])
+            if not file_path:
+                return
+            try:
+                df = pd.DataFrame(rows).rename(columns={key: title for key, title, _ in columns})
+                if file_path.endswith('.xlsx'):
+                    df.to_excel(file_path, index=False)
+                else:
+                    df.to_csv(file_path, index=False, encoding='utf-8-sig')
+                messagebox.showinfo("成功", f"拟合结果已导出到:\n{file_path}", parent=window)
+            except Exception as e:
+                messagebox.showerror("错误", f"导出失败: {str(e)}", parent=window)
+        
+        button_frame = ttk.Frame(window, padding=(10, 0, 10, 10))
+        button_frame.pack(fill=tk.X)
+        ttk.Button(button_frame, text="关闭", command=window.destroy).pack(side=tk.RIGHT)
+        ttk.Button(button_frame, text="导出结果", command=export_results).pack(side=tk.RIGHT, padx=(0, 8))
     
     def export_image(self):
         """增强的图片导出功能"""
         # 检查是否有任何可见的曲线数据
         has_data = False
         for curve in self.curves.values():
-            if curve['visible'] and curve['x'] and curve['y']:
+            if curve['visible'] and len(curve['data']):
                 has_data = True
                 break
                 
@@ -1192,12 +1742,13 @@ P值: {p_value:.6e}
         format_frame = ttk.LabelFrame(settings_frame, text="文件格式", padding=15)
         format_frame.pack(fill=tk.X, padx=15, pady=10)
         
-        format_var = tk.StringVar(value="png")
+        # 可同时选择多种格式，图表只渲染一次
         formats = [("PNG图片 (推荐)", "png"), ("JPG图片", "jpg"), ("SVG矢量图", "svg"), ("PDF文件", "pdf")]
+        format_vars = {value: tk.BooleanVar(value=(value == "png")) for _, value in formats}
         
         for text, value in formats:
-            # 使用 tk.Radiobutton 而不是 ttk.Radiobutton 以支持字体设置
-            tk.Radiobutton(format_frame, text=text, variable=format_var, value=value, 
+            # 使用 tk.Checkbutton 而不是 ttk.Checkbutton 以支持字体设置
+            tk.Checkbutton(format_frame, text=text, variable=format_vars[value], 
                           font=self.default_font, bg=export_window.cget('bg')).pack(anchor=tk.W, pady=2)
         
         # 质量设置
@@ -1210,6 +1761,16 @@ P值: {p_value:.6e}
                                values=["150", "300", "600", "1200"], width=15, font=self.default_font)
         dpi_combo.pack(anchor=tk.W, pady=5)
         
+        # 默认按完整分辨率绘制所有数据点，取消后大数据量曲线按输出像素宽度降采样
+        full_resolution_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(quality_frame, text="完整分辨率绘制数据点", 
+                      variable=full_resolution_var).pack(anchor=tk.W, pady=(5, 0))
+        
+        # SVG/PDF中点数很多的散点层按所选DPI栅格化，坐标轴、文字和拟合线仍为矢量
+        rasterize_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(quality_frame, text="矢量格式中栅格化密集散点", 
+                      variable=rasterize_var).pack(anchor=tk.W, pady=(5, 0))
+        
         # 尺寸设置
         size_frame = ttk.LabelFrame(settings_frame, text="图片尺寸", padding=15)
         size_frame.pack(fill=tk.X, padx=15, pady=10)
@@ -1228,103 +1789,29 @@ P值: {p_value:.6e}
         
         def do_export():
             try:
-                file_format = format_var.get()
+                file_formats = [value for _, value in formats if format_vars[value].get()]
+                if not file_formats:
+                    messagebox.showerror("错误", "请至少选择一种文件格式!", parent=export_window)
+                    return
                 dpi = int(dpi_var.get())
                 width = float(width_var.get())
                 height = float(height_var.get())
                 
-                # 选择保存位置
+                # 选择保存位置，多种格式时以所选文件名为基础名
                 file_path = filedialog.asksaveasfilename(
                     title="导出图片",
-                    defaultextension=f".{file_format}",
-                    filetypes=[(f"{file_format.upper()}文件", f"*.{file_format}"), ("所有文件", "*.*")]
+                    defaultextension=f".{file_formats[0]}",
+                    filetypes=[(f"{file_format.upper()}文件", f"*.{file_format}") for file_format in file_formats]
+                              + [("所有文件", "*.*")]
                 )
                 
                 if file_path:
-                    # 创建新的图形用于导出
-                    export_fig, export_ax = plt.subplots(figsize=(width, height))
-                    
-                    # 获取当前字体大小
-                    font_size = int(self.font_size_var.get())
-                    
-                    # 设置标题和标签
-                    export_ax.set_xlabel(self.x_label, fontsize=font_size)
-                    export_ax.set_ylabel(self.y_label, fontsize=font_size)
-                    export_ax.set_title(self.chart_title, fontsize=font_size+2, fontweight='bold')
-                    export_ax.grid(True, alpha=0.3)
-                    
-                    # 检查是否有可见的曲线数据
-                    has_visible_data = False
-                    
-                    # 绘制每条可见的曲线
-                    for name, curve in self.curves.items():
-                        if curve['visible'] and curve['x'] and curve['y']:
-                            has_visible_data = True
-                            
-                            # 绘制数据点 - 使用特定颜色和形状
-                            marker = curve.get('marker', 'o')  # 如果没有marker属性则默认使用圆形
-                            export_ax.scatter(curve['x'], curve['y'], color=curve['color'], 
-                                         marker=marker, alpha=0.7, s=50, label=f'{name}')
-                            
-                            # 如果有拟合参数，绘制拟合线
-                            if curve['fit_params'] is not None:
-                                fit_params = curve['fit_params']
-                                fit_type = fit_params.get('type', 'linear')
-                                
-                                x_array = np.array(curve['x'])
-                                x_fit = np.linspace(min(x_array), max(x_array), 200)  # 增加点数使曲线更平滑
-                                
-                                # 使用存储的拟合函数(如果有)或者根据拟合类型计算y值
-                                if 'fit_func' in curve and callable(curve['fit_func']):
-                                    y_fit = curve['fit_func'](x_fit)
-                                    # 使用与数据点相同的颜色
-                                    fit_color = curve['color']
-                                    # 绘制拟合曲线（不添加到图例）
-                                    export_ax.plot(x_fit, y_fit, color=fit_color, linestyle='-', linewidth=2)
-                                else:
-                                    # 向后兼容旧的线性拟合参数
-                                    if 'slope' in fit_params and 'intercept' in fit_params:
-                                        slope = fit_params['slope']
-                                        intercept = fit_params['intercept']
-                                        y_fit = slope * x_fit + intercept
-                                        # 使用与数据点相同的颜色
-                                        fit_color = curve['color']
-                                        # 绘制拟合曲线（不添加到图例）
-                                        export_ax.plot(x_fit, y_fit, color=fit_color, linestyle='-', linewidth=2)
-            
-                    if not has_visible_data:
-                        export_ax.set_title("无数据", fontsize=font_size+2, fontweight='bold')
-                    else:
-                        # 根据用户设置显示图例
-                        if self.show_legend_var.get():
-                            # 获取选择的图例位置
-                            legend_pos = self.legend_pos_var.get()
-                            # 尝试直接使用位置值，如果失败则从映射中获取
-                            legend_loc = legend_pos
-                            if legend_pos in self.legend_positions:
-                                legend_loc = self.legend_positions[legend_pos]
-                        
-                            export_ax.legend(fontsize=font_size-1, loc=legend_loc, framealpha=0.9)
-            
-                    # 调整布局
-                    export_fig.tight_layout()
-                    
-                    # 保存图片
-                    export_fig.savefig(
-                        file_path, 
-                        format=file_format,
-                        dpi=dpi, 
-                        bbox_inches='tight', 
-                        facecolor='white',
-                        edgecolor='none',
-                        transparent=False
-                    )
-                    
-                    # 关闭导出图形，释放内存
-                    plt.close(export_fig)
-                    
+                    base = os.path.splitext(file_path)[0] if len(file_formats) > 1 else None
+                    outputs = [(file_path if base is None else f"{base}.{file_format}", file_format, dpi)
+                               for file_format in file_formats]
                     export_window.destroy()
-                    messagebox.showinfo("成功", f"图片已导出到:\n{file_path}")
+                    self.start_export_job(outputs, (width, height), downsample=not full_resolution_var.get(),
+                                          rasterize=rasterize_var.get())
                     
             except Exception as e:
                 messagebox.showerror("错误", f"导出失败: {str(e)}")
@@ -1333,11 +1820,11 @@ P值: {p_value:.6e}
         ttk.Button(button_frame, text="取消", command=export_window.destroy).pack(side=tk.RIGHT)
 
     def quick_export(self, format_type):
-        """快速导出指定格式"""
+        """快速导出指定格式，format_type 为 'all' 时一次渲染同时导出 PNG、PDF 和 SVG"""
         # 检查是否有任何可见的曲线数据
         has_data = False
         for curve in self.curves.values():
-            if curve['visible'] and curve['x'] and curve['y']:
+            if curve['visible'] and len(curve['data']):
                 has_data = True
                 break
                 
@@ -1345,124 +1832,83 @@ P值: {p_value:.6e}
             messagebox.showerror("错误", "没有可见的曲线数据可以导出!")
             return
         
+        formats = ['png', 'pdf', 'svg'] if format_type == 'all' else [format_type]
+        
         # 生成默认文件名
         import datetime
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        default_name = f"chart_{timestamp}.{format_type}"
+        default_name = f"chart_{timestamp}.{formats[0]}"
+        title = "快速导出PNG/PDF/SVG" if format_type == 'all' else f"快速导出{format_type.upper()}"
         
         file_path = filedialog.asksaveasfilename(
-            title=f"快速导出{format_type.upper()}",
+            title=title,
             initialfile=default_name,  # 修正参数名
-            defaultextension=f".{format_type}",
-            filetypes=[(f"{format_type.upper()}文件", f"*.{format_type}"), ("所有文件", "*.*")]
+            defaultextension=f".{formats[0]}",
+            filetypes=[(f"{formats[0].upper()}文件", f"*.{formats[0]}"), ("所有文件", "*.*")]
         )
         
         if file_path:
-            try:
-                # 根据格式设置不同的参数
-                if format_type == 'png':
-                    dpi = 300
-                elif format_type == 'pdf':
-                    dpi = 300
-                elif format_type == 'svg':
-                    dpi = 72
-                
-                # 创建新的图形用于导出
-                export_fig, export_ax = plt.subplots(figsize=(12, 9))
-                
-                # 获取当前字体大小
-                font_size = int(self.font_size_var.get())
-                
-                # 设置标题和标签
-                export_ax.set_xlabel(self.x_label, fontsize=font_size)
-                export_ax.set_ylabel(self.y_label, fontsize=font_size)
-                export_ax.set_title(self.chart_title, fontsize=font_size+2, fontweight='bold')
-                export_ax.grid(True, alpha=0.3)
-                
-                # 检查是否有可见的曲线数据
-                has_visible_data = False
-                
-                # 绘制每条可见的曲线
-                for name, curve in self.curves.items():
-                    if curve['visible'] and curve['x'] and curve['y']:
-                        has_visible_data = True
-                        
-                        # 绘制数据点 - 使用特定颜色和形状
-                        marker = curve.get('marker', 'o')  # 如果没有marker属性则默认使用圆形
-                        export_ax.scatter(curve['x'], curve['y'], color=curve['color'], 
-                                     marker=marker, alpha=0.7, s=50, label=f'{name}')
-                        
-                        # 如果有拟合参数，绘制拟合线
-                        if curve['fit_params'] is not None:
-                            fit_params = curve['fit_params']
-                            fit_type = fit_params.get('type', 'linear')
-                            
-                            x_array = np.array(curve['x'])
-                            x_fit = np.linspace(min(x_array), max(x_array), 200)  # 增加点数使曲线更平滑
-                            
-                            # 使用存储的拟合函数(如果有)或者根据拟合类型计算y值
-                            if 'fit_func' in curve and callable(curve['fit_func']):
-                                y_fit = curve['fit_func'](x_fit)
-                                # 使用与数据点相同的颜色
-                                fit_color = curve['color']
-                                # 绘制拟合曲线（不添加到图例）
-                                export_ax.plot(x_fit, y_fit, color=fit_color, linestyle='-', linewidth=2)
-                            else:
-                                # 向后兼容旧的线性拟合参数
-                                if 'slope' in fit_params and 'intercept' in fit_params:
-                                    slope = fit_params['slope']
-                                    intercept = fit_params['intercept']
-                                    y_fit = slope * x_fit + intercept
-                                    # 使用与数据点相同的颜色
-                                    fit_color = curve['color']
-                                    # 绘制拟合曲线（不添加到图例）
-                                    export_ax.plot(x_fit, y_fit, color=fit_color, linestyle='-', linewidth=2)
-            
-                if not has_visible_data:
-                    export_ax.set_title("无数据", fontsize=font_size+2, fontweight='bold')
+            # 多种格式时以所选文件名为基础名；SVG 的页面尺寸与 DPI 无关，DPI 只决定其中
+            # 栅格化散点层的分辨率，因此与 PNG/PDF 一样使用 300
+            base = os.path.splitext(file_path)[0] if format_type == 'all' else None
+            outputs = [(file_path if base is None else f"{base}.{file_format}", file_format, 300)
+                       for file_format in formats]
+            self.start_export_job(outputs, (12, 9))
+    
+    def start_export_job(self, outputs, size, downsample=False, rasterize=True):
+        """在后台进程中导出图片，进度窗口不阻塞主界面"""
+        try:
+            job = ExportJob(self.build_scene(empty_title="无数据"), size, outputs, downsample, rasterize)
+            job.start()
+        except Exception as e:
+            messagebox.showerror("错误", f"导出失败: {str(e)}")
+            return
+        
+        progress_window = tk.Toplevel(self.root)
+        progress_window.title("正在导出图片")
+        progress_window.geometry("420x150")
+        progress_window.resizable(False, False)
+        progress_window.transient(self.root)
+        
+        status_var = tk.StringVar(value="正在渲染图表...")
+        ttk.Label(progress_window, textvariable=status_var, font=self.default_font).pack(pady=(15, 8), padx=15, anchor=tk.W)
+        progress_bar = ttk.Progressbar(progress_window, mode='determinate', maximum=len(outputs))
+        progress_bar.pack(fill=tk.X, padx=15)
+        
+        def cancel():
+            job.cancel()
+            progress_window.destroy()
+        
+        ttk.Button(progress_window, text="取消", command=cancel).pack(pady=15)
+        progress_window.protocol("WM_DELETE_WINDOW", cancel)
+        
+        def poll():
+            if not progress_window.winfo_exists():
+                return
+            for kind, *payload in job.poll():
+                if kind == 'progress':
+                    index, file_path = payload
+                    progress_bar['value'] = index
+                    status_var.set(f"正在写入 ({index + 1}/{len(outputs)}): {os.path.basename(file_path)}")
                 else:
-                    # 根据用户设置显示图例
-                    if self.show_legend_var.get():
-                        # 获取选择的图例位置
-                        legend_pos = self.legend_pos_var.get()
-                        # 尝试直接使用位置值，如果失败则从映射中获取
-                        legend_loc = legend_pos
-                        if legend_pos in self.legend_positions:
-                            legend_loc = self.legend_positions[legend_pos]
-                        
-                        export_ax.legend(fontsize=font_size-1, loc=legend_loc, framealpha=0.9)
-                
-                # 设置刻度标签字体大小
-                export_ax.tick_params(axis='both', which='major', labelsize=font_size-1)
-                
-                # 调整布局
-                export_fig.tight_layout()
-                
-                # 保存图片
-                export_fig.savefig(
-                    file_path, 
-                    format=format_type,
-                    dpi=dpi, 
-                    bbox_inches='tight', 
-                    facecolor='white',
-                    edgecolor='none'
-                )
-                
-                # 关闭导出图形，释放内存
-                plt.close(export_fig)
-                
-                messagebox.showinfo("成功", f"{format_type.upper()}文件已导出到:\n{file_path}")
-            except Exception as e:
-                messagebox.showerror("错误", f"导出失败: {str(e)}")
-
+                    progress_window.destroy()
+                    if kind == 'done':
+                        messagebox.showinfo("成功", "图片已导出到:\n" + "\n".join(payload[0]))
+                    else:
+                        messagebox.showerror("错误", f"导出失败: {payload[0]}")
+                    return
+            self.root.after(100, poll)
+        
+        self.root.after(100, poll)
+    
     def export_data(self):
-        """导出当前选择曲线的数据"""
+        """导出当前选择曲线的数据（Parquet / Arrow / HDF5 格式导出全部曲线）"""
         if not self.current_curve:
             messagebox.showerror("错误", "请先选择一条曲线!")
             return
             
         curve = self.curves[self.current_curve]
-        if not curve['x'] or not curve['y']:
+        if not len(curve['data']):
             messagebox.showerror("错误", f"当前选择的曲线 '{self.current_curve}' 没有数据可以导出!")
             return
         
@@ -1480,27 +1926,31 @@ P值: {p_value:.6e}
                 ("Excel文件", "*.xlsx"),
                 ("文本文件", "*.txt"), 
                 ("JSON文件", "*.json"),
+                ("Parquet文件 (全部曲线)", "*.parquet"),
+                ("Arrow/Feather文件 (全部曲线)", "*.feather"),
+                ("HDF5文件 (全部曲线)", "*.h5"),
                 ("所有文件", "*.*")
             ]
         )
         
         if file_path:
             try:
+                if data_io.columnar_format(file_path):
+                    # 列式二进制格式：导出所有曲线及其拟合参数
+                    data_io.write_curves(file_path, self.curves)
+                    messagebox.showinfo("成功", f"全部 {len(self.curves)} 条曲线的数据已导出到:\n{file_path}")
+                    return
+                
                 if file_path.endswith('.csv'):
                     # 导出为CSV格式
-                    import csv
-                    with open(file_path, 'w', encoding='utf-8-sig', newline='') as f:
-                        writer = csv.writer(f)
-                        writer.writerow(["X", "Y"])
-                        
-                        for i in range(len(curve['x'])):
-                            writer.writerow([curve['x'][i], curve['y'][i]])
+                    df = pd.DataFrame({"X": curve['data'].x, "Y": curve['data'].y})
+                    df.to_csv(file_path, index=False, encoding='utf-8-sig')
                 
                 elif file_path.endswith('.xlsx'):
                     # 导出为Excel格式
                     df = pd.DataFrame({
-                        "X": curve['x'],
-                        "Y": curve['y']
+                        "X": curve['data'].x,
+                        "Y": curve['data'].y
                     })
                     
                     with pd.ExcelWriter(file_path) as writer:
@@ -1522,12 +1972,10 @@ P值: {p_value:.6e}
                     json_data = {
                         "curve_name": self.current_curve,
                         "color": curve['color'],
-                        "points": []
+                        "points": [{"x": x, "y": y} for x, y in
+                                   zip(curve['data'].x.tolist(), curve['data'].y.tolist())]
                     }
                     
-                    for i in range(len(curve['x'])):
-                        json_data["points"].append({"x": curve['x'][i], "y": curve['y'][i]})
-                    
                     # 如果有拟合参数，也添加进去
                     if curve['fit_params'] is not None:
                         json_data["fit"] = {k: v for k, v in curve['fit_params'].items() 
@@ -1542,8 +1990,8 @@ P值: {p_value:.6e}
                     with open(file_path, 'w', encoding='utf-8') as f:
                         f.write(f"曲线: {self.current_curve}\n")
                         f.write(f"X\tY\n")
-                        for i in range(len(curve['x'])):
-                            f.write(f"{curve['x'][i]}\t{curve['y'][i]}\n")
+                        np.savetxt(f, np.column_stack((curve['data'].x, curve['data'].y)),
+                                   delimiter='\t', fmt='%.17g')
                 
                 messagebox.showinfo("成功", f"曲线 '{self.current_curve}' 的数据已导出到:\n{file_path}")
             except Exception as e:
@@ -1552,21 +2000,35 @@ P值: {p_value:.6e}
     def on_title_change(self, event):
         """标题实时更新"""
         self.chart_title = self.title_entry.get()
-        self.update_chart()
+        self.mark_settings_dirty()
+        self.request_redraw()
     
     def on_xlabel_change(self, event):
         """X轴标签实时更新"""
         self.x_label = self.xlabel_entry.get()
-        self.update_chart()
+        self.mark_settings_dirty()
+        self.request_redraw()
     
     def on_ylabel_change(self, event):
         """Y轴标签实时更新"""
         self.y_label = self.ylabel_entry.get()
-        self.update_chart()
+        self.mark_settings_dirty()
+        self.request_redraw()
     
     def on_font_size_change(self, event):
         """字体大小变化"""
-        self.update_chart()
+        self.mark_settings_dirty()
+        self.request_redraw()
+    
+    def on_legend_change(self):
+        """图例显示开关变化"""
+        self.mark_settings_dirty()
+        self.request_redraw()
+    
+    def on_legend_pos_change(self):
+        """图例位置变化"""
+        self.mark_settings_dirty()
+        self.request_redraw()
     
     def reset_labels(self):
         """重置所有标签到默认值"""
@@ -1612,12 +2074,14 @@ P值: {p_value:.6e}
    优点: 灵活性高，可以拟合复杂曲线。
    限制: 阶数过高可能导致过拟合，建议根据数据特性选择适当阶数。
    说明: 阶数为1相当于线性拟合，阶数越高曲线越灵活。
+   计算时X先缩放到[-1, 1]并用正交分解求解，X为时间戳等大数值时也不会失真；
+   1~10阶的结果与各阶的5折交叉验证误差一次算出，阶数选"自动"时按一倍标准误差规则取交叉验证误差与最小值相差不超过一倍标准误差的最低阶数。
 
 3. 指数拟合 (Exponential)
    方程形式: y = a·eᵇˣ
    适用情况: 增长/衰减速率与当前值成正比，如放射性衰变、人口增长等。
    优点: 适合描述指数增长或衰减过程。
-   限制: 要求所有y值必须为正数。
+   限制: y值含零或负数时，建议在"初始参数"中给出 a, b 的估计值。
 
 4. 对数拟合 (Logarithmic)
    方程形式: y = a + b·ln(x)
@@ -1629,7 +2093,17 @@ P值: {p_value:.6e}
    方程形式: y = a·xᵇ
    适用情况: 在对数-对数坐标系中呈线性关系的数据，如面积与半径、物理定律等。
    优点: 适合描述某些物理和生物学关系。
-   限制: 要求所有x值和y值必须为正数。
+   限制: 要求所有x值必须为正数。
+
+6. 自动选择 (Auto)
+   同时拟合线性、2~6阶多项式、指数、对数和幂函数模型，按原始Y尺度上的AIC
+   (赤池信息准则) 选出最优模型，结果中列出各模型的排名、AIC、BIC和R²。
+   适用情况: 不确定数据适合哪种模型时。
+   限制: 不满足前提条件的模型 (如含非正数时的对数拟合) 会被跳过；参数个数
+   不少于数据点数的多项式属于精确插值，显示为"跳过: 点数不足"，不参与排名。
+
+指数、对数和幂函数在原始尺度上做非线性最小二乘，结果给出参数的标准误差。
+"初始参数"可填写 a, b 作为迭代初值，留空时使用对数变换后线性回归的结果。
 
 选择合适的拟合类型建议:
 • 首先观察数据点分布趋势
@@ -1648,9 +2122,14 @@ R²值介于0到1之间，越接近1表示模型拟合效果越好。但要注
         ttk.Button(help_window, text="关闭", command=help_window.destroy).pack(pady=15)
 
 def main():
+    # 带 --batch 时在命令行批量出图，不创建窗口；其他参数（如 --large-ui）留给界面
+    args, _ = batch.build_parser().parse_known_args()
+    if args.batch:
+        sys.exit(batch.run_batch(args))
     root = tk.Tk()
     app = ChartTool(root)
     root.mainloop()
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # 打包为exe后导出子进程需要
     main()
\ No newline at end of file
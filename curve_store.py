@@ -0,0 +1,340 @@
+import os
+
+import numpy as np
+
+
+class CurveData:
+    """单条曲线的列式数据存储
+
+    X/Y 分别保存在连续的 float64 数组中，容量按倍数增长，
+    追加为均摊 O(1)；x / y 属性返回零拷贝视图。
+    version 在每次修改后递增，供绘图缓存判断数据是否变化。
+    """
+
+    MIN_CAPACITY = 16
+
+    def __init__(self, x=None, y=None):
+        self._x = np.empty(self.MIN_CAPACITY, dtype=np.float64)
+        self._y = np.empty(self.MIN_CAPACITY, dtype=np.float64)
+        self._size = 0
+        self.version = 0
+        if x is not None and y is not None:
+            self.extend(x, y)
+
+    @classmethod
+    def from_arrays(cls, x, y):
+        """直接接管已有数组（类型匹配且连续时不复制）"""
+        x = np.ascontiguousarray(x, dtype=np.float64).ravel()
+        y = np.ascontiguousarray(y, dtype=np.float64).ravel()
+        if x.shape != y.shape:
+            raise ValueError("X和Y数据长度不一致")
+        data = cls.__new__(cls)
+        data._x = x
+        data._y = y
+        data._size = len(x)
+        data.version = 0
+        return data
+
+    def __reduce__(self):
+        # 序列化时只保存有效数据，不含预留容量
+        return (_restore_curve, (self.x, self.y, self.version))
+
+    def __len__(self):
+        return self._size
+
+    def __bool__(self):
+        return self._size > 0
+
+    @property
+    def is_mapped(self):
+        """数据是否由内存映射文件提供"""
+        return isinstance(self, MappedCurveData)
+
+    @property
+    def backing_file(self):
+        """数据所在的内存映射文件路径，数据在内存中时为 None"""
+        array = self._x
+        while array is not None:
+            if isinstance(array, np.memmap):
+                return array.filename
+            array = array.base
+        return None
+
+    @property
+    def x(self):
+        """X数据的只读视图"""
+        view = self._x[:self._size]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def y(self):
+        """Y数据的只读视图"""
+        view = self._y[:self._size]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def capacity(self):
+        return len(self._x)
+
+    def _reserve(self, needed):
+        """确保容量至少为 needed，不足时按1.5倍以上扩容"""
+        capacity = len(self._x)
+        if needed <= capacity and self._x.flags.writeable:
+            return
+        new_capacity = max(needed, self.MIN_CAPACITY, capacity + (capacity >> 1))
+        new_x = np.empty(new_capacity, dtype=np.float64)
+        new_y = np.empty(new_capacity, dtype=np.float64)
+        new_x[:self._size] = self._x[:self._size]
+        new_y[:self._size] = self._y[:self._size]
+        self._x = new_x
+        self._y = new_y
+
+    def append(self, x, y):
+        """追加单个数据点"""
+        self._reserve(self._size + 1)
+        self._x[self._size] = x
+        self._y[self._size] = y
+        self._size += 1
+        self.version += 1
+
+    def extend(self, x, y):
+        """批量追加数据点"""
+        x = np.asarray(x, dtype=np.float64).ravel()
+        y = np.asarray(y, dtype=np.float64).ravel()
+        if x.shape != y.shape:
+            raise ValueError("X和Y数据长度不一致")
+        count = len(x)
+        if count == 0:
+            return
+        self._reserve(self._size + count)
+        self._x[self._size:self._size + count] = x
+        self._y[self._size:self._size + count] = y
+        self._size += count
+        self.version += 1
+
+    def _keep_mask(self, selection):
+        """把下标集合或布尔掩码转换为保留掩码，越界下标被忽略；没有要删除的点时返回 None"""
+        selection = np.asarray(selection)
+        if selection.dtype == bool:
+            if selection.shape != (self._size,):
+                raise ValueError("掩码长度与数据点数不一致")
+            keep = ~selection
+        else:
+            indices = selection.astype(np.intp, copy=False).ravel()
+            indices = indices[(indices >= 0) & (indices < self._size)]
+            keep = np.ones(self._size, dtype=bool)
+            keep[indices] = False
+        return None if keep.all() else keep
+
+    def remove(self, selection):
+        """删除下标集合或布尔掩码选中的数据点，一次遍历压缩数组，返回删除的点数"""
+        keep = self._keep_mask(selection)
+        if keep is None:
+            return 0
+        removed = self._size - int(np.count_nonzero(keep))
+        self._x = self._x[:self._size][keep]
+        self._y = self._y[:self._size][keep]
+        self._size = len(self._x)
+        self.version += 1
+        return removed
+
+    def truncate(self, size):
+        """只保留前 size 个数据点"""
+        self._size = max(0, min(size, self._size))
+        self.version += 1
+
+    def clear(self):
+        """清空数据并释放多余内存"""
+        self._x = np.empty(self.MIN_CAPACITY, dtype=np.float64)
+        self._y = np.empty(self.MIN_CAPACITY, dtype=np.float64)
+        self._size = 0
+        self.version += 1
+
+    def copy(self):
+        """返回独立的数据副本"""
+        return CurveData.from_arrays(self.x.copy(), self.y.copy())
+
+
+class MappedCurveData(CurveData):
+    """基于内存映射文件的曲线数据
+
+    文件为无文件头的小端 float64 (x, y) 交错数据，点数由文件大小推出。
+    数据只在访问时由操作系统按页载入，适合超过内存容量的数据集。
+    copy_on_write 为 True 时（如由源文件生成的缓存），首次修改前先把数据写到
+    同目录下的新文件并改为映射该文件，原文件保持不变。
+    """
+
+    ITEM_BYTES = 16
+    REWRITE_CHUNK = 1 << 20
+
+    def __init__(self, path, copy_on_write=False):
+        self.path = os.path.abspath(path)
+        if not os.path.exists(self.path):
+            open(self.path, 'wb').close()
+        self.version = 0
+        self.copy_on_write = copy_on_write
+        self._map()
+
+    @classmethod
+    def create(cls, path, chunks):
+        """由 (x, y) 数据块迭代器写入新的映射文件"""
+        os.replace(_write_part(path, chunks), path)
+        return cls(path)
+
+    def __reduce__(self):
+        # 跨进程传递时只传文件路径，在目标进程中重新映射
+        return (_restore_mapped, (self.path, self.version, self.copy_on_write))
+
+    def _map(self):
+        count = os.path.getsize(self.path) // self.ITEM_BYTES
+        if count:
+            pairs = np.memmap(self.path, dtype='<f8', mode='r', shape=(count, 2))
+        else:
+            pairs = np.empty((0, 2), dtype=np.float64)
+        self._x = pairs[:, 0]
+        self._y = pairs[:, 1]
+        self._size = count
+
+    def _release(self):
+        self._x = self._y = np.empty(0, dtype=np.float64)
+        self._size = 0
+
+    def _write_copy(self, chunks):
+        """把数据块写入新文件并改为映射该文件，原文件保持不变"""
+        path = unique_path(self.path)
+        os.replace(_write_part(path, chunks), path)
+        self.path = path
+        self.copy_on_write = False
+        self._map()
+
+    def append(self, x, y):
+        self.extend([x], [y])
+
+    def extend(self, x, y):
+        pairs = _pairs(x, y)
+        if len(pairs) == 0:
+            return
+        if self.copy_on_write:
+            self._write_copy(_prefix_chunks(self._x, self._y, self._size, self.REWRITE_CHUNK))
+        with open(self.path, 'ab') as f:
+            pairs.tofile(f)
+        self._map()
+        self.version += 1
+
+    def remove(self, selection):
+        keep = self._keep_mask(selection)
+        if keep is None:
+            return 0
+        removed = self._size - int(np.count_nonzero(keep))
+        if self.copy_on_write:
+            self._write_copy(_kept_chunks(self._x, self._y, keep, self.REWRITE_CHUNK))
+            self.version += 1
+            return removed
+        # 先由旧映射写出新文件，释放对旧映射的全部引用后再替换：
+        # Windows 下仍被映射的文件无法替换
+        x, y = self._x, self._y
+        self._release()
+        try:
+            tmp_path = _write_part(self.path, _kept_chunks(x, y, keep, self.REWRITE_CHUNK))
+        except Exception:
+            self._map()
+            raise
+        del x, y
+        os.replace(tmp_path, self.path)
+        self._map()
+        self.version += 1
+        return removed
+
+    def truncate(self, size):
+        size = max(0, min(size, self._size))
+        if size == self._size:
+            return
+        if self.copy_on_write:
+            self._write_copy(_prefix_chunks(self._x, self._y, size, self.REWRITE_CHUNK))
+            self.version += 1
+            return
+        self._release()
+        os.truncate(self.path, size * self.ITEM_BYTES)
+        self._map()
+        self.version += 1
+
+    def move_to(self, path):
+        """把映射文件移动到新路径并重新映射，移动失败时仍映射原文件"""
+        self._release()
+        try:
+            os.replace(self.path, path)
+        except OSError:
+            self._map()
+            raise
+        self.path = os.path.abspath(path)
+        self._map()
+
+    def clear(self):
+        if self.copy_on_write:
+            self._write_copy([])
+        else:
+            self._release()
+            open(self.path, 'wb').close()
+        self.version += 1
+
+    def copy(self):
+        """复制到内存中的普通曲线数据"""
+        return CurveData.from_arrays(np.array(self.x), np.array(self.y))
+
+
+def _restore_curve(x, y, version):
+    data = CurveData.from_arrays(np.array(x), np.array(y))
+    data.version = version
+    return data
+
+
+def _restore_mapped(path, version, copy_on_write=False):
+    data = MappedCurveData(path, copy_on_write)
+    data.version = version
+    return data
+
+
+def unique_path(path):
+    """返回与 path 同目录、同扩展名且尚不存在的文件路径，path 本身不存在时直接返回"""
+    root, ext = os.path.splitext(path)
+    candidate = path
+    number = 0
+    while os.path.exists(candidate) or os.path.exists(candidate + '.part'):
+        number += 1
+        candidate = f"{root}-{number}{ext}"
+    return candidate
+
+
+def _write_part(path, chunks):
+    """把 (x, y) 数据块写入 path + '.part'，返回该临时文件路径"""
+    tmp_path = path + '.part'
+    with open(tmp_path, 'wb') as f:
+        for x, y in chunks:
+            _pairs(x, y).tofile(f)
+    return tmp_path
+
+
+def _kept_chunks(x, y, keep, chunk_size):
+    """按块产出 keep 为 True 的点；生成器结束后不再引用 x / y"""
+    for start in range(0, len(keep), chunk_size):
+        stop = start + chunk_size
+        mask = keep[start:stop]
+        yield x[start:stop][mask], y[start:stop][mask]
+
+
+def _prefix_chunks(x, y, size, chunk_size):
+    """按块产出前 size 个点"""
+    for start in range(0, size, chunk_size):
+        stop = min(start + chunk_size, size)
+        yield x[start:stop], y[start:stop]
+
+
+def _pairs(x, y):
+    """把X/Y合并为 (n, 2) 的小端 float64 交错数组"""
+    x = np.asarray(x, dtype=np.float64).ravel()
+    y = np.asarray(y, dtype=np.float64).ravel()
+    if x.shape != y.shape:
+        raise ValueError("X和Y数据长度不一致")
+    return np.column_stack((x, y)).astype('<f8', copy=False)
@@ -0,0 +1,649 @@
+import csv
+import io
+import json
+import os
+import queue
+import struct
+import tempfile
+import threading
+import warnings
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet / Arrow 为可选功能
+    pa = None
+
+try:
+    import h5py
+except ImportError:  # HDF5 为可选功能
+    h5py = None
+
+from curve_store import CurveData, MappedCurveData, unique_path
+
+# 映射文件扩展名：无文件头的 float64 (x, y) 交错数据
+MAPPED_SUFFIX = '.xybin'
+# 缓存旁记录源文件信息的文件后缀
+CACHE_STAMP_SUFFIX = '.src.json'
+# 超过该大小的CSV文件建议以内存映射方式导入
+MAPPED_IMPORT_THRESHOLD = 256 * 1024 * 1024
+# 分块读取CSV时每块的行数
+DEFAULT_CHUNK_ROWS = 1_000_000
+
+# 列式二进制格式: 扩展名 -> 格式
+COLUMNAR_FORMATS = {
+    '.parquet': 'parquet',
+    '.feather': 'feather',
+    '.arrow': 'feather',
+    '.h5': 'hdf5',
+    '.hdf5': 'hdf5',
+}
+# 本程序写出的列式文件中保存曲线属性的元数据键
+CURVE_META_KEY = 'charttool'
+# 导出时每个数据块的最大行数
+EXPORT_BATCH_ROWS = 1 << 22
+
+# 项目文件：魔数 + 文件头长度(uint64) + JSON文件头 + 按64字节对齐的数据块
+PROJECT_SUFFIX = '.ctproj'
+PROJECT_MAGIC = b'CTPROJ01'
+PROJECT_ALIGN = 64
+
+
+def detect_delimiter(text):
+    """检测批量文本的分隔方式
+
+    返回 ';'（x,y;x,y 成对格式）、'\t'、',' 或 None（空白分隔）。
+    """
+    if ';' in text:
+        return ';'
+    if '\t' in text:
+        return '\t'
+    if ',' in text:
+        return ','
+    return None
+
+
+def _record_line_numbers(text):
+    """成对格式中每条记录所在的行号（从0开始）"""
+    buf = np.frombuffer(text.encode('utf-8'), dtype=np.uint8)
+    separators = buf[(buf == ord(';')) | (buf == ord('\n'))]
+    return np.concatenate(([0], np.cumsum(separators == ord('\n'))))
+
+
+def _to_float(column):
+    if pd.api.types.is_numeric_dtype(column):
+        return column.to_numpy(dtype=np.float64)
+    return pd.to_numeric(column, errors='coerce').to_numpy(dtype=np.float64)
+
+
+def parse_xy_text(text):
+    """向量化解析批量输入的 (x, y) 文本
+
+    分隔方式只检测一次，整个缓冲区由 pandas 的 C 解析器一次转换。每条记录取前两个
+    字段，多余字段被忽略。返回 (x, y, error_mask)：error_mask 的长度等于文本行数，
+    为 True 的行含有无法解析的数据（空行不算错误），这些行不会进入 x / y。
+    """
+    line_count = text.count('\n') + 1
+    if not text.strip():
+        empty = np.empty(0, dtype=np.float64)
+        return empty, empty, np.zeros(line_count, dtype=bool)
+
+    delimiter = detect_delimiter(text)
+    if delimiter == ';':
+        # 把每个 "x,y" 对展开为一行，并记录它来自哪一行
+        record_lines = _record_line_numbers(text)
+        body, sep = text.replace(';', '\n'), ','
+    else:
+        record_lines = None
+        body, sep = text, delimiter or r'\s+'
+
+    options = dict(header=None, names=['x', 'y'], sep=sep, skip_blank_lines=False, quoting=csv.QUOTE_NONE,
+                   keep_default_na=False, na_values=[''], engine='c')
+    with warnings.catch_warnings():
+        # 含无效行时各分块的列类型可能不同，统一在 _to_float 中处理
+        warnings.simplefilter('ignore', pd.errors.DtypeWarning)
+        try:
+            df = pd.read_csv(io.StringIO(body), usecols=[0, 1], **options)
+        except pd.errors.ParserError:
+            # 没有任何记录含第二个字段（单列数据或分隔符不符）时 usecols 无法匹配，
+            # 不指定 usecols 重新读取，缺少 y 的行记为无效行
+            df = pd.read_csv(io.StringIO(body), **options)
+    if record_lines is None:
+        record_lines = np.arange(len(df))
+    record_lines = record_lines[:len(df)]
+
+    x = _to_float(df['x'])
+    y = _to_float(df['y'])
+    blank = (df['x'].isna() & df['y'].isna()).to_numpy()
+    bad = ~blank & (np.isnan(x) | np.isnan(y))
+    valid = ~blank & ~bad
+
+    error_mask = np.zeros(line_count, dtype=bool)
+    error_mask[record_lines[bad]] = True
+    return x[valid], y[valid], error_mask
+
+
+def read_csv_columns(file_path):
+    """只读取CSV表头，返回列名列表"""
+    return pd.read_csv(file_path, nrows=0).columns.tolist()
+
+
+def read_columns(file_path):
+    """返回CSV或列式文件中可导入的列名，不读取数据"""
+    if columnar_format(file_path):
+        return read_columnar_columns(file_path)
+    return read_csv_columns(file_path)
+
+
+def load_columns(file_path, columns):
+    """一次性读取CSV或列式文件中的若干列，返回 {列名: float64 数组}"""
+    if columnar_format(file_path):
+        parts = list(iter_columnar(file_path, columns))
+        return {column: np.concatenate([part[column] for part in parts]) if parts else np.empty(0)
+                for column in columns}
+    frame = pd.read_csv(file_path, usecols=columns)
+    return {column: frame[column].to_numpy(dtype=np.float64) for column in columns}
+
+
+def mapped_cache_path(src_path, x_column, y_column):
+    """返回CSV中某对列对应的映射缓存文件路径"""
+    columns = read_columns(src_path)
+    x_index = columns.index(x_column)
+    y_index = columns.index(y_column)
+    return f"{src_path}.{x_index}_{y_index}{MAPPED_SUFFIX}"
+
+
+def source_stamp(src_path):
+    """返回源文件的大小与修改时间，用于判断由它生成的缓存是否仍然有效"""
+    stat = os.stat(src_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def read_cache_stamp(cache_path):
+    """读取缓存旁记录的源文件信息，不存在或无法解析时返回 None"""
+    try:
+        with open(cache_path + CACHE_STAMP_SUFFIX, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_cache_stamp(cache_path, stamp):
+    """在缓存旁记录生成缓存时源文件的大小、修改时间以及缓存自身的大小"""
+    stamp = dict(stamp, cache_size=os.path.getsize(cache_path))
+    with open(cache_path + CACHE_STAMP_SUFFIX, 'w', encoding='utf-8') as f:
+        json.dump(stamp, f)
+
+
+def is_cache_fresh(src_path, cache_path):
+    """源文件的大小、修改时间与缓存记录一致，且缓存自身未被改动时视为有效"""
+    stamp = read_cache_stamp(cache_path)
+    if stamp is None or not os.path.exists(cache_path):
+        return False
+    return stamp == dict(source_stamp(src_path), cache_size=os.path.getsize(cache_path))
+
+
+def commit_mapped_cache(data, cache_path, stamp):
+    """把导入完成的映射数据移到缓存路径并记录源文件信息
+
+    stamp 为开始读取前的 source_stamp。之后对曲线的修改写到新文件，缓存保持与
+    源文件一致。
+    """
+    if os.path.exists(cache_path + CACHE_STAMP_SUFFIX):
+        os.remove(cache_path + CACHE_STAMP_SUFFIX)
+    data.move_to(cache_path)
+    write_cache_stamp(cache_path, stamp)
+    data.copy_on_write = True
+
+
+def iter_csv_xy(src_path, x_column, y_column, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """分块读取CSV中的两列，逐块产出 (x, y) float64 数组"""
+    reader = pd.read_csv(src_path, usecols=[x_column, y_column], chunksize=chunk_rows)
+    for chunk in reader:
+        yield (chunk[x_column].to_numpy(dtype=np.float64),
+               chunk[y_column].to_numpy(dtype=np.float64))
+
+
+def csv_to_mapped(src_path, x_column, y_column, dst_path=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """把CSV中的一对列转换为映射文件，已有有效缓存时直接打开"""
+    if dst_path is None:
+        dst_path = mapped_cache_path(src_path, x_column, y_column)
+    if is_cache_fresh(src_path, dst_path):
+        return open_mapped(dst_path)
+    stamp = source_stamp(src_path)
+    data = MappedCurveData.create(dst_path, iter_csv_xy(src_path, x_column, y_column, chunk_rows))
+    write_cache_stamp(dst_path, stamp)
+    data.copy_on_write = True
+    return data
+
+
+def open_mapped(file_path):
+    """打开已有的映射文件；由源文件生成的缓存以写时复制方式打开"""
+    if os.path.getsize(file_path) % MappedCurveData.ITEM_BYTES:
+        raise ValueError("映射文件大小不是完整数据点的整数倍，文件可能已损坏")
+    return MappedCurveData(file_path, copy_on_write=read_cache_stamp(file_path) is not None)
+
+
+def mapped_snapshot(data):
+    """把曲线数据写到临时映射文件，返回映射该文件的 MappedCurveData
+
+    提交到进程池时只序列化文件路径，多个任务共用操作系统缓存中的同一份数据，
+    不必各自复制整条曲线。用完后由调用者删除返回对象的 path。
+    """
+    fd, path = tempfile.mkstemp(suffix=MAPPED_SUFFIX)
+    os.close(fd)
+    return MappedCurveData.create(path, [(data.x, data.y)])
+
+
+def keep_partial_mapped(data, cache_path):
+    """取消映射导入但保留已导入的部分时，把 .part 文件移到独立的新路径
+
+    部分数据不是完整的缓存，不能占用缓存路径；再次导入同一文件时会清空并重新
+    写入 .part 文件，因此保留的曲线也不能继续映射它。返回新的文件路径。
+    """
+    path = unique_path(cache_path)
+    data.move_to(path)
+    return path
+
+
+class ChunkedReader:
+    """在后台线程中分块读取文件的指定列
+
+    每读完一块就把 (列名 -> float64 数组) 放入 chunks 队列，由界面线程取出并
+    追加到曲线；队列有上限，界面处理不过来时读取线程会等待。
+    队列中的消息为 ('chunk', arrays) / ('done', None) / ('cancelled', None) /
+    ('error', 异常)。子类实现 _iter_chunks 并维护 bytes_read。
+    """
+
+    QUEUE_SIZE = 4
+
+    def __init__(self, file_path, columns, chunk_rows=DEFAULT_CHUNK_ROWS):
+        self.file_path = file_path
+        self.columns = list(dict.fromkeys(columns))
+        self.chunk_rows = chunk_rows
+        self.total_bytes = os.path.getsize(file_path)
+        self.rows_read = 0
+        self.bytes_read = 0
+        self.chunks = queue.Queue(maxsize=self.QUEUE_SIZE)
+        self._cancel_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        """请求停止读取，已放入队列的数据块仍可被取出"""
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def _iter_chunks(self):
+        raise NotImplementedError
+
+    def _put(self, message):
+        # 带超时地放入队列，以便在界面停止消费时仍能响应取消
+        while True:
+            try:
+                self.chunks.put(message, timeout=0.1)
+                return True
+            except queue.Full:
+                if self.cancelled and message[0] == 'chunk':
+                    return False
+
+    def _run(self):
+        try:
+            for arrays in self._iter_chunks():
+                if self.cancelled:
+                    break
+                self.rows_read += len(arrays[self.columns[0]])
+                if not self._put(('chunk', arrays)):
+                    break
+            if self.cancelled:
+                self._put(('cancelled', None))
+            else:
+                self.bytes_read = self.total_bytes
+                self._put(('done', None))
+        except Exception as e:
+            self._put(('error', e))
+
+
+class ChunkedCsvReader(ChunkedReader):
+    """用 pandas 的 chunksize 分块读取CSV"""
+
+    def _iter_chunks(self):
+        with open(self.file_path, 'rb') as f:
+            reader = pd.read_csv(f, usecols=self.columns, chunksize=self.chunk_rows)
+            for chunk in reader:
+                self.bytes_read = min(f.tell(), self.total_bytes)
+                yield {column: chunk[column].to_numpy(dtype=np.float64)
+                       for column in self.columns}
+
+
+class ColumnarReader(ChunkedReader):
+    """分块读取 Parquet / Arrow / HDF5 文件中选定的列"""
+
+    def _iter_chunks(self):
+        total_rows = max(count_columnar_rows(self.file_path), 1)
+        rows = 0
+        for arrays in iter_columnar(self.file_path, self.columns, self.chunk_rows):
+            rows += len(arrays[self.columns[0]])
+            self.bytes_read = int(self.total_bytes * min(rows / total_rows, 1.0))
+            yield arrays
+
+
+def open_chunked_reader(file_path, columns, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """按文件类型返回对应的分块读取器（尚未启动）"""
+    if columnar_format(file_path):
+        return ColumnarReader(file_path, columns, chunk_rows)
+    return ChunkedCsvReader(file_path, columns, chunk_rows)
+
+
+# ---------------------------------------------------------------------------
+# Parquet / Arrow IPC (Feather) / HDF5
+# ---------------------------------------------------------------------------
+
+def columnar_format(file_path):
+    """返回文件对应的列式格式名，不是列式文件时返回 None"""
+    return COLUMNAR_FORMATS.get(os.path.splitext(file_path)[1].lower())
+
+
+def _require(fmt):
+    if fmt == 'hdf5':
+        if h5py is None:
+            raise ImportError("读写HDF5文件需要安装 h5py: pip install h5py")
+    elif pa is None:
+        raise ImportError("读写Parquet/Arrow文件需要安装 pyarrow: pip install pyarrow")
+
+
+def _is_numeric_arrow(field_type):
+    return pa.types.is_integer(field_type) or pa.types.is_floating(field_type)
+
+
+def _hdf5_numeric_datasets(h5file):
+    names = []
+
+    def visit(name, obj):
+        if isinstance(obj, h5py.Dataset) and obj.ndim == 1 and obj.dtype.kind in 'iuf':
+            names.append(name)
+    h5file.visititems(visit)
+    return names
+
+
+def _arrow_schema(file_path, fmt):
+    if fmt == 'parquet':
+        return pq.read_schema(file_path)
+    with pa.memory_map(file_path) as source:
+        return pa.ipc.open_file(source).schema
+
+
+def read_columnar_columns(file_path):
+    """只读取列式文件的结构，返回数值列名"""
+    fmt = columnar_format(file_path)
+    _require(fmt)
+    if fmt == 'hdf5':
+        with h5py.File(file_path, 'r') as f:
+            return _hdf5_numeric_datasets(f)
+    schema = _arrow_schema(file_path, fmt)
+    return [field.name for field in schema if _is_numeric_arrow(field.type)]
+
+
+def count_columnar_rows(file_path):
+    fmt = columnar_format(file_path)
+    _require(fmt)
+    if fmt == 'parquet':
+        return pq.ParquetFile(file_path).metadata.num_rows
+    if fmt == 'hdf5':
+        with h5py.File(file_path, 'r') as f:
+            lengths = [len(f[name]) for name in _hdf5_numeric_datasets(f)]
+        return max(lengths, default=0)
+    with pa.memory_map(file_path) as source:
+        reader = pa.ipc.open_file(source)
+        return sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+
+
+def iter_columnar(file_path, columns, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """逐块产出列式文件中指定列的数据，只读取所选列"""
+    fmt = columnar_format(file_path)
+    _require(fmt)
+    if fmt == 'hdf5':
+        with h5py.File(file_path, 'r') as f:
+            datasets = [f[name] for name in columns]
+            length = min(len(dataset) for dataset in datasets)
+            for start in range(0, length, chunk_rows):
+                stop = min(start + chunk_rows, length)
+                yield {name: np.asarray(dataset[start:stop], dtype=np.float64)
+                       for name, dataset in zip(columns, datasets)}
+        return
+
+    if fmt == 'parquet':
+        batches = pq.ParquetFile(file_path).iter_batches(batch_size=chunk_rows, columns=columns)
+    else:
+        # 未压缩的 Arrow IPC 文件经内存映射后是零拷贝读取
+        table = feather.read_table(file_path, columns=columns, memory_map=True)
+        batches = table.to_batches(max_chunksize=chunk_rows)
+    for batch in batches:
+        yield {name: _arrow_to_float(batch.column(batch.schema.get_field_index(name)))
+               for name in columns}
+
+
+def _arrow_to_float(array):
+    if array.null_count:
+        array = array.cast(pa.float64()).fill_null(np.nan)
+    return np.asarray(array.to_numpy(zero_copy_only=False), dtype=np.float64)
+
+
+def serializable_fit_params(fit_params):
+    """返回可写入JSON的拟合参数（去掉函数，NumPy类型转为Python类型）"""
+    if fit_params is None:
+        return None
+    result = {}
+    for key, value in fit_params.items():
+        if callable(value):
+            continue
+        if isinstance(value, np.ndarray):
+            value = value.tolist()
+        elif isinstance(value, np.generic):
+            value = value.item()
+        result[key] = value
+    return result
+
+
+def _curve_meta(name, curve):
+    return {
+        'name': name,
+        'color': curve['color'],
+        'marker': curve.get('marker', 'o'),
+        'visible': bool(curve['visible']),
+        'render_mode': curve.get('render_mode', 'scatter'),
+        'fit_params': serializable_fit_params(curve.get('fit_params')),
+        'length': len(curve['data']),
+    }
+
+
+def write_curves(file_path, curves):
+    """把所有曲线及其拟合参数写入 Parquet / Arrow / HDF5 文件
+
+    Arrow 类格式使用长表 (curve, x, y)：每条曲线写成独立的数据块，curve 列为字典
+    编码，曲线属性以 JSON 形式保存在表结构的元数据中。HDF5 中每条曲线为一个组。
+    """
+    fmt = columnar_format(file_path)
+    _require(fmt)
+    names = list(curves.keys())
+    meta = {'version': 1, 'curves': [_curve_meta(name, curves[name]) for name in names]}
+
+    if fmt == 'hdf5':
+        with h5py.File(file_path, 'w') as f:
+            f.attrs[CURVE_META_KEY] = json.dumps({'version': 1}, ensure_ascii=False)
+            group = f.create_group('curves')
+            for index, (name, curve_meta) in enumerate(zip(names, meta['curves'])):
+                curve_group = group.create_group(str(index))
+                curve_group.attrs['meta'] = json.dumps(curve_meta, ensure_ascii=False)
+                curve_group.create_dataset('x', data=curves[name]['data'].x)
+                curve_group.create_dataset('y', data=curves[name]['data'].y)
+        return
+
+    schema = pa.schema([
+        ('curve', pa.dictionary(pa.int32(), pa.string())),
+        ('x', pa.float64()),
+        ('y', pa.float64()),
+    ], metadata={CURVE_META_KEY: json.dumps(meta, ensure_ascii=False)})
+    dictionary = pa.array(names, type=pa.string())
+
+    def batches():
+        for index, name in enumerate(names):
+            data = curves[name]['data']
+            for start in range(0, len(data), EXPORT_BATCH_ROWS):
+                x = np.ascontiguousarray(data.x[start:start + EXPORT_BATCH_ROWS])
+                y = np.ascontiguousarray(data.y[start:start + EXPORT_BATCH_ROWS])
+                indices = pa.array(np.full(len(x), index, dtype=np.int32))
+                yield pa.record_batch([pa.DictionaryArray.from_arrays(indices, dictionary),
+                                       pa.array(x), pa.array(y)], schema=schema)
+
+    if fmt == 'parquet':
+        with pq.ParquetWriter(file_path, schema) as writer:
+            for batch in batches():
+                writer.write_batch(batch)
+    else:
+        with pa.OSFile(file_path, 'wb') as sink, pa.ipc.new_file(sink, schema) as writer:
+            for batch in batches():
+                writer.write_batch(batch)
+
+
+def read_curve_file_meta(file_path):
+    """读取本程序写出的曲线元数据，其他来源的文件返回 None"""
+    fmt = columnar_format(file_path)
+    _require(fmt)
+    if fmt == 'hdf5':
+        with h5py.File(file_path, 'r') as f:
+            if CURVE_META_KEY not in f.attrs or 'curves' not in f:
+                return None
+            group = f['curves']
+            curves = [json.loads(group[key].attrs['meta'])
+                      for key in sorted(group.keys(), key=int)]
+            return {'version': 1, 'curves': curves}
+    metadata = _arrow_schema(file_path, fmt).metadata or {}
+    raw = metadata.get(CURVE_META_KEY.encode())
+    return json.loads(raw) if raw else None
+
+
+def read_curves(file_path):
+    """读取本程序写出的曲线文件，返回 [(曲线属性, x, y), ...]"""
+    fmt = columnar_format(file_path)
+    meta = read_curve_file_meta(file_path)
+    if meta is None:
+        raise ValueError("文件中没有曲线元数据")
+
+    if fmt == 'hdf5':
+        result = []
+        with h5py.File(file_path, 'r') as f:
+            group = f['curves']
+            for key, curve_meta in zip(sorted(group.keys(), key=int), meta['curves']):
+                result.append((curve_meta,
+                               np.asarray(group[key]['x'][:], dtype=np.float64),
+                               np.asarray(group[key]['y'][:], dtype=np.float64)))
+        return result
+
+    if fmt == 'parquet':
+        table = pq.read_table(file_path, columns=['x', 'y'])
+    else:
+        table = feather.read_table(file_path, columns=['x', 'y'], memory_map=True)
+    x = _arrow_to_float(table.column('x').combine_chunks())
+    y = _arrow_to_float(table.column('y').combine_chunks())
+
+    # 写出时各曲线按顺序连续存放，用记录的长度切分（视图，不复制）
+    result = []
+    offset = 0
+    for curve_meta in meta['curves']:
+        length = curve_meta['length']
+        result.append((curve_meta, x[offset:offset + length], y[offset:offset + length]))
+        offset += length
+    return result
+
+
+# ---------------------------------------------------------------------------
+# 项目文件
+# ---------------------------------------------------------------------------
+
+def _align(offset):
+    return (offset + PROJECT_ALIGN - 1) // PROJECT_ALIGN * PROJECT_ALIGN
+
+
+def save_project(file_path, curves, settings, current_curve=None):
+    """把所有曲线和图表设置保存为项目文件
+
+    文件头为JSON，记录曲线属性、可序列化的拟合参数和各数据块的位置；每条曲线的
+    X、Y 各为一段连续的小端 float64 数据。内存映射曲线只记录其映射文件路径。
+    """
+    entries = []
+    blocks = []
+    offset = 0
+    for name, curve in curves.items():
+        data = curve['data']
+        entry = _curve_meta(name, curve)
+        if data.is_mapped:
+            entry['mapped_path'] = data.path
+        else:
+            entry['offset'] = offset
+            blocks.append((offset, data))
+            offset = _align(offset + 2 * 8 * len(data))
+        entries.append(entry)
+
+    header = json.dumps({
+        'version': 1,
+        'settings': settings,
+        'current_curve': current_curve,
+        'curves': entries,
+    }, ensure_ascii=False).encode('utf-8')
+    data_start = _align(len(PROJECT_MAGIC) + 8 + len(header))
+
+    tmp_path = file_path + '.part'
+    with open(tmp_path, 'wb') as f:
+        f.write(PROJECT_MAGIC)
+        f.write(struct.pack('<Q', len(header)))
+        f.write(header)
+        for block_offset, data in blocks:
+            f.seek(data_start + block_offset)
+            for column in (data.x, data.y):
+                np.ascontiguousarray(column, dtype='<f8').tofile(f)
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, file_path)
+
+
+def load_project(file_path):
+    """读取项目文件，返回 (文件头, [(曲线属性, CurveData), ...])
+
+    曲线数据以只读内存映射的方式打开，只有在绘图或计算访问到时才会读入，
+    因此打开包含大量曲线的项目几乎不需要时间。引用的映射文件不存在时，
+    该曲线为空且曲线属性中 missing 为 True。
+    """
+    with open(file_path, 'rb') as f:
+        if f.read(len(PROJECT_MAGIC)) != PROJECT_MAGIC:
+            raise ValueError("不是有效的项目文件")
+        header_length, = struct.unpack('<Q', f.read(8))
+        header = json.loads(f.read(header_length).decode('utf-8'))
+    data_start = _align(len(PROJECT_MAGIC) + 8 + header_length)
+
+    curves = []
+    for entry in header['curves']:
+        length = entry['length']
+        if 'mapped_path' in entry:
+            if os.path.exists(entry['mapped_path']):
+                data = open_mapped(entry['mapped_path'])
+            else:
+                entry['missing'] = True
+                data = CurveData()
+        elif length:
+            columns = np.memmap(file_path, dtype='<f8', mode='r',
+                                offset=data_start + entry['offset'], shape=(2, length))
+            data = CurveData.from_arrays(columns[0], columns[1])
+        else:
+            data = CurveData()
+        curves.append((entry, data))
+    return header, curves
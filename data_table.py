@@ -0,0 +1,357 @@
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+import numpy as np
+
+
+class VirtualTable(ttk.Frame):
+    """只创建可见行的数据表格
+
+    Treeview 中始终只有一屏的行，滚动时改写这些行的内容，数值在显示时才从曲线数组中
+    格式化。排序和筛选结果保存为数据下标数组，选中状态保存为与数据等长的布尔掩码，
+    二者都在数据版本变化时重新计算，百万行数据也能流畅滚动。
+    """
+
+    COLUMNS = ('序号', 'X', 'Y')
+    WHEEL_ROWS = 3  # 鼠标滚轮每格滚动的行数
+
+    def __init__(self, master, height=12, font=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.data = None
+        self.version = None
+        self.order = None  # 排序/筛选后依次显示的数据下标，None 表示按原顺序显示全部
+        # 按X/Y排序时升序排列的数据下标及其值，追加数据时用 searchsorted 插入新行
+        self.sorted_order = None
+        self.sorted_values = None
+        self.size = 0  # 计算显示顺序时的数据点数
+        self.sort_column = None
+        self.sort_descending = False
+        self.filter_spec = None  # (列名, 最小值或None, 最大值或None)
+        self.selected = np.zeros(0, dtype=bool)
+        self.anchor = None  # Shift 多选的起点（显示位置）
+        self.offset = 0  # 第一行可见行的显示位置
+        self.items = []
+        self.item_rows = {}  # Treeview 行 -> 第几个可见行
+        self.visible_indices = np.zeros(0, dtype=np.intp)  # 各可见行对应的数据下标
+        self.attached = set()
+        self.row_metrics = None  # (表头高度, 行高)，第一次显示出数据行后测得
+
+        # 筛选栏
+        filter_frame = ttk.Frame(self)
+        filter_frame.pack(fill=tk.X, pady=(0, 6))
+        ttk.Label(filter_frame, text="筛选:", font=font).pack(side=tk.LEFT)
+        self.filter_column_var = tk.StringVar(value='X')
+        ttk.Combobox(filter_frame, textvariable=self.filter_column_var, values=self.COLUMNS,
+                     state="readonly", width=4).pack(side=tk.LEFT, padx=(4, 0))
+        self.filter_low_entry = ttk.Entry(filter_frame, width=8)
+        self.filter_low_entry.pack(side=tk.LEFT, padx=(4, 0))
+        ttk.Label(filter_frame, text="~").pack(side=tk.LEFT, padx=2)
+        self.filter_high_entry = ttk.Entry(filter_frame, width=8)
+        self.filter_high_entry.pack(side=tk.LEFT)
+        ttk.Button(filter_frame, text="清除", width=5, command=self.clear_filter).pack(side=tk.RIGHT)
+        ttk.Button(filter_frame, text="筛选", width=5, command=self.apply_filter).pack(side=tk.RIGHT, padx=(4, 4))
+
+        self.status_var = tk.StringVar()
+        ttk.Label(self, textvariable=self.status_var).pack(side=tk.BOTTOM, anchor=tk.W, pady=(4, 0))
+
+        # 选中状态由表格自己维护，Treeview 只负责显示
+        self.tree = ttk.Treeview(self, columns=self.COLUMNS, show='headings', height=height, selectmode='none')
+        for col in self.COLUMNS:
+            self.tree.heading(col, text=col, command=lambda c=col: self.sort_by(c))
+            self.tree.column(col, width=80)
+        style = ttk.Style()
+        self.tree.tag_configure('selected',
+                                background=style.lookup('Treeview', 'background', ('selected',)) or '#0078d7',
+                                foreground=style.lookup('Treeview', 'foreground', ('selected',)) or 'white')
+
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.yview)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self._resize_items(height)
+
+        self.tree.bind('<Configure>', self.on_resize)
+        self.tree.bind('<Button-1>', lambda e: self.on_click(e))
+        self.tree.bind('<Control-Button-1>', lambda e: self.on_click(e, toggle=True))
+        self.tree.bind('<Shift-Button-1>', lambda e: self.on_click(e, extend=True))
+        self.tree.bind('<MouseWheel>', lambda e: self.scroll_to(self.offset - e.delta // 120 * self.WHEEL_ROWS))
+        self.tree.bind('<Button-4>', lambda e: self.scroll_to(self.offset - self.WHEEL_ROWS))
+        self.tree.bind('<Button-5>', lambda e: self.scroll_to(self.offset + self.WHEEL_ROWS))
+        for key, step in (('<Up>', -1), ('<Down>', 1)):
+            self.tree.bind(key, lambda e, s=step: self.scroll_to(self.offset + s) or 'break')
+        for key, pages in (('<Prior>', -1), ('<Next>', 1)):
+            self.tree.bind(key, lambda e, p=pages: self.scroll_to(self.offset + p * len(self.items)) or 'break')
+        self.tree.bind('<Home>', lambda e: self.scroll_to(0) or 'break')
+        self.tree.bind('<End>', lambda e: self.scroll_to(self.row_count()) or 'break')
+        self.tree.bind('<Control-a>', lambda e: self.select_all() or 'break')
+
+    # ---- 数据与视图 ----
+
+    def set_data(self, data):
+        """显示另一条曲线的数据（None 表示清空），保留排序和筛选设置"""
+        if data is not self.data:
+            self.data = data
+            self.version = None
+            self.offset = 0
+        self.refresh()
+
+    def refresh(self):
+        """数据被修改后调用；版本未变时只重绘可见行"""
+        if self.data is not None and self.version != self.data.version:
+            # 相邻版本之间点数增加只可能是在末尾追加，并入现有顺序即可；删除、截断等重新计算
+            appended = (self.version is not None and self.data.version == self.version + 1
+                        and len(self.data) > self.size)
+            self.version = self.data.version
+            self.anchor = None
+            if appended:
+                self._append_rows(self.size)
+            else:
+                self.selected = np.zeros(len(self.data), dtype=bool)
+                self._update_order()
+        elif self.data is None:
+            self.selected = np.zeros(0, dtype=bool)
+            self.order = None
+        self.offset = max(0, min(self.offset, self.row_count() - len(self.items)))
+        self.render()
+
+    def _column_values(self, column):
+        if column == 'X':
+            return self.data.x
+        if column == 'Y':
+            return self.data.y
+        return np.arange(len(self.data))
+
+    def _values_at(self, column, indices):
+        if column == '序号':
+            return indices
+        return self._column_values(column)[indices]
+
+    def _filter_mask(self, values):
+        _, low, high = self.filter_spec
+        mask = np.ones(len(values), dtype=bool)
+        if low is not None:
+            mask &= values >= low
+        if high is not None:
+            mask &= values <= high
+        return mask
+
+    def _update_order(self):
+        """按筛选条件和排序列计算显示顺序"""
+        order = None
+        self.sorted_order = self.sorted_values = None
+        if self.filter_spec is not None:
+            order = np.flatnonzero(self._filter_mask(self._column_values(self.filter_spec[0])))
+        if self.sort_column in ('X', 'Y'):
+            values = self._column_values(self.sort_column)
+            if order is not None:
+                values = values[order]
+            ranks = np.argsort(values, kind='stable')
+            self.sorted_values = values[ranks]
+            self.sorted_order = ranks if order is None else order[ranks]
+            order = self.sorted_order[::-1] if self.sort_descending else self.sorted_order
+        elif self.sort_column == '序号' and self.sort_descending:
+            order = (np.arange(len(self.data)) if order is None else order)[::-1]
+        self.order = order
+        self.size = len(self.data)
+
+    def _append_rows(self, start):
+        """数据只在末尾追加时把新行并入显示顺序，代价与新增点数和一次数组复制相当，不重新排序"""
+        count = len(self.data)
+        self.selected = np.concatenate((self.selected, np.zeros(count - start, dtype=bool)))
+        self.size = count
+        if self.order is None:
+            return
+        new = np.arange(start, count)
+        if self.filter_spec is not None:
+            new = new[self._filter_mask(self._values_at(self.filter_spec[0], new))]
+        if self.sorted_order is not None:
+            values = self._values_at(self.sort_column, new)
+            ranks = np.argsort(values, kind='stable')
+            new, values = new[ranks], values[ranks]
+            # side='right' 使新行排在相同值的旧行之后，与稳定排序的结果一致
+            positions = np.searchsorted(self.sorted_values, values, side='right')
+            self.sorted_values = np.insert(self.sorted_values, positions, values)
+            self.sorted_order = np.insert(self.sorted_order, positions, new)
+            self.order = self.sorted_order[::-1] if self.sort_descending else self.sorted_order
+        elif self.sort_column == '序号' and self.sort_descending:
+            self.order = np.concatenate((new[::-1], self.order))
+        else:
+            self.order = np.concatenate((self.order, new))
+
+    def row_count(self):
+        if self.data is None:
+            return 0
+        return len(self.data) if self.order is None else len(self.order)
+
+    def indices_at(self, start, stop):
+        """显示位置 [start, stop) 对应的数据下标"""
+        if self.order is None:
+            return np.arange(start, stop)
+        return self.order[start:stop]
+
+    # ---- 排序与筛选 ----
+
+    def sort_by(self, column):
+        """点击列标题排序，再次点击同一列切换升序/降序"""
+        if self.sort_column == column:
+            self.sort_descending = not self.sort_descending
+        else:
+            self.sort_column = column
+            self.sort_descending = False
+        for col in self.COLUMNS:
+            arrow = (" ▼" if self.sort_descending else " ▲") if col == column else ""
+            self.tree.heading(col, text=col + arrow)
+        if self.data is not None:
+            self._update_order()
+        self.offset = 0
+        self.render()
+
+    def apply_filter(self):
+        """只显示所选列在给定范围内的行，留空表示不限"""
+        try:
+            bounds = [float(text) if text.strip() else None
+                      for text in (self.filter_low_entry.get(), self.filter_high_entry.get())]
+        except ValueError:
+            messagebox.showerror("错误", "请输入有效的数字!")
+            return
+        self.filter_spec = None if bounds == [None, None] else (self.filter_column_var.get(), *bounds)
+        self._filter_changed()
+
+    def clear_filter(self):
+        self.filter_low_entry.delete(0, tk.END)
+        self.filter_high_entry.delete(0, tk.END)
+        self.filter_spec = None
+        self._filter_changed()
+
+    def _filter_changed(self):
+        # 被筛掉的行不应在之后的删除中被误删，清除选中
+        self.selected[:] = False
+        self.anchor = None
+        if self.data is not None:
+            self._update_order()
+        self.offset = 0
+        self.render()
+
+    # ---- 选中 ----
+
+    def selected_indices(self):
+        """选中行的数据下标（升序）"""
+        return np.flatnonzero(self.selected)
+
+    def selected_mask(self):
+        """与数据等长的选中掩码（副本）"""
+        return self.selected.copy()
+
+    def select_all(self):
+        """选中当前筛选结果中的全部行"""
+        if self.data is None:
+            return
+        self.selected[:] = self.order is None
+        if self.order is not None:
+            self.selected[self.order] = True
+        self.render()
+
+    def on_click(self, event, toggle=False, extend=False):
+        # 标题（排序）和列分隔线（拖动调整列宽）交给 Treeview 的默认绑定处理
+        if self.tree.identify_region(event.x, event.y) in ('heading', 'separator'):
+            return None
+        self.tree.focus_set()
+        item = self.tree.identify_row(event.y)
+        if not item:
+            return 'break'
+        row = self.item_rows[item]
+        position = self.offset + row
+        if extend and self.anchor is not None:
+            start, stop = sorted((self.anchor, position))
+            self.selected[:] = False
+            self.selected[self.indices_at(start, stop + 1)] = True
+        else:
+            index = self.visible_indices[row]
+            if toggle:
+                self.selected[index] = not self.selected[index]
+            else:
+                self.selected[:] = False
+                self.selected[index] = True
+            self.anchor = position
+        self.render()
+        return 'break'
+
+    # ---- 滚动与绘制 ----
+
+    def yview(self, *args):
+        """滚动条回调"""
+        if args[0] == 'moveto':
+            self.scroll_to(int(round(float(args[1]) * self.row_count())))
+        elif args[0] == 'scroll':
+            step = int(args[1]) * (len(self.items) if args[2] == 'pages' else 1)
+            self.scroll_to(self.offset + step)
+
+    def scroll_to(self, offset):
+        offset = max(0, min(offset, self.row_count() - len(self.items)))
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+        return None
+
+    def on_resize(self, event):
+        """窗口高度变化时调整可见行数"""
+        self.fit_rows(event.height)
+
+    def fit_rows(self, height=None):
+        """让 Treeview 中的行数正好填满其高度"""
+        if self.row_metrics is None:
+            bbox = self.tree.bbox(self.items[0]) if self.items and self.items[0] in self.attached else ''
+            if not bbox:
+                return
+            self.row_metrics = (bbox[1], max(1, bbox[3]))
+        header, row_height = self.row_metrics
+        rows = max(1, ((height or self.tree.winfo_height()) - header) // row_height)
+        if rows != len(self.items):
+            self._resize_items(rows)
+            self.offset = max(0, min(self.offset, self.row_count() - rows))
+            self.render()
+
+    def _resize_items(self, rows):
+        while len(self.items) < rows:
+            item = self.tree.insert('', 'end')
+            self.item_rows[item] = len(self.items)
+            self.items.append(item)
+            self.attached.add(item)
+        while len(self.items) > rows:
+            item = self.items.pop()
+            del self.item_rows[item]
+            self.attached.discard(item)
+            self.tree.delete(item)
+
+    def render(self):
+        """只格式化并写入可见行"""
+        count = self.row_count()
+        visible = max(0, min(len(self.items), count - self.offset))
+        indices = self.indices_at(self.offset, self.offset + visible)
+        self.visible_indices = indices
+        if visible:
+            xs = self.data.x[indices]
+            ys = self.data.y[indices]
+            flags = self.selected[indices]
+        for row, item in enumerate(self.items):
+            if row < visible:
+                if item not in self.attached:
+                    self.tree.move(item, '', row)
+                    self.attached.add(item)
+                self.tree.item(item, values=(int(indices[row]) + 1, f"{xs[row]:.4f}", f"{ys[row]:.4f}"),
+                               tags=('selected',) if flags[row] else ())
+            elif item in self.attached:
+                self.tree.detach(item)
+                self.attached.discard(item)
+
+        if self.row_metrics is None and visible:
+            self.after_idle(self.fit_rows)
+        if count:
+            self.scrollbar.set(self.offset / count, min(1.0, (self.offset + len(self.items)) / count))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+        total = len(self.data) if self.data is not None else 0
+        text = f"共 {total:,} 行" if count == total else f"筛选出 {count:,} / {total:,} 行"
+        selected = int(np.count_nonzero(self.selected))
+        if selected:
+            text += f"，已选中 {selected:,} 行"
+        self.status_var.set(text)
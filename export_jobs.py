@@ -0,0 +1,185 @@
+import io
+import multiprocessing
+import queue
+import struct
+import zlib
+
+import numpy as np
+import matplotlib
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.transforms import Bbox
+
+from scene import render_figure, snapshot_scene
+
+# 子进程需要与界面一致的字体设置
+EXPORT_RC_KEYS = ('font.sans-serif', 'axes.unicode_minus')
+# 计算布局时使用的分辨率，布局与输出分辨率无关
+LAYOUT_DPI = 100
+# 超过此像素数的PNG分块渲染，每块最多这么多像素（RGBA约32MB）
+TILE_PIXELS = 8_000_000
+# 分块时每块至少的行数，图片极宽时才在水平方向切分
+TILE_MIN_ROWS = 256
+# 与 savefig 的 bbox_inches='tight' 相同的留白
+TIGHT_PAD_INCHES = 0.1
+# 矢量格式中点数超过此值的散点层被栅格化，文件大小不再随点数增长
+RASTERIZE_POINTS = 5000
+
+
+class ExportJob:
+    """在后台进程中渲染一次图表并写出一种或多种格式
+
+    outputs 为 [(文件路径, 格式, DPI), ...]。场景在创建任务时被复制，之后对曲线的修改
+    不影响正在进行的导出。进度通过 messages 队列返回：('progress', 序号, 路径)、
+    ('done', 路径列表) 或 ('error', 错误信息)，由界面线程轮询。
+    """
+
+    def __init__(self, scene, size, outputs, downsample=False, rasterize=True):
+        self.outputs = list(outputs)
+        # 统一使用 spawn，避免在 Tk 进程中 fork
+        context = multiprocessing.get_context('spawn')
+        self.messages = context.Queue()
+        rc = {key: matplotlib.rcParams[key] for key in EXPORT_RC_KEYS}
+        self.process = context.Process(
+            target=run_export,
+            args=(snapshot_scene(scene), size, self.outputs, downsample, rasterize, rc, self.messages),
+            daemon=True,
+        )
+
+    def start(self):
+        self.process.start()
+
+    def cancel(self):
+        """终止导出进程，已写出的文件保留"""
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
+
+    def poll(self):
+        """返回目前收到的所有消息，不阻塞"""
+        messages = []
+        try:
+            while True:
+                messages.append(self.messages.get_nowait())
+        except queue.Empty:
+            pass
+        if not messages and not self.process.is_alive() and self.process.exitcode not in (0, None):
+            messages.append(('error', f"导出进程异常退出 (代码 {self.process.exitcode})"))
+        return messages
+
+
+def write_outputs(scene, size, outputs, downsample=False, on_progress=None, rasterize=True):
+    """把场景渲染一次并依次写出所有格式，on_progress(序号, 路径) 在写每个文件前调用
+
+    rasterize 为 True 时矢量格式中的密集散点层按输出 dpi 栅格化。
+    """
+    # 不经过 pyplot，图形不进入全局管理器，用完即可释放
+    max_dpi = max(dpi for _, _, dpi in outputs)
+    fig = Figure(figsize=size, dpi=min(max_dpi, LAYOUT_DPI))
+    try:
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        render_figure(fig, ax, scene, downsample, dpi=max_dpi,
+                      rasterize_points=RASTERIZE_POINTS if rasterize else None)
+        for index, (file_path, file_format, dpi) in enumerate(outputs):
+            if on_progress is not None:
+                on_progress(index, file_path)
+            if file_format == 'png' and size[0] * size[1] * dpi * dpi > TILE_PIXELS:
+                write_tiled_png(fig, file_path, dpi)
+                continue
+            fig.savefig(
+                file_path,
+                format=file_format,
+                dpi=dpi,
+                bbox_inches='tight',
+                facecolor='white',
+                edgecolor='none',
+                transparent=False
+            )
+    finally:
+        fig.clear()
+
+
+def _png_chunk(tag, payload):
+    return (struct.pack('>I', len(payload)) + tag + payload
+            + struct.pack('>I', zlib.crc32(tag + payload) & 0xffffffff))
+
+
+def write_tiled_png(fig, file_path, dpi):
+    """分块渲染超高分辨率PNG，边渲染边压缩写出，峰值内存只取决于块大小
+
+    裁剪范围与 bbox_inches='tight' 相同。每块通过 savefig 的 bbox_inches 只渲染
+    图形的一部分，同一行的块拼成整行条带后逐行压缩进 IDAT 数据块。
+    """
+    # 在布局分辨率下计算紧凑边界（英寸），避免按输出分辨率分配画布
+    output_dpi = fig.dpi
+    fig.set_dpi(LAYOUT_DPI)
+    try:
+        bounds = fig.get_tightbbox(fig.canvas.get_renderer()).padded(TIGHT_PAD_INCHES)
+    finally:
+        fig.set_dpi(output_dpi)
+    width = int(bounds.width * dpi)
+    height = int(bounds.height * dpi)
+    tile_width = min(width, max(1, TILE_PIXELS // TILE_MIN_ROWS))
+    tile_height = max(1, TILE_PIXELS // tile_width)
+
+    images = [(image, image.get_clip_box(), image.get_visible())
+              for ax in fig.axes for image in ax.images]
+
+    def render_tile(left, top, tile_w, tile_h):
+        # 多留半个像素，Agg 按向下取整确定画布大小时不会少一行/列
+        bbox = Bbox.from_bounds(bounds.x0 + left / dpi,
+                                bounds.y0 + (height - top - tile_h) / dpi,
+                                (tile_w + 0.5) / dpi, (tile_h + 0.5) / dpi)
+        # 图像按裁剪框（默认整个坐标区）重采样，把裁剪框限制在当前块内，
+        # 否则每块都会生成与整个坐标区一样大的图像
+        tile_box = Bbox.from_bounds(0, 0, tile_w, tile_h)
+        for image, clip_box, visible in images:
+            area = Bbox.intersection(image.axes.bbox.frozen().translated(-bbox.x0 * dpi, -bbox.y0 * dpi), tile_box)
+            image.set_visible(visible and area is not None)
+            if area is not None:
+                image.set_clip_box(area)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='raw', dpi=dpi, bbox_inches=bbox,
+                    facecolor='white', edgecolor='none', transparent=False)
+        rgba = np.frombuffer(buffer.getbuffer(), dtype=np.uint8).reshape(tile_h, tile_w, 4)
+        return rgba[:, :, :3]
+
+    compressor = zlib.compressobj(6)
+    with open(file_path, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(_png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)))
+        pixels_per_meter = int(round(dpi / 0.0254))
+        f.write(_png_chunk(b'pHYs', struct.pack('>IIB', pixels_per_meter, pixels_per_meter, 1)))
+        for top in range(0, height, tile_height):
+            rows = min(tile_height, height - top)
+            strip = np.empty((rows, width, 3), dtype=np.uint8)
+            for left in range(0, width, tile_width):
+                cols = min(tile_width, width - left)
+                strip[:, left:left + cols] = render_tile(left, top, cols, rows)
+            # 每行使用 Sub 滤波（与左侧像素做差），大片纯色区域压缩率更高
+            filtered = np.empty((rows, width * 3 + 1), dtype=np.uint8)
+            filtered[:, 0] = 1
+            flat = strip.reshape(rows, width * 3)
+            filtered[:, 1:4] = flat[:, :3]
+            np.subtract(flat[:, 3:], flat[:, :-3], out=filtered[:, 4:])
+            data = compressor.compress(filtered.tobytes())
+            if data:
+                f.write(_png_chunk(b'IDAT', data))
+        f.write(_png_chunk(b'IDAT', compressor.flush()))
+        f.write(_png_chunk(b'IEND', b''))
+    for image, clip_box, visible in images:
+        image.set_clip_box(clip_box)
+        image.set_visible(visible)
+
+
+def run_export(scene, size, outputs, downsample, rasterize, rc, messages):
+    """导出进程入口：渲染一次，依次写出所有格式"""
+    try:
+        matplotlib.rcParams.update(rc)
+        write_outputs(scene, size, outputs, downsample,
+                      lambda index, file_path: messages.put(('progress', index, file_path)),
+                      rasterize)
+        messages.put(('done', [file_path for file_path, _, _ in outputs]))
+    except Exception as e:
+        messages.put(('error', str(e)))
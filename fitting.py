@@ -0,0 +1,856 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from scipy import stats
+from scipy.linalg import solve_triangular
+from scipy.optimize import least_squares
+
+FIT_TYPES = ["linear", "polynomial", "exponential", "logarithmic", "power", "auto"]
+
+# 结果说明中各拟合类型的名称
+FIT_NAMES = {
+    'linear': "线性拟合",
+    'polynomial': "多项式拟合",
+    'exponential': "指数拟合",
+    'logarithmic': "对数拟合",
+    'power': "幂函数拟合",
+    'auto': "自动选择",
+}
+
+# 自动选择时比较的模型 (拟合类型, 多项式阶数)；1阶多项式即线性拟合，不重复计算
+AUTO_CANDIDATES = ([('linear', 1)] + [('polynomial', order) for order in range(2, 7)]
+                   + [('exponential', 1), ('logarithmic', 1), ('power', 1)])
+AUTO_CRITERIA = ('aic', 'bic')
+
+# 多项式的最高阶数、交叉验证折数和逐块分解时每块的行数
+POLY_MAX_ORDER = 10
+POLY_CV_FOLDS = 5
+POLY_CHUNK_ROWS = 65536
+
+# 置信带与预测带的置信水平和计算方法
+BAND_LEVEL = 0.95
+BAND_METHODS = ('analytic', 'bootstrap')
+BOOTSTRAP_RESAMPLES = 200
+# 每批重采样数组的元素数上限（批大小 × 点数 × 参数个数），限制批处理的内存
+BOOTSTRAP_BATCH_ELEMENTS = 4_000_000
+# 非线性模型在每个重采样上从全部数据的解出发做的高斯-牛顿迭代次数
+BOOTSTRAP_ITERATIONS = 8
+
+
+def make_fit_func(params):
+    """根据保存的拟合参数重建拟合函数，参数不足时返回 None"""
+    if not params:
+        return None
+    fit_type = params.get('type', 'linear')
+    
+    if fit_type == 'linear' or ('slope' in params and 'intercept' in params and 'a' not in params):
+        slope = params['slope']
+        intercept = params['intercept']
+        
+        def fit_func(x):
+            return slope * x + intercept
+    
+    elif fit_type == 'polynomial' and 'chebyshev' in params:
+        # 在拟合时的缩放区间上按 Chebyshev 级数求值，x 偏移很大时也不损失精度
+        fit_func = np.polynomial.Chebyshev(params['chebyshev'], domain=params['domain'])
+    
+    elif fit_type == 'polynomial':
+        p = np.poly1d(params['coeffs'])
+        
+        def fit_func(x):
+            return p(x)
+    
+    elif fit_type == 'exponential':
+        a, b = params['a'], params['b']
+        
+        def fit_func(x):
+            return a * np.exp(b * x)
+    
+    elif fit_type == 'logarithmic':
+        a, b = params['a'], params['b']
+        
+        def fit_func(x):
+            # 避免对数计算中的负数或零
+            x_safe = np.maximum(x, 1e-10)
+            return a + b * np.log(x_safe)
+    
+    elif fit_type == 'power':
+        a, b = params['a'], params['b']
+        
+        def fit_func(x):
+            # 避免计算中的负数或零
+            x_safe = np.maximum(x, 1e-10)
+            return a * np.power(x_safe, b)
+    
+    else:
+        return None
+    
+    return fit_func
+
+
+def fit_curve(x_array, y_array, fit_type, order=2, initial=None, method='nonlinear'):
+    """对数据执行指定类型的拟合，返回拟合参数字典
+
+    指数、对数和幂函数默认在原始尺度上做非线性最小二乘（见 nonlinear_fit），
+    initial 为用户给出的初始参数 (a, b)；method='loglinear' 时只做对数变换后的线性回归。
+    数据不满足拟合类型的要求时抛出 ValueError。
+    """
+    x_array = np.asarray(x_array, dtype=np.float64)
+    y_array = np.asarray(y_array, dtype=np.float64)
+    if len(x_array) < 2:
+        raise ValueError("至少需要2个数据点才能进行拟合!")
+    
+    if fit_type in NONLINEAR_TYPES and method == 'nonlinear':
+        return nonlinear_fit(x_array, y_array, fit_type, initial)
+    
+    if fit_type == "linear":
+        # 线性拟合
+        slope, intercept, r_value, p_value, std_err = stats.linregress(x_array, y_array)
+        return {
+            'type': 'linear',
+            'slope': slope,
+            'intercept': intercept,
+            'r_value': r_value,
+            'p_value': p_value,
+            'std_err': std_err,
+            'equation': f"y = {slope:.6f}x + {intercept:.6f}"
+        }
+    
+    if fit_type == "auto":
+        return select_model(x_array, y_array)
+    
+    if fit_type == "polynomial":
+        # 多项式拟合，阶数限制在1到10之间；order 为 None 时按交叉验证的一倍标准误差规则选阶
+        max_order = POLY_MAX_ORDER if order is None else min(max(int(order), 1), POLY_MAX_ORDER)
+        return polynomial_params(polynomial_sweep(x_array, y_array, max_order), order)
+    
+    if fit_type == "exponential":
+        # 指数拟合 y = a * exp(b * x)，对数变换: ln(y) = ln(a) + b * x
+        if np.any(y_array <= 0):
+            raise ValueError("指数拟合要求所有Y值必须为正数!")
+        slope, intercept, r_value, p_value, std_err = stats.linregress(x_array, np.log(y_array))
+        a, b = np.exp(intercept), slope
+        return {
+            'type': 'exponential',
+            'a': a,
+            'b': b,
+            'r_value': r_value,
+            'equation': f"y = {a:.6f} * exp({b:.6f} * x)"
+        }
+    
+    if fit_type == "logarithmic":
+        # 对数拟合 y = a + b * ln(x)
+        if np.any(x_array <= 0):
+            raise ValueError("对数拟合要求所有X值必须为正数!")
+        slope, intercept, r_value, p_value, std_err = stats.linregress(np.log(x_array), y_array)
+        return {
+            'type': 'logarithmic',
+            'a': intercept,
+            'b': slope,
+            'r_value': r_value,
+            'equation': f"y = {intercept:.6f} + {slope:.6f} * ln(x)"
+        }
+    
+    if fit_type == "power":
+        # 幂函数拟合 y = a * x^b，双对数变换: log(y) = log(a) + b * log(x)
+        if np.any(x_array <= 0) or np.any(y_array <= 0):
+            raise ValueError("幂函数拟合要求所有X值和Y值必须为正数!")
+        slope, intercept, r_value, p_value, std_err = stats.linregress(np.log(x_array), np.log(y_array))
+        a, b = np.exp(intercept), slope
+        return {
+            'type': 'power',
+            'a': a,
+            'b': b,
+            'r_value': r_value,
+            'equation': f"y = {a:.6f} * x^{b:.6f}"
+        }
+    
+    raise ValueError(f"不支持的拟合类型: {fit_type}")
+
+
+def polynomial_sweep(x_array, y_array, max_order=POLY_MAX_ORDER, folds=POLY_CV_FOLDS):
+    """一次遍历数据，得到 1..max_order 阶多项式拟合及各阶的 k 折交叉验证误差
+
+    x 线性映射到 [-1, 1] 后使用 Chebyshev 基，条件数与 x 的偏移和量级无关。数据逐块
+    并入增广矩阵 [V | y] 的 R 因子 (TSQR)，每折保留一个小 R 因子：基是嵌套的，各阶的解
+    都来自同一分解；留出一折的误差等于 ‖R_f [c; -1]‖²，也不需要再次遍历数据。
+    """
+    x_array = np.asarray(x_array, dtype=np.float64)
+    y_array = np.asarray(y_array, dtype=np.float64)
+    n = len(x_array)
+    lo, hi = float(np.min(x_array)), float(np.max(x_array))
+    if hi == lo:
+        raise ValueError("所有X值相同，无法进行多项式拟合!")
+    max_order = max(1, min(max_order, n - 1))
+    width = max_order + 2
+    center, half = (lo + hi) / 2, (hi - lo) / 2
+    
+    # 折的划分用固定种子，同一份数据每次得到相同的交叉验证结果
+    rng = np.random.default_rng(0)
+    fold_factors = [np.empty((0, width)) for _ in range(folds)]
+    fold_counts = np.zeros(folds, dtype=np.int64)
+    for start in range(0, n, POLY_CHUNK_ROWS):
+        end = min(start + POLY_CHUNK_ROWS, n)
+        block = np.empty((end - start, width))
+        block[:, :-1] = np.polynomial.chebyshev.chebvander((x_array[start:end] - center) / half, max_order)
+        block[:, -1] = y_array[start:end]
+        fold_ids = rng.integers(folds, size=end - start)
+        fold_counts += np.bincount(fold_ids, minlength=folds)
+        for fold in range(folds):
+            stacked = np.vstack((fold_factors[fold], block[fold_ids == fold]))
+            fold_factors[fold] = np.linalg.qr(stacked, mode='r')
+    
+    def solve(factor, order):
+        # R 的前 order+1 列即该阶的最小二乘问题；秩不足时取最小范数解
+        return np.linalg.lstsq(factor[:order + 1, :order + 1], factor[:order + 1, -1], rcond=None)[0]
+    
+    full = np.linalg.qr(np.vstack(fold_factors), mode='r')
+    z = np.zeros(width)
+    z[:len(full)] = full[:, -1]
+    # Qᵀy 的尾部平方和就是各阶的残差平方和，0阶即总平方和
+    tail = np.cumsum((z ** 2)[::-1])[::-1]
+    
+    # 每折、每阶的留出误差平方和
+    fold_sse = np.zeros((folds, max_order + 1))
+    for fold in range(folds):
+        train = np.linalg.qr(np.vstack(fold_factors[:fold] + fold_factors[fold + 1:]), mode='r')
+        for order in range(1, max_order + 1):
+            if len(train) <= order:
+                fold_sse[fold, order] = np.inf
+                continue
+            residual = fold_factors[fold][:, :order + 1] @ solve(train, order) - fold_factors[fold][:, -1]
+            fold_sse[fold, order] = residual @ residual
+    
+    # 各折的均方误差及其标准误差，用于一倍标准误差规则
+    used = fold_counts > 0
+    with np.errstate(invalid='ignore'):
+        fold_mse = fold_sse[used] / fold_counts[used, None]
+        cv_mse = fold_mse.mean(axis=0)
+        cv_se = fold_mse.std(axis=0, ddof=1) / np.sqrt(used.sum()) if used.sum() > 1 else np.zeros(max_order + 1)
+    
+    orders = {}
+    for order in range(1, max_order + 1):
+        orders[order] = {
+            'chebyshev': solve(full, order).tolist(),
+            'rss': float(tail[order + 1]),
+            'cv_rmse': float(np.sqrt(fold_sse[:, order].sum() / n)),
+        }
+    # 一倍标准误差规则：取交叉验证误差不超过最小值加一倍标准误差的最低阶数，
+    # 避免为了微小的误差改善选择过高的阶数
+    best = min(range(1, max_order + 1), key=lambda order: cv_mse[order])
+    threshold = cv_mse[best] + (cv_se[best] if np.isfinite(cv_se[best]) else 0.0)
+    best_order = next(order for order in range(1, max_order + 1) if cv_mse[order] <= threshold)
+    return {
+        'domain': [lo, hi],
+        'count': n,
+        'tss': float(tail[1]),
+        'orders': orders,
+        'best_order': best_order,
+    }
+
+
+def polynomial_params(sweep, order=None):
+    """由 polynomial_sweep 的结果生成某一阶的拟合参数，order 为 None 时取交叉验证最优阶数"""
+    order = sweep['best_order'] if order is None else min(max(int(order), 1), max(sweep['orders']))
+    fit = sweep['orders'][order]
+    series = np.polynomial.Chebyshev(fit['chebyshev'], domain=sweep['domain'])
+    # 换算到原始 x 的幂次系数（降幂），用于显示方程和兼容旧的项目文件
+    coeffs = series.convert(kind=np.polynomial.Polynomial).coef[::-1]
+    coeffs = np.concatenate((np.zeros(order + 1 - len(coeffs)), coeffs))
+    
+    # 生成多项式方程字符串表示
+    equation = "y = "
+    for i, coef in enumerate(coeffs):
+        power = order - i
+        if power > 1:
+            equation += f"{coef:.6f}x^{power} + "
+        elif power == 1:
+            equation += f"{coef:.6f}x + "
+        else:
+            equation += f"{coef:.6f}"
+    
+    tss = sweep['tss']
+    return {
+        'type': 'polynomial',
+        'order': order,
+        'coeffs': coeffs.tolist(),
+        'chebyshev': fit['chebyshev'],
+        'domain': sweep['domain'],
+        'r_squared': 1 - fit['rss'] / tss if tss > 0 else float('nan'),
+        'cv_rmse': fit['cv_rmse'],
+        'cv_orders': [[k, sweep['orders'][k]['cv_rmse']] for k in sorted(sweep['orders'])],
+        'equation': equation
+    }
+
+
+def curve_polynomial_sweep(curve):
+    """曲线的多项式分解，缓存在曲线的 'poly_sweep' 项中，切换阶数时无需重新计算"""
+    data = curve['data']
+    state = curve.get('poly_sweep')
+    if state is None or state['data'] is not data or state['version'] != data.version:
+        state = {'data': data, 'version': data.version,
+                 'sweep': polynomial_sweep(data.x, data.y)}
+        curve['poly_sweep'] = state
+    return state['sweep']
+
+
+# 在原始尺度上做非线性最小二乘的模型
+NONLINEAR_TYPES = ('exponential', 'logarithmic', 'power')
+# 正常情况下几十次内收敛；模型与数据不符时尽早放弃，每次求值都要遍历全部数据
+NONLINEAR_MAX_EVALUATIONS = 50
+
+
+def _model_functions(fit_type, x_array):
+    """返回模型 f(p) 及其解析雅可比矩阵 J(p)，p = (a, b)"""
+    if fit_type == 'exponential':
+        # y = a * exp(b * x)
+        def model(p):
+            return p[0] * np.exp(p[1] * x_array)
+        
+        def jacobian(p):
+            e = np.exp(p[1] * x_array)
+            return np.column_stack((e, p[0] * x_array * e))
+        return model, jacobian
+    
+    log_x = np.log(x_array)
+    if fit_type == 'logarithmic':
+        # y = a + b * ln(x)，对参数是线性的，雅可比矩阵为常数
+        constant = np.column_stack((np.ones_like(log_x), log_x))
+        
+        def model(p):
+            return p[0] + p[1] * log_x
+        return model, lambda p: constant
+    
+    # y = a * x^b = a * exp(b * ln x)
+    def model(p):
+        return p[0] * np.exp(p[1] * log_x)
+    
+    def jacobian(p):
+        e = np.exp(p[1] * log_x)
+        return np.column_stack((e, p[0] * log_x * e))
+    return model, jacobian
+
+
+def _initial_guess(x_array, y_array, fit_type):
+    """非线性拟合的初值：能做对数线性化时用其结果，否则使用保守的默认值"""
+    try:
+        start = fit_curve(x_array, y_array, fit_type, method='loglinear')
+        return [start['a'], start['b']]
+    except ValueError:
+        scale = float(np.mean(y_array)) or 1.0
+        return [scale, 1.0 if fit_type == 'power' else 0.0]
+
+
+def nonlinear_fit(x_array, y_array, fit_type, initial=None):
+    """在原始尺度上用 Levenberg-Marquardt 拟合指数、对数或幂函数模型
+
+    以用户给出的初始参数或对数线性化的解为初值，使用解析雅可比矩阵，
+    返回的参数字典另含原始尺度的 R²、参数协方差矩阵和标准误差。
+    """
+    x_array = np.asarray(x_array, dtype=np.float64)
+    y_array = np.asarray(y_array, dtype=np.float64)
+    if fit_type in ('logarithmic', 'power') and np.any(x_array <= 0):
+        raise ValueError(f"{FIT_NAMES[fit_type]}要求所有X值必须为正数!")
+    if initial is None:
+        initial = _initial_guess(x_array, y_array, fit_type)
+    elif len(initial) != 2:
+        raise ValueError("初始参数应为两个数字: a, b")
+    
+    model, jacobian = _model_functions(fit_type, x_array)
+    try:
+        result = least_squares(lambda p: model(p) - y_array, np.asarray(initial, dtype=np.float64),
+                               jac=jacobian, method='lm', x_scale='jac',
+                               max_nfev=NONLINEAR_MAX_EVALUATIONS)
+    except ValueError as e:
+        raise ValueError(f"非线性拟合失败: {e}")
+    if not result.success:
+        raise ValueError(f"非线性拟合未收敛: {result.message}")
+    
+    a, b = result.x
+    n = len(x_array)
+    rss = float(result.fun @ result.fun)
+    tss = float(np.sum((y_array - y_array.mean()) ** 2))
+    # 协方差 = s² (JᵀJ)⁻¹，s² 为残差方差的无偏估计
+    dof = max(n - 2, 1)
+    try:
+        covariance = np.linalg.inv(result.jac.T @ result.jac) * (rss / dof)
+    except np.linalg.LinAlgError:
+        covariance = np.full((2, 2), np.inf)
+    equation = {
+        'exponential': f"y = {a:.6f} * exp({b:.6f} * x)",
+        'logarithmic': f"y = {a:.6f} + {b:.6f} * ln(x)",
+        'power': f"y = {a:.6f} * x^{b:.6f}",
+    }[fit_type]
+    return {
+        'type': fit_type,
+        'a': float(a),
+        'b': float(b),
+        'method': 'nonlinear',
+        'r_squared': 1 - rss / tss if tss > 0 else float('nan'),
+        'covariance': covariance.tolist(),
+        'param_errors': np.sqrt(np.maximum(np.diag(covariance), 0)).tolist(),
+        'iterations': int(result.nfev),
+        'equation': equation
+    }
+
+
+def fit_summary(params):
+    """拟合结果的 (R², P值)，没有对应指标时为 None；有原始尺度的 R² 时优先使用"""
+    if 'r_squared' in params:
+        return params['r_squared'], params.get('p_value')
+    r_value = params.get('r_value')
+    return (None if r_value is None else r_value ** 2), params.get('p_value')
+
+
+def parameter_count(params):
+    """模型的自由参数个数"""
+    if params['type'] == 'polynomial':
+        return params['order'] + 1
+    return 2
+
+
+def score_fit(x_array, y_array, params):
+    """在原始Y尺度上评价拟合：返回 R²、AIC、BIC，各模型之间可以直接比较"""
+    n = len(x_array)
+    residuals = y_array - make_fit_func(params)(x_array)
+    rss = float(residuals @ residuals)
+    tss = float(np.sum((y_array - y_array.mean()) ** 2))
+    if not np.isfinite(rss):
+        raise ValueError("拟合结果在数据范围内溢出")
+    k = parameter_count(params)
+    # 高斯误差下的信息准则，略去对所有模型相同的常数项
+    log_likelihood_term = n * np.log(max(rss, 1e-300) / n)
+    return {
+        'r_squared': 1 - rss / tss if tss > 0 else float('nan'),
+        'aic': float(log_likelihood_term + 2 * k),
+        'bic': float(log_likelihood_term + k * np.log(n)),
+    }
+
+
+def _evaluate_candidate(x_array, y_array, fit_type, order, sweep=None):
+    """拟合并评价一个候选模型，不满足前提条件的模型记录跳过原因"""
+    candidate = {'type': fit_type, 'order': order}
+    try:
+        if fit_type == 'polynomial' and sweep is not None:
+            params = polynomial_params(sweep, order)
+        else:
+            params = fit_curve(x_array, y_array, fit_type, order)
+        candidate.update(score_fit(x_array, y_array, params))
+        candidate['params'] = params
+    except Exception as e:
+        candidate['error'] = str(e)
+    return candidate
+
+
+def select_model(x_array, y_array, criterion='aic'):
+    """并发拟合所有候选模型，按原始尺度上的信息准则选出最优模型
+
+    返回最优模型的拟合参数，另附 'r_squared'（原始尺度）、'criterion' 和按准则
+    排序的 'candidates' 列表，被跳过的模型带有 'error'。各模型的计算主要在 NumPy
+    中进行并释放 GIL，因此用线程池并发执行，数据无需复制。
+    """
+    x_array = np.asarray(x_array, dtype=np.float64)
+    y_array = np.asarray(y_array, dtype=np.float64)
+    # 所有多项式候选共用一次分解
+    max_order = max(order for fit_type, order in AUTO_CANDIDATES if fit_type == 'polynomial')
+    try:
+        sweep = polynomial_sweep(x_array, y_array, max_order)
+    except ValueError:
+        # 由各多项式候选自行拟合并记录失败原因
+        sweep = None
+    with ThreadPoolExecutor(max_workers=min(len(AUTO_CANDIDATES), os.cpu_count() or 1)) as executor:
+        candidates = list(executor.map(lambda model: _evaluate_candidate(x_array, y_array, *model, sweep),
+                                       AUTO_CANDIDATES))
+    # 点数较少时高阶多项式被截断到较低阶数，与低阶候选重复；参数个数不少于点数时
+    # 为精确插值，信息准则没有意义。两者都记为跳过，不参与比较
+    for i, c in enumerate(candidates):
+        if 'error' in c:
+            continue
+        fitted_order = c['params']['order'] if c['type'] == 'polynomial' else c['order']
+        if fitted_order != c['order'] or parameter_count(c['params']) >= len(x_array):
+            candidates[i] = {'type': c['type'], 'order': c['order'], 'error': "点数不足"}
+    usable = [c for c in candidates if 'error' not in c]
+    if not usable:
+        reasons = "; ".join(f"{FIT_NAMES[c['type']]}: {c['error']}" for c in candidates if 'error' in c)
+        raise ValueError(f"没有可用的拟合模型! {reasons}")
+    usable.sort(key=lambda c: c[criterion])
+    best = dict(usable[0]['params'])
+    best['r_squared'] = usable[0]['r_squared']
+    best['criterion'] = criterion
+    # 只保留可写入项目文件的摘要
+    best['candidates'] = [
+        {key: (float(c[key]) if key in ('r_squared', 'aic', 'bic') else c[key])
+         for key in ('type', 'order', 'r_squared', 'aic', 'bic', 'error') if key in c}
+        for c in usable + [c for c in candidates if c not in usable]
+    ]
+    return best
+
+
+def fit_task(name, data, fit_type, order=2):
+    """进程池中的单条曲线拟合任务，返回 (名称, 参数或None, 错误信息或None, 耗时秒, 点数)"""
+    start = time.perf_counter()
+    try:
+        params, error = fit_curve(data.x, data.y, fit_type, order), None
+    except Exception as e:
+        params, error = None, str(e)
+    return name, params, error, time.perf_counter() - start, len(data)
+
+
+def _band_model(params, x_range):
+    """把拟合参数表示为参数向量 θ 和模型函数 model(θ, x) -> (f, J)
+
+    θ 的形状为 (..., p)，x 为 (..., n)，f 为 (..., n)，雅可比矩阵 J 为 (..., n, p)，
+    因此一批重采样可以一次计算。多项式在 Chebyshev 基上参数化。
+    第三个返回值表示模型对参数是否线性（线性时一步高斯-牛顿即为最小二乘解）。
+    """
+    fit_type = params['type']
+    if fit_type == 'linear':
+        def model(theta, x):
+            return theta[..., None, 0] + theta[..., None, 1] * x, np.stack(np.broadcast_arrays(1.0, x), axis=-1)
+        return [params['intercept'], params['slope']], model, True
+    
+    if fit_type == 'polynomial':
+        if 'chebyshev' in params:
+            coef, domain = params['chebyshev'], params['domain']
+        else:
+            # 旧项目文件只有原始 x 的幂次系数，换算到数据范围上的 Chebyshev 基
+            series = np.polynomial.Polynomial(params['coeffs'][::-1]).convert(
+                kind=np.polynomial.Chebyshev, domain=list(x_range))
+            coef, domain = series.coef, x_range
+        center, half = (domain[0] + domain[1]) / 2, (domain[1] - domain[0]) / 2 or 1.0
+        degree = len(coef) - 1
+        
+        def model(theta, x):
+            jacobian = np.polynomial.chebyshev.chebvander((x - center) / half, degree)
+            return (jacobian @ theta[..., None])[..., 0], jacobian
+        return coef, model, True
+    
+    if fit_type == 'logarithmic':
+        def model(theta, x):
+            log_x = np.log(x)
+            return (theta[..., None, 0] + theta[..., None, 1] * log_x,
+                    np.stack(np.broadcast_arrays(1.0, log_x), axis=-1))
+        return [params['a'], params['b']], model, True
+    
+    if fit_type == 'exponential':
+        def model(theta, x):
+            a = theta[..., None, 0]
+            e = np.exp(theta[..., None, 1] * x)
+            return a * e, np.stack((e, a * x * e), axis=-1)
+    else:
+        def model(theta, x):
+            a = theta[..., None, 0]
+            log_x = np.log(x)
+            e = np.exp(theta[..., None, 1] * log_x)
+            return a * e, np.stack((e, a * log_x * e), axis=-1)
+    return [params['a'], params['b']], model, False
+
+
+def analytic_bands(x_array, y_array, params, x_eval, level=BAND_LEVEL):
+    """由参数协方差计算置信带与预测带
+
+    对线性和多项式模型是精确的 t 区间，对指数和幂函数模型为一阶近似（delta 方法）。
+    逐块合并雅可比矩阵的 R 因子，一次遍历数据即得到 (JᵀJ)⁻¹ 和残差平方和。
+    """
+    x_array = np.asarray(x_array, dtype=np.float64)
+    y_array = np.asarray(y_array, dtype=np.float64)
+    theta, model, _ = _band_model(params, (float(np.min(x_array)), float(np.max(x_array))))
+    theta = np.asarray(theta, dtype=np.float64)
+    n, p = len(x_array), len(theta)
+    if n <= p:
+        raise ValueError("数据点数量不足，无法计算置信带!")
+    
+    factor = np.empty((0, p))
+    rss = 0.0
+    for start in range(0, n, POLY_CHUNK_ROWS):
+        end = min(start + POLY_CHUNK_ROWS, n)
+        fitted, jacobian = model(theta, x_array[start:end])
+        residuals = y_array[start:end] - fitted
+        rss += float(residuals @ residuals)
+        factor = np.linalg.qr(np.vstack((factor, jacobian)), mode='r')
+    if len(factor) < p or not np.all(np.abs(np.diag(factor)) > 0):
+        raise ValueError("参数协方差矩阵奇异，无法计算置信带!")
+    
+    s2 = rss / (n - p)
+    fitted, jacobian = model(theta, np.asarray(x_eval, dtype=np.float64))
+    # gᵀ Σ g = s² ‖R⁻ᵀ g‖²，其中 Σ = s² (JᵀJ)⁻¹ = s² R⁻¹R⁻ᵀ
+    projected = solve_triangular(factor, jacobian.T, trans='T')
+    variance = s2 * np.sum(projected ** 2, axis=0)
+    t_value = stats.t.ppf((1 + level) / 2, n - p)
+    confidence = t_value * np.sqrt(variance)
+    prediction = t_value * np.sqrt(variance + s2)
+    return {
+        'method': 'analytic',
+        'level': level,
+        'x': np.asarray(x_eval, dtype=np.float64),
+        'fit': fitted,
+        'conf': (fitted - confidence, fitted + confidence),
+        'pred': (fitted - prediction, fitted + prediction),
+    }
+
+
+def bootstrap_samples(x_array, y_array, params, x_eval, resamples=BOOTSTRAP_RESAMPLES, seed=0):
+    """有放回重采样并重新拟合，返回 (拟合线样本, 预测样本)，形状均为 (resamples, len(x_eval))
+
+    重采样按批组成 (批大小, n) 的数组，每批在所有重采样上同时做高斯-牛顿迭代，
+    每步用批量 QR 分解求解；预测样本在拟合线样本上加入随机抽取的残差。
+    """
+    x_array = np.asarray(x_array, dtype=np.float64)
+    y_array = np.asarray(y_array, dtype=np.float64)
+    x_eval = np.asarray(x_eval, dtype=np.float64)
+    theta0, model, linear = _band_model(params, (float(np.min(x_array)), float(np.max(x_array))))
+    theta0 = np.asarray(theta0, dtype=np.float64)
+    n, p = len(x_array), len(theta0)
+    rng = np.random.default_rng(seed)
+    residuals = y_array - model(theta0, x_array)[0]
+    
+    batch = max(1, BOOTSTRAP_BATCH_ELEMENTS // (n * (p + 1)))
+    curves = np.empty((resamples, len(x_eval)))
+    with np.errstate(all='ignore'):
+        for start in range(0, resamples, batch):
+            count = min(batch, resamples - start)
+            index = rng.integers(n, size=(count, n))
+            x_batch, y_batch = x_array[index], y_array[index]
+            theta = np.tile(theta0, (count, 1))
+            for _ in range(1 if linear else BOOTSTRAP_ITERATIONS):
+                fitted, jacobian = model(theta, x_batch)
+                augmented = np.concatenate((jacobian, (y_batch - fitted)[..., None]), axis=-1)
+                factor = np.linalg.qr(augmented, mode='r')
+                # 重采样中的点可能退化（如X全部相同），用伪逆得到最小范数步长
+                step = np.linalg.pinv(factor[:, :p, :p]) @ factor[:, :p, p:]
+                theta = theta + step[..., 0]
+            curves[start:start + count] = model(theta, x_eval)[0]
+    curves[~np.isfinite(curves)] = np.nan
+    predictions = curves + residuals[rng.integers(n, size=curves.shape)]
+    return curves, predictions
+
+
+def bootstrap_task(data, params, x_eval, resamples, seed):
+    """进程池中的自助法任务，数据按块分配给多个进程，各块使用不同的随机种子"""
+    return bootstrap_samples(data.x, data.y, params, x_eval, resamples, seed)
+
+
+def bootstrap_bands(params, x_eval, samples, level=BAND_LEVEL):
+    """合并一个或多个 bootstrap_samples 的结果，按分位数生成置信带与预测带"""
+    curves = np.concatenate([part[0] for part in samples])
+    predictions = np.concatenate([part[1] for part in samples])
+    tail = (1 - level) / 2 * 100
+    with np.errstate(all='ignore'):
+        conf = np.nanpercentile(curves, [tail, 100 - tail], axis=0)
+        pred = np.nanpercentile(predictions, [tail, 100 - tail], axis=0)
+    x_eval = np.asarray(x_eval, dtype=np.float64)
+    return {
+        'method': 'bootstrap',
+        'level': level,
+        'x': x_eval,
+        'fit': make_fit_func(params)(x_eval),
+        'conf': (conf[0], conf[1]),
+        'pred': (pred[0], pred[1]),
+        'resamples': len(curves),
+    }
+
+
+def fit_bands(x_array, y_array, params, x_eval, method='analytic', level=BAND_LEVEL,
+              resamples=BOOTSTRAP_RESAMPLES):
+    """在 x_eval 上计算拟合的置信带与预测带，method 为 'analytic' 或 'bootstrap'"""
+    if method == 'analytic':
+        return analytic_bands(x_array, y_array, params, x_eval, level)
+    return bootstrap_bands(params, x_eval, [bootstrap_samples(x_array, y_array, params, x_eval, resamples)], level)
+
+
+class RunningRegression:
+    """一元线性回归的累积统计
+
+    保存点数、均值以及离差平方和/交叉积和 (Sxx, Syy, Sxy)，而不是原始的 Σx²、Σxy，
+    避免数据偏离原点较远时的大数相消。单点追加用 Welford 递推，批量追加和删除用
+    Chan 等人的分组合并公式，代价只与变化的点数有关。
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        self.sxx = 0.0
+        self.syy = 0.0
+        self.sxy = 0.0
+
+    def add_point(self, x, y):
+        """追加单个点，O(1)；非有限值被忽略"""
+        if not (np.isfinite(x) and np.isfinite(y)):
+            return
+        self.n += 1
+        dx = x - self.mean_x
+        dy = y - self.mean_y
+        self.mean_x += dx / self.n
+        self.mean_y += dy / self.n
+        self.sxx += dx * (x - self.mean_x)
+        self.syy += dy * (y - self.mean_y)
+        self.sxy += dx * (y - self.mean_y)
+
+    def add(self, x, y):
+        """批量追加数据点"""
+        x, y = _finite_pairs(x, y)
+        if len(x) == 1:
+            self.add_point(float(x[0]), float(y[0]))
+        elif len(x):
+            self._merge(*_group_stats(x, y), sign=1)
+
+    def remove(self, x, y):
+        """删除一批之前加入过的数据点"""
+        x, y = _finite_pairs(x, y)
+        if len(x) >= self.n:
+            self.__init__()
+        elif len(x):
+            self._merge(*_group_stats(x, y), sign=-1)
+
+    def _merge(self, n_b, mean_x_b, mean_y_b, sxx_b, syy_b, sxy_b, sign):
+        """合并（sign=1）或扣除（sign=-1）一组数据的统计量"""
+        if sign > 0:
+            n = self.n + n_b
+            n_a, mean_x_a, mean_y_a = self.n, self.mean_x, self.mean_y
+            self.mean_x = mean_x_a + (mean_x_b - mean_x_a) * n_b / n
+            self.mean_y = mean_y_a + (mean_y_b - mean_y_a) * n_b / n
+        else:
+            # 由合并后的统计量和被扣除的一组反推剩余部分
+            n = self.n
+            n_a = n - n_b
+            mean_x_a = (n * self.mean_x - n_b * mean_x_b) / n_a
+            mean_y_a = (n * self.mean_y - n_b * mean_y_b) / n_a
+            self.mean_x, self.mean_y = mean_x_a, mean_y_a
+        dx = mean_x_b - mean_x_a
+        dy = mean_y_b - mean_y_a
+        weight = n_a * n_b / n
+        self.sxx += sign * (sxx_b + dx * dx * weight)
+        self.syy += sign * (syy_b + dy * dy * weight)
+        self.sxy += sign * (sxy_b + dx * dy * weight)
+        self.n = n if sign > 0 else n_a
+        # 扣除后的舍入误差不应使平方和变为负数
+        self.sxx = max(self.sxx, 0.0)
+        self.syy = max(self.syy, 0.0)
+
+    def result(self):
+        """当前的线性拟合参数，与 fit_curve(..., 'linear') 的结果格式相同；无法拟合时返回 None"""
+        if self.n < 2 or self.sxx <= 0:
+            return None
+        slope = self.sxy / self.sxx
+        intercept = self.mean_y - slope * self.mean_x
+        r_value = 0.0 if self.syy <= 0 else float(np.clip(self.sxy / np.sqrt(self.sxx * self.syy), -1.0, 1.0))
+        df = self.n - 2
+        if df > 0:
+            # 与 scipy.stats.linregress 相同的 t 检验和斜率标准误差
+            residual = max((1.0 - r_value) * (1.0 + r_value), 1e-20)
+            t_value = r_value * np.sqrt(df / residual)
+            p_value = 2 * stats.t.sf(abs(t_value), df)
+            std_err = np.sqrt(residual * self.syy / self.sxx / df)
+        else:
+            p_value, std_err = 1.0, 0.0
+        return {
+            'type': 'linear',
+            'slope': slope,
+            'intercept': intercept,
+            'r_value': r_value,
+            'p_value': p_value,
+            'std_err': std_err,
+            'equation': f"y = {slope:.6f}x + {intercept:.6f}"
+        }
+
+
+def _finite_pairs(x, y):
+    x = np.asarray(x, dtype=np.float64).ravel()
+    y = np.asarray(y, dtype=np.float64).ravel()
+    finite = np.isfinite(x) & np.isfinite(y)
+    if not finite.all():
+        x, y = x[finite], y[finite]
+    return x, y
+
+
+def _group_stats(x, y):
+    """一组数据的 (点数, X均值, Y均值, Sxx, Syy, Sxy)，两遍计算"""
+    mean_x = x.mean()
+    mean_y = y.mean()
+    dx = x - mean_x
+    dy = y - mean_y
+    return len(x), mean_x, mean_y, float(dx @ dx), float(dy @ dy), float(dx @ dy)
+
+
+def curve_regression(curve):
+    """曲线的累积回归统计，缓存在曲线的 'regression' 项中，与数据不同步时由全部数据重建"""
+    data = curve['data']
+    state = curve.get('regression')
+    if state is None or state['data'] is not data or state['version'] != data.version:
+        regression = RunningRegression()
+        regression.add(data.x, data.y)
+        state = {'data': data, 'version': data.version, 'stats': regression}
+        curve['regression'] = state
+    return state['stats']
+
+
+def track_regression(curve, added=None, removed=None):
+    """曲线数据每次修改后调用，按追加/删除的 (x, y) 增量更新累积统计
+
+    只在统计恰好落后数据一个版本（即只错过这一次修改）时增量更新，
+    否则不做处理，留待下次 curve_regression 时重建。
+    """
+    data = curve['data']
+    state = curve.get('regression')
+    if state is None or state['data'] is not data or state['version'] != data.version - 1:
+        return
+    if not len(data):
+        state['stats'] = RunningRegression()
+    else:
+        if removed is not None:
+            state['stats'].remove(*removed)
+        if added is not None:
+            state['stats'].add(*added)
+    state['version'] = data.version
+
+
+def format_fit_result(curve_name, params, count):
+    """生成拟合结果的文字说明"""
+    fit_type = params['type']
+    title = FIT_NAMES[fit_type]
+    if fit_type == 'polynomial':
+        title += f"，阶数: {params['order']}"
+    if params.get('candidates'):
+        title += "，自动选择"
+    lines = [f"曲线: {curve_name} ({title})", f"拟合方程: {params['equation']}"]
+    
+    if fit_type == 'linear':
+        lines += [f"相关系数 R: {params['r_value']:.6f}",
+                  f"决定系数 R²: {params['r_value']**2:.6f}",
+                  f"P值: {params['p_value']:.6e}",
+                  f"标准误差: {params['std_err']:.6f}"]
+    elif fit_type == 'polynomial':
+        lines.append(f"决定系数 R²: {params['r_squared']:.6f}")
+        if params.get('cv_orders') and not params.get('candidates'):
+            lines.append(f"{POLY_CV_FOLDS}折交叉验证 RMSE: {params['cv_rmse']:.6g}")
+            lines.append("各阶交叉验证 RMSE: " + "，".join(
+                f"{order}阶 {rmse:.4g}" for order, rmse in params['cv_orders']))
+    elif params.get('method') == 'nonlinear':
+        error_a, error_b = params['param_errors']
+        lines += [f"决定系数 R²: {params['r_squared']:.6f} (原始尺度)",
+                  f"参数 a: {params['a']:.6f} ± {error_a:.6f}",
+                  f"参数 b: {params['b']:.6f} ± {error_b:.6f}",
+                  f"非线性最小二乘，函数求值 {params['iterations']} 次"]
+    else:
+        # 指数和幂函数的相关系数在对数变换后的坐标上计算
+        note = {'exponential': " (对数变换后)", 'power': " (双对数变换后)"}.get(fit_type, "")
+        lines += [f"相关系数 R: {params['r_value']:.6f}{note}",
+                  f"决定系数 R²: {params['r_value']**2:.6f}{note}"]
+    
+    candidates = params.get('candidates')
+    if candidates:
+        # 自动选择的模型排名，R²均在原始Y尺度上计算
+        criterion = params.get('criterion', 'aic')
+        lines.append(f"\n自动选择 (按{criterion.upper()}排序，R²为原始尺度):")
+        for rank, c in enumerate(candidates, 1):
+            name = FIT_NAMES[c['type']] + (f"({c['order']}阶)" if c['type'] == 'polynomial' else "")
+            if 'error' in c:
+                lines.append(f"  跳过 {name}: {c['error']}")
+            else:
+                lines.append(f"  {rank}. {name}  AIC={c['aic']:.2f}  BIC={c['bic']:.2f}  R²={c['r_squared']:.6f}")
+    
+    lines.append(f"数据点数量: {count}")
+    return "\n".join(lines)
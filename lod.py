@@ -0,0 +1,161 @@
+import numpy as np
+
+# 点数少于此值的曲线直接绘制全部数据
+LOD_THRESHOLD = 100_000
+# 第0层每个桶包含的点数，之后每层翻倍
+BASE_BUCKET = 8
+# 金字塔最粗一层至少保留的桶数
+MIN_BUCKETS = 256
+# 每个像素列大约绘制的点数
+POINTS_PER_PIXEL = 2
+# 密度图每个格子边长对应的屏幕像素数
+DENSITY_BIN_PIXELS = 2
+# 密度图每个方向最多的格子数，超高分辨率导出时格子随之变大，内存不随分辨率增长
+DENSITY_MAX_BINS = 2048
+# 未按X排序的曲线超过此点数时不做全局排序（排序需要数倍于数据的内存），
+# 改为从存储顺序中等间隔抽取至多 LOD_SAMPLE_POINTS 个点建立金字塔
+LOD_SORT_LIMIT = 20_000_000
+LOD_SAMPLE_POINTS = 4_000_000
+# 检查是否有序时每次读取的点数，映射文件不会被整体载入
+LOD_SCAN_CHUNK = 1 << 20
+
+
+def _is_sorted_finite(x, y):
+    """逐块检查数据是否全为有限值且按X非递减，发现无序时提前结束"""
+    previous = -np.inf
+    for start in range(0, len(x), LOD_SCAN_CHUNK):
+        xc = np.asarray(x[start:start + LOD_SCAN_CHUNK])
+        yc = np.asarray(y[start:start + LOD_SCAN_CHUNK])
+        if not (np.isfinite(xc).all() and np.isfinite(yc).all()):
+            return False
+        if xc[0] < previous or np.any(xc[1:] < xc[:-1]):
+            return False
+        previous = xc[-1]
+    return True
+
+
+class LodPyramid:
+    """散点数据的多分辨率 min/max 金字塔
+
+    数据按X排序后切分为等长的桶，每层记录各桶中Y最小和最大的点，
+    上一层由下一层两两合并得到。显示时根据视口内的点数和像素宽度
+    选出刚好够用的一层，只绘制该层在视口内的桶。
+    已有序的数据（包括映射文件）直接使用原数组；无序且超过 LOD_SORT_LIMIT 点时
+    只对等间隔抽样排序，内存占用与曲线大小无关，此时 sampled 为 True。
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.version = data.version
+        x, y = data.x, data.y
+        self.sampled = False
+        if _is_sorted_finite(x, y):
+            # 已按X有序（常见的时间序列）时直接使用原数组，不复制
+            self.xs, self.ys = x, y
+        else:
+            if len(x) > LOD_SORT_LIMIT:
+                step = -(-len(x) // LOD_SAMPLE_POINTS)
+                x, y = np.array(x[::step]), np.array(y[::step])
+                self.sampled = True
+            finite = np.isfinite(x) & np.isfinite(y)
+            order = np.flatnonzero(finite)
+            order = order[np.argsort(x[order])]
+            self.xs, self.ys = x[order], y[order]
+        self.levels = self._build_levels()
+
+    def is_current(self, data):
+        """金字塔是否仍对应该曲线数据的当前内容"""
+        return self.data is data and self.version == data.version
+
+    def _build_levels(self):
+        """逐层计算每个桶中Y最小/最大点在排序数组中的位置"""
+        ys = self.ys
+        full = len(ys) // BASE_BUCKET
+        if full == 0:
+            return []
+        blocks = np.asarray(ys[:full * BASE_BUCKET]).reshape(full, BASE_BUCKET)
+        base = np.arange(full, dtype=np.int64) * BASE_BUCKET
+        lo = base + np.argmin(blocks, axis=1)
+        hi = base + np.argmax(blocks, axis=1)
+        tail = len(ys) - full * BASE_BUCKET
+        if tail:
+            start = full * BASE_BUCKET
+            rest = np.asarray(ys[start:])
+            lo = np.append(lo, start + np.argmin(rest))
+            hi = np.append(hi, start + np.argmax(rest))
+        levels = [(lo, hi)]
+        while len(lo) > MIN_BUCKETS:
+            lo = self._merge(lo, np.less)
+            hi = self._merge(hi, np.greater)
+            levels.append((lo, hi))
+        return levels
+
+    def _merge(self, positions, better):
+        """把相邻两个桶合并，保留比较结果更优的那个点"""
+        if len(positions) % 2:
+            positions = np.append(positions, positions[-1])
+        left, right = positions[0::2], positions[1::2]
+        return np.where(better(self.ys[right], self.ys[left]), right, left)
+
+    def _bounds(self, x_low, x_high):
+        start = int(np.searchsorted(self.xs, x_low, side='left'))
+        stop = int(np.searchsorted(self.xs, x_high, side='right'))
+        return start, stop
+
+    def window(self, x_low, x_high):
+        """返回X在 [x_low, x_high] 内的全部数据点（零拷贝切片）"""
+        start, stop = self._bounds(x_low, x_high)
+        return self.xs[start:stop], self.ys[start:stop]
+
+    def select(self, x_low, x_high, pixels):
+        """返回视口 [x_low, x_high] 内按像素宽度降采样后的 (x, y)"""
+        start, stop = self._bounds(x_low, x_high)
+        count = stop - start
+        budget = max(1, int(pixels) * POINTS_PER_PIXEL)
+        if count <= budget or not self.levels:
+            return self.xs[start:stop], self.ys[start:stop]
+
+        # 每个桶贡献两个点，选择桶大小足以把点数压到预算内的最细一层
+        level = 0
+        while (level + 1 < len(self.levels)
+               and (BASE_BUCKET << level) * budget < 2 * count):
+            level += 1
+        size = BASE_BUCKET << level
+        lo, hi = self.levels[level]
+        first, last = start // size, (stop - 1) // size + 1
+        positions = np.concatenate((lo[first:last], hi[first:last]))
+        positions = np.unique(positions)
+        positions = positions[(positions >= start) & (positions < stop)]
+        return self.xs[positions], self.ys[positions]
+
+    def select_all(self, pixels):
+        """返回整条曲线按像素宽度降采样后的 (x, y)"""
+        if len(self.xs) == 0:
+            return self.xs, self.ys
+        return self.select(self.xs[0], self.xs[-1], pixels)
+
+
+def density_grid(x, y, x_range, y_range, shape, log_scale=False):
+    """把视口内的点统计为二维计数网格
+
+    shape 为 (列数, 行数)，返回行对应Y的掩码数组，没有点的格子被掩码；
+    log_scale 为 True 时返回 log10(计数)。
+    """
+    cols, rows = max(1, int(shape[0])), max(1, int(shape[1]))
+    (x_low, x_high), (y_low, y_high) = x_range, y_range
+    if not (x_high > x_low and y_high > y_low):
+        return np.ma.masked_all((rows, cols))
+    x = np.asarray(x)
+    y = np.asarray(y)
+    inside = (x >= x_low) & (x <= x_high) & (y >= y_low) & (y <= y_high)
+    x, y = x[inside], y[inside]
+    col = ((x - x_low) * (cols / (x_high - x_low))).astype(np.intp)
+    row = ((y - y_low) * (rows / (y_high - y_low))).astype(np.intp)
+    np.minimum(col, cols - 1, out=col)
+    np.minimum(row, rows - 1, out=row)
+    counts = np.bincount(row * cols + col, minlength=rows * cols).reshape(rows, cols)
+    empty = counts == 0
+    grid = counts.astype(np.float64)
+    if log_scale:
+        np.log10(grid, out=grid, where=~empty)
+    return np.ma.masked_array(grid, mask=empty)
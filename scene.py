@@ -0,0 +1,442 @@
+import numpy as np
+from matplotlib.colors import LinearSegmentedColormap, to_rgb
+
+from fitting import make_fit_func, fit_bands
+from lod import LodPyramid, LOD_THRESHOLD, DENSITY_BIN_PIXELS, DENSITY_MAX_BINS, density_grid
+
+# 新曲线循环使用的颜色和标记
+CURVE_COLORS = ['blue', 'red', 'green', 'orange', 'purple', 'brown', 'pink', 'gray', 'olive', 'cyan']
+CURVE_MARKERS = ['o', 's', '^', 'D', 'v', 'p', '*', 'x', '+', 'h']  # 圆形、方形、三角形、菱形等
+
+
+def data_extents(x, y):
+    """返回 (x最小, x最大, y最小, y最大)，忽略非有限值；没有有限值时返回 None"""
+    finite = np.isfinite(x) & np.isfinite(y)
+    if not finite.all():
+        x, y = x[finite], y[finite]
+    if len(x) == 0:
+        return None
+    return (float(np.min(x)), float(np.max(x)), float(np.min(y)), float(np.max(y)))
+
+
+def union_extents(a, b):
+    """合并两个数据范围，任一为 None 时返回另一个"""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return (min(a[0], b[0]), max(a[1], b[1]), min(a[2], b[2]), max(a[3], b[3]))
+
+
+def padded_limits(low, high, margin=0.05):
+    """在数据范围两侧留出边距，范围为零时按数值大小扩展"""
+    span = high - low
+    if span <= 0:
+        span = abs(low) or 1.0
+        return low - span * margin * 10, high + span * margin * 10
+    return low - span * margin, high + span * margin
+
+
+def _geometry_cache(curve):
+    """曲线的绘图缓存，数据对象或其版本号改变时重建"""
+    data = curve['data']
+    cache = curve.get('geometry')
+    if cache is None or cache['data'] is not data or cache['version'] != data.version:
+        cache = {'data': data, 'version': data.version, 'fit_key': None, 'fit': None, 'lod': None, 'bands': None,
+                 'extents': data_extents(data.x, data.y) if len(data) else None}
+        curve['geometry'] = cache
+    return cache
+
+
+def curve_geometry(curve):
+    """返回曲线的 (数据范围, 拟合线 (x, y) 或 None)
+
+    结果缓存在曲线的 'geometry' 项中：数据范围以数据对象及其版本号为键，
+    拟合线另以拟合参数和拟合函数对象为键，二者未改变时直接复用缓存的数组。
+    """
+    fit_params = curve.get('fit_params')
+    fit_func = curve.get('fit_func') if callable(curve.get('fit_func')) else None
+    cache = _geometry_cache(curve)
+
+    key = cache['fit_key']
+    if key is None or key[0] is not fit_params or key[1] is not fit_func:
+        cache['fit'] = None
+        func = fit_func or make_fit_func(fit_params)
+        if fit_params is not None and func is not None and cache['extents'] is not None:
+            x_fit = np.linspace(cache['extents'][0], cache['extents'][1], 200)  # 增加点数使曲线更平滑
+            cache['fit'] = (x_fit, func(x_fit))
+        cache['fit_key'] = (fit_params, fit_func)
+    return cache['extents'], cache['fit']
+
+
+def curve_bands(curve, method, compute=True):
+    """返回拟合线上的置信带与预测带（见 fitting.fit_bands），无拟合或无法计算时返回 None
+
+    结果缓存在绘图缓存中，以拟合参数对象和方法为键，数据改变时随缓存一起失效。
+    compute 为 False 时只返回已缓存的结果：自助法较慢，界面另行计算后用 set_curve_bands 写入。
+    """
+    fit_params = curve.get('fit_params')
+    cache = _geometry_cache(curve)
+    entry = cache['bands']
+    if entry is not None and entry['fit_params'] is fit_params and entry['method'] == method:
+        return entry['bands']
+    if not compute:
+        return None
+    _, fit_line = curve_geometry(curve)
+    bands = None
+    if fit_line is not None:
+        data = curve['data']
+        try:
+            bands = fit_bands(data.x, data.y, fit_params, fit_line[0], method)
+        except (ValueError, np.linalg.LinAlgError):
+            pass
+    # 失败也缓存，避免每次重绘都重新计算
+    set_curve_bands(curve, method, bands)
+    return bands
+
+
+def bands_pending(curve, method):
+    """曲线有拟合结果但还没有该方法的置信带缓存"""
+    if curve.get('fit_params') is None:
+        return False
+    entry = _geometry_cache(curve)['bands']
+    return entry is None or entry['fit_params'] is not curve['fit_params'] or entry['method'] != method
+
+
+def set_curve_bands(curve, method, bands):
+    """写入按当前拟合参数计算的置信带"""
+    _geometry_cache(curve)['bands'] = {'fit_params': curve.get('fit_params'), 'method': method, 'bands': bands}
+
+
+def curve_lod(curve):
+    """大数据量曲线的降采样金字塔，与绘图缓存一起按数据版本失效；点数较少时返回 None"""
+    if len(curve['data']) < LOD_THRESHOLD:
+        return None
+    cache = _geometry_cache(curve)
+    if cache['lod'] is None:
+        cache['lod'] = LodPyramid(curve['data'])
+    return cache['lod']
+
+
+def release_curve_lod(curve):
+    """丢弃曲线的降采样金字塔
+
+    内存映射文件被改写前调用，Windows下仍被映射的文件无法替换或截断。
+    """
+    cache = curve.get('geometry')
+    if cache is not None:
+        cache['lod'] = None
+
+
+def density_cmap(color):
+    """由曲线颜色生成从半透明到不透明的颜色映射，空格子完全透明"""
+    r, g, b = to_rgb(color)
+    cmap = LinearSegmentedColormap.from_list(f"density_{color}", [(r, g, b, 0.15), (r, g, b, 1.0)])
+    cmap.set_bad((0, 0, 0, 0))
+    return cmap
+
+
+def fill_density_image(image, x, y, x_range, y_range, pixels, log_scale):
+    """按像素大小统计视口内的点并更新密度图"""
+    shape = (min(pixels[0] // DENSITY_BIN_PIXELS, DENSITY_MAX_BINS),
+             min(pixels[1] // DENSITY_BIN_PIXELS, DENSITY_MAX_BINS))
+    grid = density_grid(x, y, x_range, y_range, shape, log_scale)
+    image.set_data(grid)
+    image.set_extent((x_range[0], x_range[1], y_range[0], y_range[1]))
+    image.set_clim(0, max(float(grid.max()) if grid.count() else 0.0, 1.0))
+
+
+class Scene:
+    """一帧图表的描述：图表设置和按顺序排列的曲线
+
+    curves 为 {曲线名称: 曲线字典}，曲线字典中的绘图缓存（数据范围、拟合线、
+    降采样金字塔）在屏幕和导出之间共享。
+    """
+
+    def __init__(self, curves, title, x_label, y_label, font_size=12,
+                 show_legend=True, legend_loc='best', empty_title="请添加数据点", band_method=None):
+        self.curves = curves
+        self.title = title
+        self.x_label = x_label
+        self.y_label = y_label
+        self.font_size = font_size
+        self.show_legend = show_legend
+        self.legend_loc = legend_loc
+        self.empty_title = empty_title  # 没有可见曲线时显示的标题
+        self.band_method = band_method  # 置信带方法，None 表示不绘制
+
+
+class SceneRenderer:
+    """把 Scene 渲染到一个 Axes 上
+
+    每条曲线保留一个散点 PathCollection、一条拟合 Line2D、可选的密度图 AxesImage
+    和置信带/预测带的 fill_between 多边形。
+    屏幕画布长期持有一个渲染器并增量更新；导出时为离屏 Figure 新建渲染器一次性渲染，
+    两者使用同一套绘制代码和缓存，导出结果与屏幕一致。
+    downsample 为 False 时散点总是绘制全部数据（导出时的完整分辨率）。
+    """
+
+    def __init__(self, ax, downsample=True):
+        self.ax = ax
+        self.downsample = downsample
+        # {曲线名称: {'scatter', 'fit', 'image', 'bands', 'style': (颜色, 标记), 'extents', 'view': 上次刷新的视口, 'curve'}}
+        self.records = {}
+        self.band_method = None
+        self.has_visible_data = None
+        # 上次自动设置坐标范围时的数据范围和坐标范围（"主页"视图），None 表示尚未设置
+        self.limits_extents = None
+        self.home_limits = None
+        self.ax.grid(True, alpha=0.3)
+
+    def render(self, scene, dirty=None, settings_dirty=True):
+        """同步图元到场景，dirty 为需要更新的曲线名称集合（None 表示全部）
+
+        返回坐标范围是否被重置。
+        """
+        structure_changed = False
+        self.band_method = scene.band_method
+
+        # 移除已删除或重命名曲线的图元
+        for name in [name for name in self.records if name not in scene.curves]:
+            self.remove_curve(name)
+            structure_changed = True
+
+        # 只同步新增或被标记的曲线
+        for name, curve in scene.curves.items():
+            if name in self.records and dirty is not None and name not in dirty:
+                continue
+            self.sync_curve(name, curve)
+            structure_changed = True
+
+        # 检查是否有可见的曲线
+        has_visible_data = any(record['scatter'].get_visible() for record in self.records.values())
+        visibility_flipped = has_visible_data != self.has_visible_data
+
+        if settings_dirty or visibility_flipped:
+            # 设置标题和标签
+            self.ax.set_xlabel(scene.x_label, fontsize=scene.font_size)
+            self.ax.set_ylabel(scene.y_label, fontsize=scene.font_size)
+            title = scene.title if has_visible_data else scene.empty_title
+            self.ax.set_title(title, fontsize=scene.font_size+2, fontweight='bold')
+            # 设置刻度标签字体大小
+            self.ax.tick_params(axis='both', which='major', labelsize=scene.font_size-1)
+
+        limits_reset = structure_changed and self.update_limits()
+        self.update_view()
+
+        if structure_changed or settings_dirty or visibility_flipped:
+            self.update_legend(scene, has_visible_data)
+
+        self.has_visible_data = has_visible_data
+        return limits_reset
+
+    def sync_curve(self, name, curve):
+        """按曲线当前状态创建或更新其散点、拟合线和密度图图元"""
+        marker = curve.get('marker', 'o')  # 如果没有marker属性则默认使用圆形
+        style = (curve['color'], marker)
+        record = self.records.get(name)
+        if record is not None and record['style'] != style:
+            # 标记形状无法原地修改，样式变化时重建图元
+            self.remove_curve(name)
+            record = None
+        if record is None:
+            scatter = self.ax.scatter([], [], color=curve['color'], marker=marker, alpha=0.7, s=50)
+            record = {'scatter': scatter, 'fit': None, 'image': None, 'bands': [], 'style': style,
+                      'extents': None, 'view': None, 'curve': None}
+            self.records[name] = record
+
+        data = curve['data']
+        visible = curve['visible'] and len(data) > 0
+        scatter = record['scatter']
+        record['curve'] = curve
+        record['view'] = None
+
+        if curve.get('render_mode', 'scatter') == 'scatter':
+            if record['image'] is not None:
+                record['image'].remove()
+                record['image'] = None
+            # 大数据量曲线只绘制视口所需的降采样点，由 update_view 填充
+            if not self.downsample or curve_lod(curve) is None:
+                scatter.set_offsets(np.column_stack((data.x, data.y)))
+        else:
+            # 密度图模式下散点不含数据，只作为图例句柄
+            scatter.set_offsets(np.empty((0, 2)))
+            if record['image'] is None:
+                record['image'] = self.ax.imshow(np.ma.masked_all((1, 1)), extent=(0, 1, 0, 1), origin='lower',
+                                                 aspect='auto', interpolation='nearest',
+                                                 cmap=density_cmap(curve['color']))
+            record['image'].set_visible(visible)
+        scatter.set_label(name)
+        scatter.set_visible(visible)
+        extents, fit_line = curve_geometry(curve)
+        record['extents'] = extents
+
+        # 如果有拟合参数，更新拟合线（不添加到图例）
+        if fit_line is not None:
+            x_fit, y_fit = fit_line
+            if record['fit'] is None:
+                record['fit'], = self.ax.plot(x_fit, y_fit, color=curve['color'], linestyle='-', linewidth=2)
+            else:
+                record['fit'].set_data(x_fit, y_fit)
+            record['fit'].set_visible(visible)
+            record['extents'] = union_extents(extents, data_extents(x_fit, y_fit))
+        elif record['fit'] is not None:
+            record['fit'].remove()
+            record['fit'] = None
+
+        # 置信带（深）和预测带（浅）画在拟合线下方，不加入图例；解析方法在需要时计算，
+        # 自助法只使用已缓存的结果
+        for band in record['bands']:
+            band.remove()
+        record['bands'] = []
+        if fit_line is not None and self.band_method is not None:
+            bands = curve_bands(curve, self.band_method, compute=self.band_method == 'analytic')
+            if bands is not None:
+                for (lower, upper), alpha in ((bands['pred'], 0.1), (bands['conf'], 0.25)):
+                    record['bands'].append(self.ax.fill_between(bands['x'], lower, upper, color=curve['color'],
+                                                                alpha=alpha, linewidth=0, visible=visible))
+                band_x = np.concatenate((bands['x'], bands['x']))
+                record['extents'] = union_extents(record['extents'],
+                                                  data_extents(band_x, np.concatenate(bands['pred'])))
+
+    def remove_curve(self, name):
+        """从坐标轴上移除曲线的图元"""
+        record = self.records.pop(name)
+        record['scatter'].remove()
+        if record['fit'] is not None:
+            record['fit'].remove()
+        if record['image'] is not None:
+            record['image'].remove()
+        for band in record['bands']:
+            band.remove()
+
+    def invalidate_view(self, name):
+        """使曲线的视口相关图元在下次刷新时重新计算"""
+        record = self.records.get(name)
+        if record is not None:
+            record['view'] = None
+
+    def update_limits(self):
+        """根据可见曲线的数据范围设置坐标轴范围，返回是否重新设置
+
+        只有数据范围改变、且视图仍停留在上次自动设置的范围时才重新设置，
+        用户通过工具栏缩放或平移后的视图不会因追加数据、拟合或置信带更新而被重置。
+        """
+        extents = None
+        for record in self.records.values():
+            if record['scatter'].get_visible() and record['extents'] is not None:
+                extents = union_extents(extents, record['extents'])
+        if extents is None:
+            extents = (0.0, 1.0, 0.0, 1.0)
+        if extents == self.limits_extents:
+            return False
+        current = (self.ax.get_xlim(), self.ax.get_ylim())
+        if self.home_limits is not None and current != self.home_limits:
+            return False
+        self.ax.set_xlim(*padded_limits(extents[0], extents[1]))
+        self.ax.set_ylim(*padded_limits(extents[2], extents[3]))
+        self.limits_extents = extents
+        self.home_limits = (self.ax.get_xlim(), self.ax.get_ylim())
+        return True
+
+    def reset_limits(self):
+        """下次渲染时按数据范围重新设置坐标范围，不论当前视图（如打开项目或清空数据后）"""
+        self.limits_extents = None
+        self.home_limits = None
+
+    def update_view(self):
+        """按当前视口和绘图区像素大小刷新降采样散点和密度图，返回是否有更新"""
+        x_range = tuple(sorted(self.ax.get_xlim()))
+        y_range = tuple(sorted(self.ax.get_ylim()))
+        pixels = (int(self.ax.bbox.width), int(self.ax.bbox.height))
+        view = (x_range, y_range, pixels)
+        changed = False
+        for record in self.records.values():
+            if record['view'] == view:
+                continue
+            curve = record['curve']
+            image = record['image']
+            if image is not None and image.get_visible():
+                lod = curve_lod(curve)
+                if lod is not None:
+                    x, y = lod.window(*x_range)
+                else:
+                    x, y = curve['data'].x, curve['data'].y
+                fill_density_image(image, x, y, x_range, y_range, pixels,
+                                   curve.get('render_mode') == 'log_density')
+            elif image is None and self.downsample and curve_lod(curve) is not None:
+                x, y = curve_lod(curve).select(x_range[0], x_range[1], pixels[0])
+                record['scatter'].set_offsets(np.column_stack((x, y)))
+            else:
+                continue
+            record['view'] = view
+            changed = True
+        return changed
+
+    def update_legend(self, scene, has_visible_data):
+        """根据场景设置添加或移除图例"""
+        legend = self.ax.get_legend()
+        if legend is not None:
+            legend.remove()
+
+        if has_visible_data and scene.show_legend:
+            handles = [self.records[name]['scatter'] for name in scene.curves
+                       if self.records[name]['scatter'].get_visible()]
+            self.ax.legend(handles=handles, fontsize=scene.font_size-1, loc=scene.legend_loc, framealpha=0.9)
+
+
+def snapshot_scene(scene):
+    """返回可跨进程传递的场景副本
+
+    只包含可见曲线；拟合函数是闭包无法序列化，只保留拟合参数。已计算的数据范围、
+    拟合线和置信带随场景一起传递，目标进程中无需重新计算；降采样金字塔在需要时重建。
+    """
+    curves = {}
+    for name, curve in scene.curves.items():
+        if not curve['visible'] or not len(curve['data']):
+            continue
+        extents, fit_line = curve_geometry(curve)
+        data = curve['data']
+        fit_params = curve.get('fit_params')
+        if fit_params is not None:
+            fit_params = {key: value for key, value in fit_params.items() if not callable(value)}
+        bands = curve['geometry']['bands']
+        if bands is not None:
+            # 置信带以拟合参数对象为键，当前有效的结果换成副本中的参数对象
+            bands = dict(bands, fit_params=fit_params) if bands['fit_params'] is curve.get('fit_params') else None
+        curves[name] = {
+            'data': data,
+            'color': curve['color'],
+            'marker': curve.get('marker', 'o'),
+            'visible': True,
+            'render_mode': curve.get('render_mode', 'scatter'),
+            'fit_params': fit_params,
+            # 与 _geometry_cache 的结构一致；同一次序列化中 data / fit_params 的对象身份保持不变
+            'geometry': {'data': data, 'version': data.version, 'extents': extents, 'fit': fit_line,
+                         'fit_key': (fit_params, None), 'lod': None, 'bands': bands},
+        }
+    return Scene(curves, scene.title, scene.x_label, scene.y_label, scene.font_size,
+                 scene.show_legend, scene.legend_loc, scene.empty_title, scene.band_method)
+
+
+def render_figure(fig, ax, scene, downsample=False, dpi=None, rasterize_points=None):
+    """在离屏 Figure 上一次性渲染场景（导出用）
+
+    布局在 Figure 当前的 dpi 下计算；dpi 给出时布局完成后切换到该输出分辨率，
+    以免超高分辨率导出在布局阶段就分配整幅画布。rasterize_points 给出时，
+    点数超过该值的散点层在矢量格式中按输出 dpi 栅格化，坐标轴、文字、图例和拟合线仍为矢量。
+    """
+    renderer = SceneRenderer(ax, downsample)
+    renderer.render(scene)
+    # 只执行一次紧凑布局而不在 Figure 上留下布局引擎，否则分块导出时 savefig 会先按整幅大小试绘；
+    # fig.tight_layout() 在 matplotlib 3.5 及以后的版本中都是一次性的
+    fig.tight_layout()
+    if dpi is not None:
+        fig.set_dpi(dpi)
+    # 布局调整后绘图区大小改变，按最终像素大小重新降采样和统计密度
+    renderer.update_view()
+    if rasterize_points is not None:
+        for record in renderer.records.values():
+            scatter = record['scatter']
+            scatter.set_rasterized(len(scatter.get_offsets()) > rasterize_points)
+    return renderer
@@ -0,0 +1,22 @@
+import argparse
+
+import pytest
+
+from batch import build_parser, poly_order
+
+
+def test_poly_order_accepts_range_and_auto():
+    assert poly_order('1') == 1
+    assert poly_order('10') == 10
+    assert poly_order('auto') is None
+
+
+@pytest.mark.parametrize('text', ['0', '11', '50', '-2', 'x'])
+def test_poly_order_rejects_out_of_range(text):
+    with pytest.raises(argparse.ArgumentTypeError):
+        poly_order(text)
+
+
+def test_parser_exits_on_bad_order():
+    with pytest.raises(SystemExit):
+        build_parser().parse_args(['--batch', 'a.csv', '--order', '0'])
@@ -0,0 +1,88 @@
+import matplotlib
+matplotlib.use('Agg')
+import pytest
+
+chart_tool = pytest.importorskip('chart_tool')
+
+
+class FakeRoot:
+    """记录 after / after_idle 回调，由测试手动执行"""
+
+    def __init__(self):
+        self.idle = []
+        self.timers = []
+
+    def after(self, delay, callback):
+        self.timers.append((delay, callback))
+
+    def after_idle(self, callback):
+        self.idle.append(callback)
+
+    def run_idle(self):
+        callbacks, self.idle = self.idle, []
+        for callback in callbacks:
+            callback()
+
+
+def make_app():
+    # 只测试重绘调度，不创建窗口
+    app = chart_tool.ChartTool.__new__(chart_tool.ChartTool)
+    app.root = FakeRoot()
+    app.min_frame_interval = 30
+    app.redraw_pending = False
+    app.redraw_deferred = False
+    app.render_suspended = 0
+    app.last_frame_time = 0.0
+    app.frames = 0
+
+    def update_chart():
+        app.frames += 1
+    app.update_chart = update_chart
+    return app
+
+
+def test_requests_in_one_turn_draw_one_frame():
+    app = make_app()
+    for _ in range(5):
+        app.request_redraw()
+    assert len(app.root.idle) == 1
+    app.root.run_idle()
+    assert app.frames == 1 and not app.redraw_pending
+
+
+def test_frames_keep_minimum_interval():
+    app = make_app()
+    app.request_redraw()
+    app.root.run_idle()
+    app.request_redraw()
+    # 距上一帧不足最小间隔，先等待再在空闲时绘制
+    assert not app.root.idle and len(app.root.timers) == 1
+    delay, callback = app.root.timers[0]
+    assert 0 < delay <= app.min_frame_interval
+    callback()
+    app.root.run_idle()
+    assert app.frames == 2
+
+
+def test_suspended_requests_draw_once_after_resume():
+    app = make_app()
+    app.suspend_rendering()
+    app.suspend_rendering()
+    for _ in range(3):
+        app.request_redraw()
+    app.resume_rendering()
+    assert not app.root.idle
+    app.resume_rendering()
+    app.root.run_idle()
+    assert app.frames == 1
+
+
+def test_frame_scheduled_before_suspend_is_deferred():
+    app = make_app()
+    app.request_redraw()
+    app.suspend_rendering()
+    app.root.run_idle()
+    assert app.frames == 0 and app.redraw_deferred
+    app.resume_rendering()
+    app.root.run_idle()
+    assert app.frames == 1
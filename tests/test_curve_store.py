@@ -0,0 +1,103 @@
+import os
+import weakref
+
+import numpy as np
+import pytest
+
+import curve_store
+from curve_store import CurveData, MappedCurveData, unique_path
+
+
+def test_mapped_remove_releases_maps_before_replace(tmp_path, monkeypatch):
+    path = str(tmp_path / "curve.bin")
+    MappedCurveData.create(path, [(np.arange(10.0), np.arange(10.0) * 2)])
+    # 重新打开已有的映射文件
+    data = MappedCurveData(path)
+    old_map = weakref.ref(data._x.base)
+    replace = curve_store.os.replace
+
+    def checked_replace(src, dst):
+        # Windows 下仍被映射的文件无法替换，替换时旧映射必须已被释放
+        assert old_map() is None
+        replace(src, dst)
+
+    monkeypatch.setattr(curve_store.os, 'replace', checked_replace)
+    assert data.remove([1, 3, 5]) == 3
+    np.testing.assert_array_equal(data.x, [0, 2, 4, 6, 7, 8, 9])
+    np.testing.assert_array_equal(data.y, [0, 4, 8, 12, 14, 16, 18])
+
+    reopened = MappedCurveData(path)
+    np.testing.assert_array_equal(reopened.x, data.x)
+
+
+def test_mapped_remove_with_mask(tmp_path):
+    path = str(tmp_path / "curve.bin")
+    data = MappedCurveData.create(path, [(np.arange(5.0), np.arange(5.0))])
+    version = data.version
+    assert data.remove(np.array([True, False, False, False, True])) == 2
+    np.testing.assert_array_equal(data.x, [1, 2, 3])
+    assert data.version == version + 1
+
+
+def test_mapped_move_to_failure_keeps_mapping(tmp_path):
+    path = str(tmp_path / "curve.bin")
+    data = MappedCurveData.create(path, [(np.arange(4.0), np.arange(4.0))])
+    with pytest.raises(OSError):
+        data.move_to(str(tmp_path / "missing" / "curve.bin"))
+    assert data.path == os.path.abspath(path)
+    np.testing.assert_array_equal(data.x, [0, 1, 2, 3])
+
+
+def test_unique_path_skips_existing_files(tmp_path):
+    path = str(tmp_path / "a.xybin")
+    assert unique_path(path) == path
+    open(path, 'wb').close()
+    open(str(tmp_path / "a-1.xybin.part"), 'wb').close()
+    assert unique_path(path) == str(tmp_path / "a-2.xybin")
+
+
+def test_copy_on_write_leaves_original_file(tmp_path):
+    path = str(tmp_path / "cache.xybin")
+    MappedCurveData.create(path, [(np.arange(6.0), np.arange(6.0))])
+    original = open(path, 'rb').read()
+
+    for edit in (lambda d: d.append(9.0, 9.0), lambda d: d.remove([0]),
+                 lambda d: d.truncate(2), lambda d: d.clear()):
+        data = MappedCurveData(path, copy_on_write=True)
+        edit(data)
+        assert data.path != os.path.abspath(path) and not data.copy_on_write
+        assert open(path, 'rb').read() == original
+
+    data = MappedCurveData(path, copy_on_write=True)
+    data.remove([0])
+    data.append(9.0, 9.0)
+    np.testing.assert_array_equal(data.x, [1, 2, 3, 4, 5, 9])
+
+
+@pytest.mark.parametrize('selection', [[4, 0, 4, 99, -1], np.arange(10) % 3 == 0])
+def test_remove_selection_in_one_pass(selection):
+    data = CurveData.from_arrays(np.arange(10.0), np.arange(10.0) * 10)
+    data.append(10.0, 100.0)
+    keep = np.ones(len(data), dtype=bool)
+    if isinstance(selection, np.ndarray):
+        selection = np.append(selection, False)
+        keep &= ~selection
+    else:
+        keep[[i for i in selection if 0 <= i < len(data)]] = False
+    version = data.version
+    assert data.remove(selection) == int((~keep).sum())
+    np.testing.assert_array_equal(data.x, np.arange(11.0)[keep])
+    np.testing.assert_array_equal(data.y, np.arange(11.0)[keep] * 10)
+    assert data.version == version + 1
+    # 删除后仍可继续追加
+    data.append(20.0, 200.0)
+    assert data.x[-1] == 20.0
+
+
+def test_remove_nothing_keeps_version():
+    data = CurveData.from_arrays(np.arange(3.0), np.arange(3.0))
+    assert data.remove([5, -2]) == 0
+    assert data.remove(np.zeros(3, dtype=bool)) == 0
+    assert data.version == 0
+    with pytest.raises(ValueError):
+        data.remove(np.zeros(2, dtype=bool))
@@ -0,0 +1,123 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from curve_store import CurveData, MappedCurveData
+from data_io import (csv_to_mapped, is_cache_fresh, keep_partial_mapped, mapped_cache_path,
+                     open_chunked_reader, parse_xy_text)
+
+
+def test_parse_single_column_marks_lines_invalid():
+    x, y, errors = parse_xy_text("1\n2\n3")
+    assert len(x) == 0 and len(y) == 0
+    assert errors.tolist() == [True, True, True]
+
+
+def test_parse_single_column_keeps_blank_lines_valid():
+    _, _, errors = parse_xy_text("1\n\n3")
+    assert errors.tolist() == [True, False, True]
+
+
+def test_parse_wrong_delimiter_marks_lines_invalid():
+    # 分号被识别为成对格式的记录分隔符，每条记录都缺少 y
+    x, _, errors = parse_xy_text("1;2\n3;4")
+    assert len(x) == 0
+    assert errors.tolist() == [True, True]
+
+
+def test_parse_mixed_valid_and_invalid_lines():
+    x, y, errors = parse_xy_text("1 2\n\n3 x\n4 5")
+    np.testing.assert_array_equal(x, [1.0, 4.0])
+    np.testing.assert_array_equal(y, [2.0, 5.0])
+    assert errors.tolist() == [False, False, True, False]
+
+
+def write_csv(path, rows):
+    x = np.arange(rows, dtype=np.float64)
+    pd.DataFrame({'x': x, 'y': x * 2}).to_csv(path, index=False)
+    return str(path)
+
+
+def drain(reader):
+    """取出读取器产生的全部消息，返回 (数据块列表, 结束消息类型)"""
+    chunks = []
+    while True:
+        kind, payload = reader.chunks.get(timeout=10)
+        if kind != 'chunk':
+            return chunks, kind
+        chunks.append(payload)
+
+
+def test_chunked_reader_reads_all_rows(tmp_path):
+    path = write_csv(tmp_path / "d.csv", 1000)
+    reader = open_chunked_reader(path, ['x', 'y'], chunk_rows=128).start()
+    chunks, kind = drain(reader)
+    assert kind == 'done'
+    np.testing.assert_array_equal(np.concatenate([c['y'] for c in chunks]), np.arange(1000.0) * 2)
+    assert reader.rows_read == 1000 and reader.bytes_read == reader.total_bytes
+
+
+def test_chunked_reader_cancel_stops_early(tmp_path):
+    path = write_csv(tmp_path / "d.csv", 5000)
+    reader = open_chunked_reader(path, ['x', 'y'], chunk_rows=100).start()
+    first = reader.chunks.get(timeout=10)
+    assert first[0] == 'chunk'
+    reader.cancel()
+    chunks, kind = drain(reader)
+    assert kind == 'cancelled'
+    assert 100 * (len(chunks) + 1) < 5000
+
+
+def test_cancelled_mapped_import_rollback_and_keep(tmp_path):
+    cache_path = str(tmp_path / "d.csv.0_1.xybin")
+    part_path = cache_path + '.part'
+
+    # 丢弃：截断回导入前的长度
+    data = CurveData.from_arrays([0.0, 1.0], [0.0, 1.0])
+    data.extend(np.arange(5.0), np.arange(5.0))
+    data.truncate(2)
+    np.testing.assert_array_equal(data.x, [0, 1])
+
+    # 保留：部分数据移出 .part 文件，且不占用缓存路径
+    kept = MappedCurveData(part_path)
+    kept.extend(np.arange(3.0), np.arange(3.0) * 10)
+    new_path = keep_partial_mapped(kept, cache_path)
+    assert new_path != cache_path
+    assert not os.path.exists(part_path) and not os.path.exists(cache_path)
+    assert kept.path == os.path.abspath(new_path)
+
+    # 再次映射导入同一文件会清空 .part，保留的曲线不受影响
+    MappedCurveData(part_path).clear()
+    np.testing.assert_array_equal(kept.y, [0, 10, 20])
+    assert keep_partial_mapped(MappedCurveData(part_path), cache_path) != new_path
+
+
+def test_edited_cache_is_not_reported_fresh(tmp_path):
+    src = write_csv(tmp_path / "d.csv", 50)
+    cache_path = mapped_cache_path(src, 'x', 'y')
+    data = csv_to_mapped(src, 'x', 'y')
+    assert is_cache_fresh(src, cache_path)
+
+    # 清除数据写到新文件，缓存仍与源文件一致
+    data.clear()
+    assert is_cache_fresh(src, cache_path)
+    reopened = csv_to_mapped(src, 'x', 'y')
+    assert len(reopened) == 50 and reopened.copy_on_write
+
+    # 直接改动缓存文件或源文件都会使缓存失效
+    with open(cache_path, 'ab') as f:
+        f.write(bytes(16))
+    assert not is_cache_fresh(src, cache_path)
+    assert len(csv_to_mapped(src, 'x', 'y')) == 50
+    with open(src, 'a') as f:
+        f.write("50,100\n")
+    assert not is_cache_fresh(src, cache_path)
+    assert len(csv_to_mapped(src, 'x', 'y')) == 51
+
+
+def test_cache_without_stamp_is_stale(tmp_path):
+    src = write_csv(tmp_path / "d.csv", 10)
+    cache_path = mapped_cache_path(src, 'x', 'y')
+    MappedCurveData.create(cache_path, [(np.zeros(0), np.zeros(0))])
+    assert not is_cache_fresh(src, cache_path)
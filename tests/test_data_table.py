@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from curve_store import CurveData
+from data_table import VirtualTable
+
+
+def make_table(data, sort_column, descending, filter_spec):
+    # 只测试显示顺序的计算，不创建控件
+    table = VirtualTable.__new__(VirtualTable)
+    table.data = data
+    table.sort_column = sort_column
+    table.sort_descending = descending
+    table.filter_spec = filter_spec
+    table.selected = np.zeros(len(data), dtype=bool)
+    table._update_order()
+    return table
+
+
+@pytest.mark.parametrize('sort_column', [None, 'X', 'Y', '序号'])
+@pytest.mark.parametrize('descending', [False, True])
+@pytest.mark.parametrize('filter_spec', [None, ('Y', 2.0, 7.0)])
+def test_append_matches_full_sort(sort_column, descending, filter_spec):
+    rng = np.random.default_rng(0)
+    data = CurveData.from_arrays(rng.integers(0, 10, 200).astype(float), rng.integers(0, 10, 200).astype(float))
+    table = make_table(data, sort_column, descending, filter_spec)
+    table.selected[5] = True
+
+    data.extend(rng.integers(0, 10, 50).astype(float), rng.integers(0, 10, 50).astype(float))
+    table._append_rows(200)
+    expected = make_table(data, sort_column, descending, filter_spec)
+
+    if expected.order is None:
+        assert table.order is None
+    else:
+        np.testing.assert_array_equal(table.order, expected.order)
+    assert len(table.selected) == 250 and table.selected[5]
+
+
+class FakeTree:
+    def __init__(self, region):
+        self.region = region
+
+    def identify_region(self, x, y):
+        return self.region
+
+    def focus_set(self):
+        raise AssertionError("点击标题或分隔线时不应处理选择")
+
+
+@pytest.mark.parametrize('region', ['heading', 'separator'])
+def test_click_on_heading_or_separator_uses_default_binding(region):
+    table = make_table(CurveData.from_arrays(np.arange(5.0), np.arange(5.0)), None, False, None)
+    table.tree = FakeTree(region)
+    event = type('Event', (), {'x': 0, 'y': 0})()
+    # 返回 None 而不是 'break'，列宽拖动和排序仍由 Treeview 处理
+    assert table.on_click(event) is None
+    assert not table.selected.any()
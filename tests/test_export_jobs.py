@@ -0,0 +1,117 @@
+import base64
+import io
+import re
+
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+import pytest
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+import export_jobs
+from curve_store import CurveData
+from scene import Scene, SceneRenderer, render_figure, snapshot_scene
+
+
+def make_scene(points=20000):
+    rng = np.random.default_rng(0)
+    x = rng.random(points)
+    curve = {'data': CurveData.from_arrays(x, x + rng.normal(0, 0.1, points)), 'color': 'red',
+             'marker': 'o', 'visible': True, 'render_mode': 'scatter', 'fit_params': None}
+    return Scene({'c': curve}, "T", "X", "Y")
+
+
+def svg_page_and_raster(path):
+    text = open(path, encoding='utf-8').read()
+    page = [float(value) for value in re.search(r'<svg[^>]*width="([\d.]+)pt" height="([\d.]+)pt"', text).groups()]
+    images = re.findall(r'xlink:href="data:image/png;base64,([^"]+)"', text)
+    return page, images
+
+
+def test_svg_rasterizes_dense_points_at_output_dpi(tmp_path):
+    pytest.importorskip('PIL')
+    from PIL import Image
+
+    scene = make_scene()
+    sizes = {}
+    for dpi in (72, 300):
+        path = str(tmp_path / f"c{dpi}.svg")
+        export_jobs.write_outputs(scene, (6, 4), [(path, 'svg', dpi)])
+        page, images = svg_page_and_raster(path)
+        assert len(images) == 1
+        sizes[dpi] = (page, Image.open(io.BytesIO(base64.b64decode(images[0]))).size)
+    # 页面尺寸与 DPI 无关（紧凑边界只差不到1pt），栅格化散点层的分辨率随 DPI 提高
+    np.testing.assert_allclose(sizes[72][0], sizes[300][0], atol=1)
+    assert sizes[300][1][0] > 3 * sizes[72][1][0]
+
+
+def render_png(path, scene, dpi=100, size=(4, 3)):
+    fig = Figure(figsize=size, dpi=export_jobs.LAYOUT_DPI)
+    FigureCanvasAgg(fig)
+    render_figure(fig, fig.add_subplot(), scene, dpi=dpi)
+    export_jobs.write_tiled_png(fig, path, dpi)
+    return path
+
+
+def test_tiled_png_matches_single_tile(tmp_path, monkeypatch):
+    pytest.importorskip('PIL')
+    from PIL import Image
+
+    scene = make_scene(3000)
+    whole = render_png(str(tmp_path / "whole.png"), scene)
+    # 小块时在水平和竖直方向都切分
+    monkeypatch.setattr(export_jobs, 'TILE_PIXELS', 20000)
+    monkeypatch.setattr(export_jobs, 'TILE_MIN_ROWS', 64)
+    tiled = render_png(str(tmp_path / "tiled.png"), scene)
+    a = np.asarray(Image.open(whole).convert('RGB'), dtype=np.int16)
+    b = np.asarray(Image.open(tiled).convert('RGB'), dtype=np.int16)
+    assert a.shape == b.shape
+    # 块边界处的抗锯齿可能略有差别
+    assert np.mean(np.abs(a - b).max(axis=-1) > 32) < 0.002
+    assert Image.open(tiled).info['dpi'] == pytest.approx((100, 100), abs=0.1)
+
+
+def test_tiled_png_matches_savefig_size(tmp_path, monkeypatch):
+    pytest.importorskip('PIL')
+    from PIL import Image
+
+    scene = make_scene(1000)
+    monkeypatch.setattr(export_jobs, 'TILE_PIXELS', 10 ** 12)
+    export_jobs.write_outputs(scene, (4, 3), [(str(tmp_path / "ref.png"), 'png', 150)])
+    monkeypatch.setattr(export_jobs, 'TILE_PIXELS', 50000)
+    export_jobs.write_outputs(scene, (4, 3), [(str(tmp_path / "tile.png"), 'png', 150)])
+    ref = Image.open(str(tmp_path / "ref.png")).size
+    tile = Image.open(str(tmp_path / "tile.png")).size
+    # 紧凑边界在不同分辨率下计算，尺寸最多相差1像素
+    assert abs(ref[0] - tile[0]) <= 1 and abs(ref[1] - tile[1]) <= 1
+
+
+@pytest.mark.parametrize('points, rasterized', [(1000, False), (20000, True)])
+def test_dense_scatter_rasterized_in_vector_exports(points, rasterized):
+    fig = Figure(figsize=(4, 3))
+    FigureCanvasAgg(fig)
+    renderer = render_figure(fig, fig.add_subplot(), make_scene(points), dpi=150,
+                             rasterize_points=export_jobs.RASTERIZE_POINTS)
+    scatter = renderer.records['c']['scatter']
+    assert scatter.get_rasterized() is rasterized
+    # 坐标轴、文字仍为矢量
+    assert not fig.axes[0].xaxis.get_rasterized()
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='pdf', dpi=150)
+    assert (b'/Subtype /Image' in buffer.getvalue()) is rasterized
+
+
+def test_export_renders_the_canvas_scene():
+    # 界面和导出共用 SceneRenderer，导出的图元与画布一致
+    scene = make_scene(500)
+    canvas_ax = Figure().add_subplot()
+    canvas = SceneRenderer(canvas_ax)
+    canvas.render(scene)
+    fig = Figure(figsize=(4, 3))
+    FigureCanvasAgg(fig)
+    exported = render_figure(fig, fig.add_subplot(), snapshot_scene(scene))
+    assert exported.records.keys() == canvas.records.keys()
+    np.testing.assert_array_equal(exported.records['c']['scatter'].get_offsets(),
+                                  canvas.records['c']['scatter'].get_offsets())
+    assert fig.axes[0].get_title() == canvas_ax.get_title() == "T"
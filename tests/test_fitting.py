@@ -0,0 +1,198 @@
+import os
+import pickle
+import tempfile
+
+import numpy as np
+import pytest
+
+from curve_store import CurveData
+from data_io import mapped_snapshot
+from fitting import (AUTO_CANDIDATES, AUTO_CRITERIA, NONLINEAR_TYPES, RunningRegression, _band_model,
+                     _model_functions, bootstrap_bands, bootstrap_task, curve_regression, fit_bands, fit_curve,
+                     format_fit_result, make_fit_func, nonlinear_fit, polynomial_sweep, select_model,
+                     track_regression)
+
+
+def test_cv_order_recovers_noisy_quadratic():
+    for seed in range(10):
+        rng = np.random.default_rng(seed)
+        x = rng.uniform(-3, 3, 200)
+        y = 1 + 2 * x - 0.5 * x ** 2 + rng.normal(0, 1, x.size)
+        assert polynomial_sweep(x, y)['best_order'] == 2
+        assert fit_curve(x, y, 'polynomial', None)['order'] == 2
+
+
+def test_polynomial_fit_with_offset_x():
+    # 时间戳量级的X在缩放后的基上仍能准确拟合
+    x = 1.7e9 + np.linspace(0, 86400, 1000)
+    t = (x - x.mean()) / 86400
+    y = 3 + 2 * t - 5 * t ** 2
+    params = fit_curve(x, y, 'polynomial', 2)
+    assert params['r_squared'] > 1 - 1e-9
+
+
+def test_select_model_ranks_by_criterion():
+    rng = np.random.default_rng(1)
+    x = np.linspace(1, 5, 200)
+    y = 2 * np.exp(0.7 * x) * (1 + rng.normal(0, 0.01, x.size))
+    for criterion in AUTO_CRITERIA:
+        params = select_model(x, y, criterion)
+        assert params['type'] == 'exponential' and params['criterion'] == criterion
+        ranked = [c[criterion] for c in params['candidates'] if 'error' not in c]
+        assert ranked == sorted(ranked)
+        assert len(params['candidates']) == len(AUTO_CANDIDATES)
+
+
+def test_select_model_skips_models_without_enough_points():
+    x = np.array([1.0, 2.0, 3.0, 4.0, 5.0])
+    y = np.array([1.1, 3.9, 9.2, 15.8, 25.1])
+    params = select_model(x, y)
+    skipped = {c['order'] for c in params['candidates'] if c['type'] == 'polynomial' and 'error' in c}
+    assert skipped == {4, 5, 6}
+    assert all(c['error'] == "点数不足" and 'aic' not in c
+               for c in params['candidates'] if 'error' in c)
+    # 跳过的模型排在最后，不带排名
+    text = format_fit_result("c", params, len(x))
+    assert "跳过 多项式拟合(6阶): 点数不足" in text
+    assert "7." not in text
+
+
+def test_select_model_skips_invalid_domains():
+    rng = np.random.default_rng(2)
+    x = np.linspace(-2, 2, 200)
+    params = select_model(x, 3 * x - 1 + rng.normal(0, 0.1, x.size))
+    errors = {c['type'] for c in params['candidates'] if 'error' in c}
+    assert {'logarithmic', 'power'} <= errors
+    assert params['type'] == 'linear'
+
+
+@pytest.mark.parametrize('fit_type', ['linear', 'polynomial', 'exponential'])
+def test_bootstrap_bands_agree_with_analytic(fit_type):
+    rng = np.random.default_rng(3)
+    x = np.linspace(0.5, 3, 400)
+    truth = {'linear': 1 + 2 * x, 'polynomial': 1 + 2 * x - 0.5 * x ** 2,
+             'exponential': 2 * np.exp(0.6 * x)}[fit_type]
+    y = truth + rng.normal(0, 0.3, x.size)
+    params = fit_curve(x, y, fit_type, 2)
+    x_eval = np.linspace(0.5, 3, 50)
+    analytic = fit_bands(x, y, params, x_eval, 'analytic')
+    bootstrap = fit_bands(x, y, params, x_eval, 'bootstrap', resamples=400)
+    for key in ('conf', 'pred'):
+        width_a = analytic[key][1] - analytic[key][0]
+        width_b = bootstrap[key][1] - bootstrap[key][0]
+        np.testing.assert_allclose(width_b, width_a, rtol=0.3)
+    # 带包含拟合线，预测带比置信带宽
+    assert np.all(analytic['conf'][0] <= analytic['fit']) and np.all(analytic['fit'] <= analytic['conf'][1])
+    assert np.all(analytic['pred'][1] - analytic['pred'][0] > analytic['conf'][1] - analytic['conf'][0])
+
+
+def test_bootstrap_task_chunks_share_one_mapped_snapshot(tmp_path, monkeypatch):
+    monkeypatch.setattr(tempfile, 'tempdir', str(tmp_path))
+    rng = np.random.default_rng(4)
+    x = np.linspace(0, 1, 2000)
+    data = CurveData.from_arrays(x, 3 * x + rng.normal(0, 0.1, x.size))
+    params = fit_curve(data.x, data.y, 'linear')
+    x_eval = np.linspace(0, 1, 20)
+
+    snapshot = mapped_snapshot(data)
+    # 提交给进程池时只序列化文件路径，与曲线点数无关
+    payload = pickle.dumps(snapshot)
+    assert len(payload) < 1000
+    parts = [bootstrap_task(pickle.loads(payload), params, x_eval, 50, seed) for seed in range(4)]
+    bands = bootstrap_bands(params, x_eval, parts)
+    assert bands['resamples'] == 200
+    direct = bootstrap_bands(params, x_eval, [bootstrap_task(data, params, x_eval, 50, seed)
+                                              for seed in range(4)])
+    np.testing.assert_allclose(bands['conf'], direct['conf'])
+    os.remove(snapshot.path)
+
+
+def assert_regression_close(regression, x, y):
+    expected = fit_curve(x, y, 'linear')
+    result = regression.result()
+    for key in ('slope', 'intercept', 'r_value', 'p_value', 'std_err'):
+        np.testing.assert_allclose(result[key], expected[key], rtol=1e-7, atol=1e-12)
+
+
+def test_running_regression_merge_and_remove():
+    rng = np.random.default_rng(5)
+    x = 1e6 + rng.uniform(0, 10, 1000)
+    y = 3 * x + rng.normal(0, 1, x.size)
+    regression = RunningRegression()
+    regression.add(x[:400], y[:400])
+    for i in range(400, 410):
+        regression.add([x[i]], [y[i]])
+    regression.add(x[410:], y[410:])
+    assert regression.n == 1000
+    assert_regression_close(regression, x, y)
+
+    # 扣除一批点后等于由剩余的点重新计算
+    removed = rng.random(x.size) < 0.3
+    regression.remove(x[removed], y[removed])
+    assert_regression_close(regression, x[~removed], y[~removed])
+    regression.add([np.nan], [1.0])
+    assert regression.n == int((~removed).sum())
+
+
+def test_track_regression_follows_curve_edits():
+    rng = np.random.default_rng(6)
+    x = rng.uniform(0, 5, 100)
+    curve = {'data': CurveData.from_arrays(x, 2 * x + rng.normal(0, 0.1, x.size))}
+    stats = curve_regression(curve)
+    data = curve['data']
+
+    data.extend([6.0, 7.0], [12.0, 14.5])
+    track_regression(curve, added=([6.0, 7.0], [12.0, 14.5]))
+    selection = np.zeros(len(data), dtype=bool)
+    selection[::4] = True
+    removed = (data.x[selection], data.y[selection])
+    data.remove(selection)
+    track_regression(curve, removed=removed)
+    assert curve_regression(curve) is stats
+    assert_regression_close(stats, data.x, data.y)
+
+
+@pytest.mark.parametrize('fit_type', NONLINEAR_TYPES)
+def test_nonlinear_jacobians_match_finite_differences(fit_type):
+    x = np.linspace(0.5, 4, 30)
+    model, jacobian = _model_functions(fit_type, x)
+    p = np.array([1.7, 0.4])
+    step = 1e-6
+    numeric = np.column_stack([(model(p + step * e) - model(p - step * e)) / (2 * step) for e in np.eye(2)])
+    np.testing.assert_allclose(jacobian(p), numeric, rtol=1e-6, atol=1e-8)
+    # 雅可比矩阵的模型也用于置信带，两处应一致
+    theta, band_model, _ = _band_model({'type': fit_type, 'a': p[0], 'b': p[1]}, (x.min(), x.max()))
+    fitted, band_jacobian = band_model(np.asarray(theta), x)
+    np.testing.assert_allclose(fitted, model(p))
+    np.testing.assert_allclose(band_jacobian, jacobian(p))
+
+
+@pytest.mark.parametrize('fit_type, truth', [('exponential', (2.0, 0.5)), ('logarithmic', (1.0, 3.0)),
+                                             ('power', (1.5, 1.8))])
+def test_nonlinear_fit_recovers_parameters(fit_type, truth):
+    rng = np.random.default_rng(7)
+    x = np.linspace(0.5, 5, 300)
+    model, _ = _model_functions(fit_type, x)
+    y = model(np.array(truth)) + rng.normal(0, 0.05, x.size)
+    params = nonlinear_fit(x, y, fit_type)
+    errors = np.array(params['param_errors'])
+    assert np.all(np.abs([params['a'] - truth[0], params['b'] - truth[1]]) < 5 * errors)
+    assert params['method'] == 'nonlinear' and params['r_squared'] > 0.99
+    # 原始尺度的残差平方和不大于对数线性化的结果
+    loglinear = fit_curve(x, y, fit_type, method='loglinear')
+    rss = lambda p: np.sum((y - make_fit_func(p)(x)) ** 2)
+    assert rss(params) <= rss(loglinear) + 1e-12
+
+
+def test_nonlinear_fit_handles_nonpositive_y_with_initial_guess():
+    rng = np.random.default_rng(8)
+    x = np.linspace(0, 5, 200)
+    y = 2 * np.exp(-1.2 * x) + rng.normal(0, 0.01, x.size)
+    assert np.any(y <= 0)
+    with pytest.raises(ValueError):
+        fit_curve(x, y, 'exponential', method='loglinear')
+    params = fit_curve(x, y, 'exponential', initial=(1.0, -1.0))
+    assert params['a'] == pytest.approx(2.0, abs=0.05)
+    assert params['b'] == pytest.approx(-1.2, abs=0.05)
+    with pytest.raises(ValueError):
+        fit_curve(x, y, 'exponential', initial=(1.0,))
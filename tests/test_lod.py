@@ -0,0 +1,34 @@
+import numpy as np
+
+import lod
+from curve_store import CurveData, MappedCurveData
+from lod import LodPyramid
+
+
+def test_sorted_mapped_curve_is_not_copied(tmp_path):
+    x = np.arange(1000.0)
+    data = MappedCurveData.create(str(tmp_path / "sorted.bin"), [(x, np.sin(x))])
+    pyramid = LodPyramid(data)
+    assert not pyramid.sampled
+    assert isinstance(pyramid.xs, np.memmap)
+
+
+def test_unsorted_curve_is_sorted_and_drops_non_finite():
+    x = np.array([3.0, 1.0, np.nan, 2.0, 0.0])
+    y = np.array([30.0, 10.0, 5.0, 20.0, np.inf])
+    pyramid = LodPyramid(CurveData.from_arrays(x, y))
+    np.testing.assert_array_equal(pyramid.xs, [1.0, 2.0, 3.0])
+    np.testing.assert_array_equal(pyramid.ys, [10.0, 20.0, 30.0])
+
+
+def test_large_unsorted_mapped_curve_is_sampled(tmp_path, monkeypatch):
+    monkeypatch.setattr(lod, 'LOD_SORT_LIMIT', 1000)
+    monkeypatch.setattr(lod, 'LOD_SAMPLE_POINTS', 100)
+    monkeypatch.setattr(lod, 'LOD_SCAN_CHUNK', 64)
+    x = np.random.default_rng(0).permutation(5000).astype(np.float64)
+    data = MappedCurveData.create(str(tmp_path / "unsorted.bin"), [(x, x * 2)])
+    pyramid = LodPyramid(data)
+    assert pyramid.sampled
+    assert len(pyramid.xs) <= 100
+    assert np.all(np.diff(pyramid.xs) >= 0)
+    np.testing.assert_array_equal(pyramid.ys, pyramid.xs * 2)
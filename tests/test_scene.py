@@ -0,0 +1,59 @@
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+from matplotlib.figure import Figure
+
+from curve_store import CurveData
+from scene import Scene, SceneRenderer
+
+
+def make_scene():
+    x = np.arange(10.0)
+    curve = {'data': CurveData.from_arrays(x, x), 'color': 'blue', 'marker': 'o',
+             'visible': True, 'render_mode': 'scatter', 'fit_params': None}
+    return Scene({'c': curve}, "t", "x", "y"), curve
+
+
+def test_user_zoom_survives_appended_points():
+    scene, curve = make_scene()
+    ax = Figure().add_subplot()
+    renderer = SceneRenderer(ax)
+    assert renderer.render(scene)
+    ax.set_xlim(2, 3)
+    ax.set_ylim(2, 3)
+
+    curve['data'].append(100.0, 100.0)
+    assert not renderer.render(scene, dirty={'c'}, settings_dirty=False)
+    assert ax.get_xlim() == (2, 3) and ax.get_ylim() == (2, 3)
+
+
+def test_home_view_follows_new_data():
+    scene, curve = make_scene()
+    ax = Figure().add_subplot()
+    renderer = SceneRenderer(ax)
+    renderer.render(scene)
+
+    curve['data'].append(100.0, 100.0)
+    assert renderer.render(scene, dirty={'c'}, settings_dirty=False)
+    assert ax.get_xlim()[1] > 100
+
+
+def test_unchanged_extents_keep_limits():
+    scene, curve = make_scene()
+    ax = Figure().add_subplot()
+    renderer = SceneRenderer(ax)
+    renderer.render(scene)
+    curve['color'] = 'red'
+    assert not renderer.render(scene, dirty={'c'}, settings_dirty=False)
+
+
+def test_reset_limits_overrides_zoom():
+    scene, curve = make_scene()
+    ax = Figure().add_subplot()
+    renderer = SceneRenderer(ax)
+    renderer.render(scene)
+    ax.set_xlim(2, 3)
+    curve['data'].append(100.0, 100.0)
+    renderer.reset_limits()
+    assert renderer.render(scene, dirty={'c'}, settings_dirty=False)
+    assert ax.get_xlim()[1] > 100